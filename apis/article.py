@@ -1,12 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from core.auth import get_current_user
-from core.db import DB
-from core.models.base import DATA_STATUS
+from core.async_db import ADB
 from core.models.article import Article
-from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
 from .base import success_response, error_response
-from core.config import cfg
+from core.pagination import next_cursor,InvalidCursor
+from core.repo import article as article_repo, feed as feed_repo
 router = APIRouter(prefix=f"/articles", tags=["文章管理"])
+
+def article_fields(article: Article) -> dict:
+    """文章表字段(不含ORM内部状态)，正文单独存放，需要时另行读取"""
+    return {c.name: getattr(article, c.name) for c in Article.__table__.columns}
+
 @router.api_route("", summary="获取文章列表",methods= ["GET", "POST"], operation_id="get_articles_list")
 async def get_articles(
     offset: int = Query(0, ge=0),
@@ -14,65 +19,55 @@ async def get_articles(
     status: str = Query(None),
     search: str = Query(None),
     mp_id: str = Query(None),
-    current_user: dict = Depends(get_current_user)
+    cursor: str = Query(None, description="上一页返回的next_cursor，传入时忽略offset"),
+    with_total: bool = Query(True, description="是否返回总数(短时缓存)"),
+    current_user: dict = Depends(get_current_user),
+    session: AsyncSession = Depends(ADB.session_dependency)
 ):
-    session = DB.get_session()
     try:
-      
-        
-        # 构建查询条件
-        query = session.query(Article)
-        
-        if status:
-            query = query.filter(Article.status == status)
-        else:
-            query = query.filter(Article.status != DATA_STATUS.DELETED)
-        if mp_id:
-            query = query.filter(Article.mp_id == mp_id)
+        matches = {}
         if search:
-            query = query.filter(
-                or_(
-                    Article.title.ilike(f"%{search}%"),
-                )
-            )
-        
-        # 获取总数
-        total = query.count()
-        
-        # 分页查询（按发布时间降序）
-        from sqlalchemy import desc
-        articles = query.order_by(desc(Article.publish_time))\
-                       .offset(offset)\
-                       .limit(limit)\
-                       .all()
-        # 打印生成的 SQL 语句
-        print(query.statement.compile(compile_kwargs={"literal_binds": True}))
+            # 全文检索标题、摘要和正文，按相关度排序并返回命中片段
+            articles, matches, total = await article_repo.search(session, search, mp_id=mp_id, limit=limit, offset=offset, with_total=with_total)
+        else:
+            # 分页查询（按发布时间降序，游标分页时不再扫描跳过的行；总数短时缓存，翻页时不重复统计）
+            articles, total = await article_repo.list_articles(session, status=status, mp_id=mp_id, limit=limit,
+                                                               offset=offset, cursor=cursor, with_total=with_total)
         
         # 查询公众号名称
-        from core.models.feed import Feed
-        mp_names = {}
-        for article in articles:
-            if article.mp_id and article.mp_id not in mp_names:
-                feed = session.query(Feed).filter(Feed.id == article.mp_id).first()
-                mp_names[article.mp_id] = feed.mp_name if feed else "未知公众号"
+        mp_names = await feed_repo.feed_names(session, [article.mp_id for article in articles])
         
         # 合并公众号名称到文章列表
         article_list = []
         for article in articles:
-            article_dict = article.__dict__
+            article_dict = article_fields(article)
+            # 列表不返回正文(正文单独存放)，是否已有正文以content_hash判断
+            article_dict["has_content"] = article.content_hash is not None
             article_dict["mp_name"] = mp_names.get(article.mp_id, "未知公众号")
+            if article.id in matches:
+                article_dict["score"] = matches[article.id]["score"]
+                article_dict["snippet"] = matches[article.id]["snippet"]
             article_list.append(article_dict)
         
-        from .base import success_response
         return success_response({
             "list": article_list,
-            "total": total
+            "total": total,
+            "next_cursor": None if search else next_cursor(articles, limit, "publish_time")
         })
+    except InvalidCursor as e:
+        # 参数status与fastapi.status同名，这里直接使用状态码
+        raise HTTPException(
+            status_code=400,
+            detail=error_response(
+                code=40001,
+                message=str(e)
+            )
+        )
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(
-            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            status_code=406,
             detail=error_response(
                 code=50001,
                 message=f"获取文章列表失败: {str(e)}"
@@ -82,14 +77,13 @@ async def get_articles(
 @router.get("/{article_id}", summary="获取文章详情")
 async def get_article_detail(
     article_id: str,
-    content: bool = False,
+    content: bool = Query(True, description="是否返回正文"),
     # current_user: dict = Depends(get_current_user)
+    session: AsyncSession = Depends(ADB.session_dependency)
 ):
-    session = DB.get_session()
     try:
-        article = session.query(Article).filter(Article.id==article_id).filter(Article.status != DATA_STATUS.DELETED).first()
+        article = await article_repo.get_article(session, article_id)
         if not article:
-            from .base import error_response
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=error_response(
@@ -97,7 +91,11 @@ async def get_article_detail(
                     message="文章不存在"
                 )
             )
-        return success_response(article)
+        article_dict = article_fields(article)
+        if content:
+            # 正文单独存放，只在详情中按需读取
+            article_dict["content"] = await article_repo.get_content(session, article_id)
+        return success_response(article_dict)
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -114,13 +112,9 @@ async def delete_article(
     article_id: str,
     current_user: dict = Depends(get_current_user)
 ):
-    session = DB.get_session()
     try:
-        from core.models.article import Article
-        
-        # 检查文章是否存在
-        article = session.query(Article).filter(Article.id == article_id).first()
-        if not article:
+        # 逻辑删除文章（更新状态为deleted），article.true_delete开启时直接删除
+        if not await article_repo.delete_article(article_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=error_response(
@@ -128,19 +122,14 @@ async def delete_article(
                     message="文章不存在"
                 )
             )
-        # 逻辑删除文章（更新状态为deleted）
-        article.status = DATA_STATUS.DELETED
-        if cfg.get("article.true_delete", False):
-            session.delete(article)
-        session.commit()
-        
         return success_response(None, message="文章已标记为删除")
+    except HTTPException as e:
+        raise e
     except Exception as e:
-        session.rollback()
         raise HTTPException(
             status_code=status.HTTP_406_NOT_ACCEPTABLE,
             detail=error_response(
                 code=50001,
                 message=f"删除文章失败: {str(e)}"
             )
-        )
\ No newline at end of file
+        )
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from starlette.concurrency import run_in_threadpool
 from datetime import timedelta
 from core.auth import (
     authenticate_user,
@@ -42,7 +43,8 @@ async def qr_success(current_user=Depends(get_current_user)):
      return success_response(WX_API.Close())    
 @router.post("/login", summary="用户登录")
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
-    user = authenticate_user(form_data.username, form_data.password)
+    # 查询用户及bcrypt校验在线程池中执行
+    user = await run_in_threadpool(authenticate_user, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -64,7 +66,8 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
 
 @router.post("/token",summary="获取Token")
 async def getToken(form_data: OAuth2PasswordRequestForm = Depends()):
-    user = authenticate_user(form_data.username, form_data.password)
+    # 查询用户及bcrypt校验在线程池中执行
+    user = await run_in_threadpool(authenticate_user, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
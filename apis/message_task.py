@@ -7,12 +7,12 @@ from typing import List, Optional
 from core.print import print_error, print_info
 # 2. 第三方库导入
 from fastapi import APIRouter, Depends, HTTPException, status,Body,Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # 3. 本地应用/模块导入
 from core.auth import get_current_user
-from core.db import DB
-from core.models.message_task import MessageTask
+from core.async_db import ADB
+from core.repo import message_task as task_repo
 from .base import success_response, error_response
 
 router = APIRouter(prefix="/message_tasks", tags=["消息任务"])
@@ -22,9 +22,9 @@ async def list_message_tasks(
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
     status: Optional[int] = None,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(ADB.session_dependency)
 ):
-    db=DB.get_session()
     """
     获取消息任务列表
     
@@ -42,12 +42,7 @@ async def list_message_tasks(
         数据库查询异常: 返回500内部服务器错误
     """
     try:
-        query = db.query(MessageTask)
-        if status is not None:
-            query = query.filter(MessageTask.status == status)
-        
-        total = query.count()
-        message_tasks = query.offset(offset).limit(limit).all()
+        message_tasks, total = await task_repo.list_tasks(db, limit, offset, status)
         
         return success_response({
             "list": message_tasks,
@@ -63,9 +58,9 @@ async def list_message_tasks(
 @router.get("/{task_id}", summary="获取单个消息任务详情")
 async def get_message_task(
     task_id: int,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(ADB.session_dependency)
 ):
-    db=DB.get_session()
     """
     获取单个消息任务详情
     
@@ -82,7 +77,7 @@ async def get_message_task(
         500: 数据库查询异常
     """
     try:
-        message_task = db.query(MessageTask).filter(MessageTask.id == task_id).first()
+        message_task = await task_repo.get_task(db, task_id)
         if not message_task:
             raise HTTPException(status_code=404, detail="Message task not found")
         return success_response(data=message_task)
@@ -109,7 +104,6 @@ async def create_message_task(
     
     参数:
         task_data: 消息任务创建数据
-        db: 数据库会话
         current_user: 当前认证用户
         
     返回:
@@ -117,9 +111,8 @@ async def create_message_task(
         400: 请求数据验证失败
         500: 数据库操作异常
     """
-    db=DB.get_session()
     try:
-        db_task = MessageTask(
+        db_task = await task_repo.create_task(dict(
             message_template=task_data.message_template,
             web_hook_url=task_data.web_hook_url,
             cron_exp=task_data.cron_exp,
@@ -127,13 +120,9 @@ async def create_message_task(
             message_type=task_data.message_type,
             name=task_data.name,
             status=task_data.status if task_data.status is not None else 0
-        )
-        db.add(db_task)
-        db.commit()
-        # db.refresh(db_task)
+        ))
         return success_response(data=db_task)
     except Exception as e:
-        db.rollback()
         print_error(e)
         return error_response(code=500, message=str(e))
 
@@ -143,14 +132,12 @@ async def update_message_task(
     task_data: MessageTaskCreate = Body(...),
     current_user: dict = Depends(get_current_user)
 ):
-    db=DB.get_session()
     """
     更新消息任务
     
     参数:
         task_id: 要更新的消息任务ID
         task_data: 消息任务更新数据
-        db: 数据库会话
         current_user: 当前认证用户
         
     返回:
@@ -160,29 +147,13 @@ async def update_message_task(
         500: 数据库操作异常
     """
     try:
-        db_task = db.query(MessageTask).filter(MessageTask.id == task_id).first()
+        # 只更新不为None的字段
+        db_task = await task_repo.update_task(task_id, task_data.model_dump(
+            include={"message_template", "web_hook_url", "mps_id", "status", "cron_exp", "message_type", "name"}))
         if not db_task:
             raise HTTPException(status_code=404, detail="Message task not found")
-        
-        if task_data.message_template is not None:
-            db_task.message_template = task_data.message_template
-        if task_data.web_hook_url is not None:
-            db_task.web_hook_url = task_data.web_hook_url
-        if task_data.mps_id is not None:
-            db_task.mps_id = task_data.mps_id
-        if task_data.status is not None:
-            db_task.status = task_data.status
-        if task_data.cron_exp is not None:
-            db_task.cron_exp = task_data.cron_exp
-        if task_data.message_type is not None:
-            db_task.message_type = task_data.message_type
-        if task_data.name is not None:
-            db_task.name = task_data.name
-        db.commit()
-        db.refresh(db_task)
         return success_response(data=db_task)
     except Exception as e:
-        db.rollback()
         return error_response(code=500, message=str(e))
 
 @router.delete("/{task_id}",summary="删除消息任务")
@@ -195,7 +166,6 @@ async def delete_message_task(
     
     参数:
         task_id: 要删除的消息任务ID
-        db: 数据库会话
         current_user: 当前认证用户
         
     返回:
@@ -203,15 +173,9 @@ async def delete_message_task(
         404: 消息任务不存在
         500: 数据库操作异常
     """
-    db=DB.get_session()
     try:
-        db_task = db.query(MessageTask).filter(MessageTask.id == task_id).first()
-        if not db_task:
+        if not await task_repo.delete_task(task_id):
             raise HTTPException(status_code=404, detail="Message task not found")
-        
-        db.delete(db_task)
-        db.commit()
         return success_response(message="Message task deleted successfully")
     except Exception as e:
-        db.rollback()
         return error_response(code=500, message=str(e))
\ No newline at end of file
@@ -3,12 +3,18 @@ from core.auth import get_current_user
 from core.db import DB
 from core.wx import search_Biz
 from .base import success_response, error_response
-from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from core.async_db import ADB
+from core.repo import feed as feed_repo
 from core.config import cfg
 from core.res import save_avatar_locally
+from core.materializer import feed_changed
 router = APIRouter(prefix=f"/mps", tags=["公众号管理"])
-def UpdateArticle(art:dict):
-            return DB.add_article(art)
+from core.wx.base import batch_callback
+@batch_callback
+def UpdateArticle(arts:list):
+            return DB.add_articles(arts)
 @router.get("/search/{kw}", summary="搜索公众号")
 async def search_mp(
     kw: str = "",
@@ -16,9 +22,9 @@ async def search_mp(
     offset: int = 0,
     current_user: dict = Depends(get_current_user)
 ):
-    session = DB.get_session()
     try:
-        result = search_Biz(kw)
+        # 搜索请求微信接口，在线程池中执行
+        result = await run_in_threadpool(search_Biz,kw)
         data={
             'list':result.get('list'),
             'page':{
@@ -43,16 +49,11 @@ async def get_mps(
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
     kw: str = Query(""),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    session: AsyncSession = Depends(ADB.session_dependency)
 ):
-    session = DB.get_session()
     try:
-        from core.models.feed import Feed
-        query = session.query(Feed)
-        if kw:
-            query = query.filter(Feed.mp_name.ilike(f"%{kw}%"))
-        total = query.count()
-        mps = query.order_by(Feed.created_at.desc()).limit(limit).offset(offset).all()
+        mps, total = await feed_repo.list_feeds(session, limit, offset, kw)
         return success_response({
             "list": [{
                 "id": mp.id,
@@ -84,10 +85,9 @@ async def update_mps(
      mp_id: str,
     current_user: dict = Depends(get_current_user)
 ):
-    session = DB.get_session()
     try:
-        from core.models.feed import Feed
-        mp = session.query(Feed).filter(Feed.id == mp_id).first()
+        async with ADB.session() as session:
+            mp = await feed_repo.get_feed(session, mp_id)
         if not mp:
            return error_response(
                     code=40401,
@@ -104,9 +104,12 @@ async def update_mps(
             
 
         from core.wx import WxGather
-        wx=WxGather().Model()
-        wx.get_Articles(mp.faker_id,Mps_id=mp.id,Mps_title=mp.mp_name,CallBack=UpdateArticle)
+        from core.wx.governor import INTERACTIVE
+        wx=WxGather().Model(priority=INTERACTIVE,incremental=False)
+        # 抓取耗时较长，在线程池中执行，不占用数据库连接
+        await run_in_threadpool(wx.get_Articles,mp.faker_id,Mps_id=mp.id,Mps_title=mp.mp_name,CallBack=UpdateArticle)
         result=wx.articles
+        feed_changed(mp.id)
 
         return success_response({
             "time_span":time_span,
@@ -128,11 +131,10 @@ async def update_mps(
 async def get_mp(
     mp_id: str,
     # current_user: dict = Depends(get_current_user)
+    session: AsyncSession = Depends(ADB.session_dependency)
 ):
-    session = DB.get_session()
     try:
-        from core.models.feed import Feed
-        mp = session.query(Feed).filter(Feed.id == mp_id).first()
+        mp = await feed_repo.get_feed(session, mp_id)
         if not mp:
             raise HTTPException(
                 status_code=status.HTTP_201_CREATED,
@@ -162,50 +164,23 @@ async def add_mp(
     mp_intro: str = Body(None, max_length=255),
     current_user: dict = Depends(get_current_user)
 ):
-    session = DB.get_session()
     try:
-        from core.models.feed import Feed
-        import time
-        now = datetime.now()
-        
         import base64
         mpx_id = base64.b64decode(mp_id).decode("utf-8")
-        local_avatar_path = f"{save_avatar_locally(avatar)}"
-        
-        # 检查公众号是否已存在
-        existing_feed = session.query(Feed).filter(Feed.faker_id == mp_id).first()
-        
-        if existing_feed:
-            # 更新现有记录
-            existing_feed.mp_name = mp_name
-            existing_feed.mp_cover = local_avatar_path
-            existing_feed.mp_intro = mp_intro
-            existing_feed.updated_at = now
-        else:
-            # 创建新的Feed记录
-            new_feed = Feed(
-                id=f"MP_WXS_{mpx_id}",
-                mp_name=mp_name,
-                mp_cover= local_avatar_path,
-                mp_intro=mp_intro,
-                status=1,  # 默认启用状态
-                created_at=now,
-                updated_at=now,
-                faker_id=mp_id,
-                update_time=0,
-                sync_time=0,
-            )
-            session.add(new_feed)
-           
-        session.commit()
+        # 下载头像在线程池中执行
+        local_avatar_path = f"{await run_in_threadpool(save_avatar_locally,avatar)}"
         
-        feed = existing_feed if existing_feed else new_feed
+        # 已存在时更新名称、头像和简介，否则创建新的Feed记录
+        feed, created = await feed_repo.save_feed(f"MP_WXS_{mpx_id}", mp_id, mp_name, local_avatar_path, mp_intro)
          #在这里实现第一次添加获取公众号文章
-        if not existing_feed:
+        if created:
             from core.queue import TaskQueue
             from core.wx import WxGather
             Max_page=int(cfg.get("max_page","2"))
-            TaskQueue.add_task( WxGather().Model().get_Articles,faker_id=feed.faker_id,Mps_id=feed.id,CallBack=UpdateArticle,MaxPage=Max_page,Mps_title=mp_name)
+            feed_id=feed.id
+            TaskQueue.add_task( WxGather().Model(incremental=False).get_Articles,faker_id=feed.faker_id,Mps_id=feed.id,CallBack=UpdateArticle,MaxPage=Max_page,Mps_title=mp_name,Over_CallBack=lambda wx:feed_changed(feed_id))
+        else:
+            feed_changed(feed.id)
             
         return success_response({
             "id": feed.id,
@@ -217,7 +192,6 @@ async def add_mp(
             "created_at": feed.created_at.isoformat()
         })
     except Exception as e:
-        session.rollback()
         print(f"添加公众号错误: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_201_CREATED,
@@ -233,11 +207,8 @@ async def delete_mp(
     mp_id: str,
     current_user: dict = Depends(get_current_user)
 ):
-    session = DB.get_session()
     try:
-        from core.models.feed import Feed
-        mp = session.query(Feed).filter(Feed.id == mp_id).first()
-        if not mp:
+        if not await feed_repo.delete_feed(mp_id):
             raise HTTPException(
                 status_code=status.HTTP_201_CREATED,
                 detail=error_response(
@@ -245,15 +216,11 @@ async def delete_mp(
                     message="订阅号不存在"
                 )
             )
-        
-        session.delete(mp)
-        session.commit()
         return success_response({
             "message": "订阅号删除成功",
             "id": mp_id
         })
     except Exception as e:
-        session.rollback()
         print(f"删除订阅号错误: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_201_CREATED,
@@ -1,17 +1,15 @@
 from fastapi import APIRouter, Request, HTTPException
-import httpx
+from core.http import get_async_client
 from fastapi.responses import Response
 import os
 import hashlib
 import time
 import json
 from core.config import cfg
+from core.cache import get_cache, atomic_write
 CACHE_DIR = cfg.get("cache.dir","data/cache")
 CACHE_TTL = 3600  # 缓存过期时间1小时
 
-if not os.path.exists(CACHE_DIR):
-    os.makedirs(CACHE_DIR)
-
 router = APIRouter(prefix="/res", tags=["资源反向代理"])
 @router.api_route("/logo/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH"], operation_id="reverse_proxy_logo")
 async def reverse_proxy(request: Request, path: str):
@@ -32,7 +30,8 @@ async def reverse_proxy(request: Request, path: str):
     cache_filename = os.path.join(CACHE_DIR, hashlib.sha256(cache_key).hexdigest())
     
     # 检查缓存是否存在且有效
-    if os.path.exists(cache_filename):
+    cache = get_cache("image")
+    if cache.get(cache_filename):
         file_mtime = os.path.getmtime(cache_filename)
         if time.time() - file_mtime < CACHE_TTL:
             with open(cache_filename, 'rb') as f:
@@ -58,12 +57,11 @@ async def reverse_proxy(request: Request, path: str):
     
     target_url = path
     
-    client = httpx.AsyncClient()
+    client = get_async_client()
     request_data = await request.body()
     headers = dict(request.headers)
     headers.pop("host", host)
     headers.pop("referer", None)
-    print(headers)
     resp = await client.request(
         method=request.method,
         url=target_url,
@@ -76,14 +74,9 @@ async def reverse_proxy(request: Request, path: str):
     headers = dict(resp.headers)
     media_type = resp.headers.get("Content-Type")
     try:
-        # 缓存响应
-        with open(cache_filename, 'wb') as f:
-            f.write(content)
-        
-        # 缓存响应头
-        headers_filename = cache_filename + ".headers"
-        with open(headers_filename, 'w', encoding='utf-8') as f:
-            json.dump(headers, f)
+        # 先写响应头，再原子写入响应内容并登记到缓存
+        atomic_write(cache_filename + ".headers", json.dumps(headers).encode('utf-8'))
+        cache.write_bytes(cache_filename, content)
     except Exception as e:
         print(f"缓存响应失败: {str(e)}")    
     return Response(
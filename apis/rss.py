@@ -1,12 +1,19 @@
 from fastapi import APIRouter, Depends, Query, HTTPException, Request,Response
 from fastapi import status
-from fastapi.responses import Response
+from fastapi.responses import Response,StreamingResponse
 from core.db import DB
+from core.async_db import ADB
+from core.repo import feed as feed_repo
+from starlette.concurrency import run_in_threadpool
 from core.rss import RSS
-from core.models.feed import Feed
+from core.materializer import materializer
+import core.compress as compress
+from core.cache import get_cache
+from core.pagination import next_cursor,decode_cursor,InvalidCursor
 from .base import success_response, error_response
 from core.auth import get_current_user
 from core.config import cfg
+import os
 
 def verify_rss_access(current_user: dict = Depends(get_current_user)):
     """
@@ -34,7 +41,7 @@ async def get_rss_source(
     offset: int = Query(0, ge=0),
     # current_user: dict = Depends(verify_rss_access)
 ):
-    return await get_mp_articles_rss(request=request,feed_id=feed_id, limit=limit,offset=offset, is_update=True)
+    return await get_mp_articles_rss(request=request,feed_id=feed_id, limit=limit,offset=offset,cursor=None)
 
 
 
@@ -47,28 +54,25 @@ async def update_rss_feeds(
     offset: int = Query(0, ge=0),
     # current_user: dict = Depends(get_current_user)
 ):
-    return await get_rss_feeds(request=request, limit=limit,offset=offset, is_update=True)
+    return await get_rss_feeds(request=request, limit=limit,offset=offset,cursor=None, is_update=True)
 
 @router.get("", summary="获取RSS订阅列表")
 async def get_rss_feeds(
     request: Request,
     limit: int = Query(100, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: str = Query(None, description="上一页的下一页游标，传入时忽略offset"),
     is_update:bool=False,
     # current_user: dict = Depends(get_current_user)
 ):
-    rss=RSS(name=f'all_{limit}_{offset}')
-    rss_xml=rss.get_rss()
-    if rss_xml is not None  and is_update==False:
-         return Response(
-            content=rss_xml,
-            media_type="application/xml"
-        )
-    session = DB.get_session()
+    rss=RSS(name=f'all_{limit}_{RSS.page_slot(offset,cursor)}')
+    if is_update==False and get_cache("rss").get(rss.rss_file):
+         return compress.file_response(rss.rss_file,request,media_type="application/xml")
     try:
-        total = session.query(Feed).count()
-        feeds = session.query(Feed).order_by(Feed.created_at.desc()).limit(limit).offset(offset).all()
+        async with ADB.session() as session:
+            feeds = await feed_repo.page_feeds(session,limit,offset,cursor)
         rss_domain=cfg.get("rss.base_url",request.base_url)
+        next_page=next_cursor(feeds,limit,"created_at")
         # 转换为RSS格式数据
         rss_list = [{
             "id": str(feed.id),
@@ -79,12 +83,16 @@ async def get_rss_feeds(
         } for feed in feeds]
         
         # 生成RSS XML
-        rss_xml = rss.generate_rss(rss_list, title="WeRSS订阅",link=rss_domain)
-        
-        return Response(
-            content=rss_xml,
+        return StreamingResponse(
+            rss.stream_rss(rss_list, title="WeRSS订阅",link=rss_domain,
+                next_link=f"{rss_domain}rss?limit={limit}&cursor={next_page}" if next_page else None),
             media_type="application/xml"
         )
+    except InvalidCursor as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error_response(code=40001,message=str(e))
+        )
     except Exception as e:
         print(f"获取RSS订阅列表错误: {str(e)}")
         raise HTTPException(
@@ -96,11 +104,12 @@ async def get_rss_feeds(
         )
 
 @router.get("/feed/{content_id}", summary="获取缓存的文章内容")
-async def get_rss_feed(content_id: str):
+async def get_rss_feed(request: Request,content_id: str):
     rss = RSS()
-    content = rss.get_cached_content(content_id)
+    # 缓存未命中时从数据库读取并生成阅读页(在线程池中执行，不阻塞其他请求)
+    page = await run_in_threadpool(rss.content_page,content_id)
       
-    if content is None:
+    if page is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=error_response(
@@ -108,37 +117,7 @@ async def get_rss_feed(content_id: str):
                 message="文章内容未找到"
             )
         )
-    title=content['title']
-    html='''
-    <!DOCTYPE html>
-    <html lang="zh-CN">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <meta http-equiv="X-UA-Compatible" content="ie=edge">
-        <title>{title}</title>
-        </head>
-    <body>
-    <center>
-    <h1 style="text-align:center;">{title}</h1>
-    <div class="author">来源:{source}</div>
-    <div class="author">发布时间:{publish_time}</div>
-    <div class="copyright">
-        <p>
-        本文章仅用于学习和交流目的，不代表本网站观点和立场，如涉及版权问题，请及时联系我们删除。
-        </p>
-    </div>
-    <div id=content>{text}</div>
-    </center>
-    </body>
-    </html>
-    '''
-    text=rss.add_logo_prefix_to_urls(content['content'])
-    html=html.format(title=title,text=text,source=content['mp_name'],publish_time=content['publish_time'])
-    return Response(
-            content=html,
-            media_type="text/html"
-        )
+    return compress.file_response(page,request,media_type="text/html")
 def UpdateArticle(art:dict):
             return DB.add_article(art)
 
@@ -160,7 +139,7 @@ async def update_rss_feeds(
         # wx.get_Articles(mp.faker_id,Mps_id=mp.id,CallBack=UpdateArticle)
         # result=wx.articles
 
-        return await get_mp_articles_rss(request=request,feed_id=feed_id, limit=limit,offset=offset, is_update=True)
+        return await get_mp_articles_rss(request=request,feed_id=feed_id, limit=limit,offset=offset,cursor=None)
 
 @router.get("/{feed_id}", summary="获取公众号文章RSS")
 async def get_mp_articles_rss(
@@ -168,67 +147,55 @@ async def get_mp_articles_rss(
     feed_id: str,
     limit: int = Query(100, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    is_update:bool=False
+    cursor: str = Query(None, description="RSS中atom:link rel=next给出的游标，传入时忽略offset"),
     # current_user: dict = Depends(get_current_user)
 ):
-    rss=RSS(name=f'{feed_id}_{limit}_{offset}')
-    rss_xml = rss.get_rss()
-    if rss_xml is not None and is_update==False:
-         return Response(
-            content=rss_xml,
-            media_type="application/xml"
-        )
-    session = DB.get_session()
     try:
-        from core.models.article import Article
-        
-        # 查询公众号信息
-        feed = session.query(Feed).filter(Feed.id == feed_id).first()
-        if not feed:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=error_response(
-                    code=40401,
-                    message="公众号不存在"
+        async with ADB.session() as session:
+            # 查询公众号信息
+            feed = await feed_repo.get_feed(session,feed_id)
+            if not feed:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=error_response(
+                        code=40401,
+                        message="公众号不存在"
+                    )
                 )
-            )
-        
-        # 查询文章列表
-        total = session.query(Article).filter(Article.mp_id == feed_id).count()
-        articles = session.query(Article).filter(Article.mp_id == feed_id)\
-            .order_by(Article.publish_time.desc()).limit(limit).offset(offset).all()
-        rss_domain=cfg.get("rss.base_url",request.base_url)
-        # 转换为RSS格式数据
-        import datetime
-        rss_list = [{
-            "id": str(article.id),
-            "title": article.title,
-            "link":  f"{rss_domain}rss/feed/{article.id}" if cfg.get("rss.local",False) else article.url,
-            "description": article.description if article.description != "" else article.title,
-            "content": article.content,
-            "updated": datetime.datetime.fromtimestamp(article.publish_time)
-        } for article in articles]
-        
-
-        # 缓存文章内容
-        for article in articles:
-            content_data = {
-                "id": article.id,
-                "title": article.title,
-                "content": article.content,
-                "publish_time": article.publish_time,
-                "mp_id": article.mp_id,
-                "mp_name": feed.mp_name
-            }
-            rss.cache_content(article.id, content_data)
-        
-        # 生成RSS XML
-        rss_xml = rss.generate_rss(rss_list, title=f"{feed.mp_name}",link=rss_domain,description=feed.mp_intro)
-        
-        return Response(
-            content=rss_xml,
-            media_type="application/xml"
+            rss_domain=cfg.get("rss.base_url",request.base_url)
+            # 缓存按公众号最新文章版本区分，新文章入库后自动失效
+            if cursor:
+                decode_cursor(cursor)
+            version=await session.run_sync(RSS.feed_version,feed,limit,offset,str(rss_domain),cursor)
+            headers=RSS.cache_headers(version)
+            if RSS.is_not_modified(request.headers,version):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED,headers=headers)
+            slot=RSS.page_slot(offset,cursor)
+            rss=RSS(name=f'{feed_id}_{limit}_{slot}_{version["tag"]}')
+            if get_cache("rss").get(rss.rss_file):
+                return compress.file_response(rss.rss_file,request,media_type="application/xml",headers=headers)
+            # 新版本尚未生成：交给后台重建，先返回上一次生成的文件(后台只重建offset分页)
+            stale=None if cursor else RSS.latest_cached(feed_id,limit,slot)
+            if stale is not None and materializer.enabled:
+                materializer.feed_changed(feed_id,str(rss_domain))
+                version=RSS.file_version(stale)
+                headers=RSS.cache_headers(version)
+                if RSS.is_not_modified(request.headers,version):
+                    return Response(status_code=status.HTTP_304_NOT_MODIFIED,headers=headers)
+                return compress.file_response(stale,request,media_type="application/xml",headers=headers)
+            # 只在这里查询本页文章ID，缺失的<item>片段在流式输出时(线程池中)补齐
+            items,next_link=await rss.feed_page_async(session,feed,rss_domain,limit,offset,cursor)
+    except InvalidCursor as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error_response(code=40001,message=str(e))
         )
     except Exception as e:
         print(f"获取公众号文章RSS错误:",e)
-        raise e
\ No newline at end of file
+        raise e
+    # 边查询边输出，内存占用与文章数量和正文大小无关
+    return StreamingResponse(
+        rss.stream_rss(items, title=f"{feed.mp_name}",link=rss_domain,description=feed.mp_intro,next_link=next_link),
+        media_type="application/xml",
+        headers=headers
+    )
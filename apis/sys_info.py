@@ -51,4 +51,48 @@ async def get_system_info(
         return error_response(
             code=50001,
             message=f"获取系统信息失败: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.get("/rate_limit", summary="获取微信请求速率调控状态")
+async def get_rate_limit(
+    current_user: dict = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """获取全局微信请求速率调控器的当前预算
+
+    Returns:
+        BaseResponse格式的速率信息，包括当前每分钟速率、剩余令牌、
+        流量控制冷却剩余时间、等待中的请求数等
+    """
+    from core.wx.governor import governor
+    return success_response(data=governor.state())
+
+@router.get("/cache", summary="获取磁盘缓存统计")
+async def get_cache_stats(
+    current_user: dict = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """获取各缓存区域(rss/item/content/image)的使用情况
+
+    Returns:
+        BaseResponse格式的缓存统计，包括占用大小、容量上限、
+        命中/未命中次数、命中率和淘汰次数
+    """
+    from core import cache
+    return success_response(data=cache.stats())
+
+@router.get("/db", summary="获取数据库连接池统计")
+async def get_db_stats(
+    current_user: dict = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """获取当前进程的数据库连接池使用情况，用于确定连接池大小
+
+    Returns:
+        BaseResponse格式的连接池统计，包括连接池大小、使用中/空闲连接数、峰值、
+        取连接的平均/p99/最大等待时间、超时次数、连接占用时间、
+        疑似泄漏(长时间未归还)的连接，SQLite单写模式下还包括写线程的排队与合并提交情况，
+        async为接口使用的异步连接池
+    """
+    from core.db import DB
+    from core.async_db import ADB
+    data = DB.pool_stats()
+    data["async"] = ADB.stats()
+    return success_response(data=data)
@@ -1,20 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from core.auth import get_current_user
-from core.db import DB
-from core.models import User as DBUser
+from core.async_db import ADB
+from core.repo import user as user_repo
 from core.auth import pwd_context
 import os
 from .base import success_response, error_response
 router = APIRouter(prefix="/user", tags=["用户管理"])
 
 @router.get("", summary="获取用户信息")
-async def get_user_info(current_user: dict = Depends(get_current_user)):
-    session = DB.get_session()
+async def get_user_info(
+    current_user: dict = Depends(get_current_user),
+    session: AsyncSession = Depends(ADB.session_dependency)
+):
     try:
-        user = session.query(DBUser).filter(
-            DBUser.username == current_user["username"]
-        ).first()
+        user = await user_repo.get_user(session, current_user["username"])
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -45,14 +47,12 @@ async def get_user_info(current_user: dict = Depends(get_current_user)):
 @router.put("", summary="修改用户资料")
 async def update_user_info(
     update_data: dict,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    session: AsyncSession = Depends(ADB.session_dependency)
 ):
     """修改用户基本信息(不包括密码)"""
-    session = DB.get_session()
     try:
-        user = session.query(DBUser).filter(
-            DBUser.username == current_user["username"]
-        ).first()
+        user = await user_repo.get_user(session, current_user["username"])
         if not user:
             from .base import error_response
             raise HTTPException(
@@ -74,16 +74,14 @@ async def update_user_info(
                 )
             )
             
+        values = {"updated_at": datetime.now()}
         if "is_active" in update_data:
-            user.is_active = bool(update_data["is_active"])
-        
-        user.updated_at = datetime.now()
-        session.commit()
+            values["is_active"] = bool(update_data["is_active"])
+        await user_repo.update_user(current_user["username"], **values)
         return success_response(message="更新成功")
     except HTTPException as e:
         raise e
     except Exception as e:
-        session.rollback()
         raise HTTPException(
             status_code=status.HTTP_406_NOT_ACCEPTABLE,
             detail=f"更新失败: {str(e)}"
@@ -93,10 +91,10 @@ async def update_user_info(
 @router.put("/password", summary="修改密码")
 async def change_password(
     password_data: dict,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    session: AsyncSession = Depends(ADB.session_dependency)
 ):
     """修改用户密码"""
-    session = DB.get_session()
     try:
         # 验证请求数据
         if "old_password" not in password_data or "new_password" not in password_data:
@@ -110,9 +108,7 @@ async def change_password(
             )
             
         # 获取用户
-        user = session.query(DBUser).filter(
-            DBUser.username == current_user["username"]
-        ).first()
+        user = await user_repo.get_user(session, current_user["username"])
         if not user:
             from .base import error_response
             raise HTTPException(
@@ -123,8 +119,8 @@ async def change_password(
                 )
             )
             
-        # 验证旧密码
-        if not pwd_context.verify(password_data["old_password"], user.password_hash):
+        # 验证旧密码(bcrypt计算较慢，在线程池中执行)
+        if not await run_in_threadpool(pwd_context.verify, password_data["old_password"], user.password_hash):
             from .base import error_response
             raise HTTPException(
                 status_code=status.HTTP_200_OK,
@@ -147,9 +143,8 @@ async def change_password(
             )
             
         # 更新密码
-        user.password_hash = pwd_context.hash(new_password)
-        user.updated_at = datetime.now()
-        session.commit()
+        password_hash = await run_in_threadpool(pwd_context.hash, new_password)
+        await user_repo.update_user(current_user["username"], password_hash=password_hash, updated_at=datetime.now())
         
         # 清除用户缓存，确保新密码立即生效
         from core.auth import clear_user_cache
@@ -161,7 +156,6 @@ async def change_password(
     except HTTPException:
         raise
     except Exception as e:
-        session.rollback()
         raise HTTPException(
             status_code=status.HTTP_406_NOT_ACCEPTABLE,
             detail=f"密码修改失败: {str(e)}"
@@ -185,16 +179,9 @@ async def upload_avatar(
             buffer.write(await file.read())
         
         # 更新用户头像字段
-        session = DB.get_session()
         try:
-            user = session.query(DBUser).filter(
-                DBUser.username == current_user["username"]
-            ).first()
-            if user:
-                user.avatar = f"/{avatar_path}/{current_user['username']}.jpg"
-                session.commit()
+            await user_repo.update_user(current_user["username"], avatar=f"/{avatar_path}/{current_user['username']}.jpg")
         except Exception as e:
-            session.rollback()
             raise HTTPException(
                 status_code=status.HTTP_406_NOT_ACCEPTABLE,
                 detail=f"更新用户头像失败: {str(e)}"
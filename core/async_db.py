@@ -0,0 +1,139 @@
+import importlib.util
+from contextlib import asynccontextmanager
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from starlette.concurrency import run_in_threadpool
+from core.config import cfg
+from core.db import DB, sqlite_pragmas
+from core.print import print_warning
+# 接口使用的异步数据库访问：查询在异步驱动(aiosqlite/asyncmy/asyncpg)上执行，不阻塞事件循环
+# 写操作仍交给 Db.write(SQLite下由单写线程合并提交)，在线程池中等待结果
+
+# 同步驱动 -> 异步驱动(模块名)
+ASYNC_DRIVERS = {
+    "sqlite": ("sqlite+aiosqlite", "aiosqlite"),
+    "mysql": ("mysql+asyncmy", "asyncmy"),
+    "postgresql": ("postgresql+asyncpg", "asyncpg"),
+}
+
+def async_url(con_str: str):
+    """把同步连接串转换为异步驱动的连接串，数据库不支持或驱动未安装时返回None"""
+    scheme, sep, rest = str(con_str or "").partition("://")
+    if not sep:
+        return None
+    driver = ASYNC_DRIVERS.get(scheme.split("+")[0])
+    if driver is None or importlib.util.find_spec(driver[1]) is None:
+        return None
+    return f"{driver[0]}://{rest}"
+
+class _ThreadSession:
+    """异步驱动不可用时使用：同步会话的操作放到线程池中执行，用法与AsyncSession相同(只实现用到的方法)"""
+    def __init__(self, session):
+        self.sync_session = session
+
+    async def execute(self, *args, **kwargs):
+        # 在线程内读出全部结果，与AsyncSession.execute一致
+        frozen = await run_in_threadpool(lambda: self.sync_session.execute(*args, **kwargs).freeze())
+        return frozen()
+
+    async def scalar(self, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, *args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, *args, **kwargs)
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+class AsyncDb:
+    """异步数据库访问
+    用法:
+        async with ADB.session() as session: rows = (await session.execute(stmt)).all()
+        session: AsyncSession = Depends(ADB.session_dependency)
+    """
+    def __init__(self):
+        self.engine = None
+        self.monitor = None
+        self._session_factory = None
+
+    def init(self, con_str: str) -> None:
+        self.engine = None
+        url = async_url(con_str) if cfg.get("db_pool.async_enabled", True) else None
+        if url is None:
+            if cfg.get("db_pool.async_enabled", True):
+                print_warning("未安装数据库异步驱动(aiosqlite/asyncmy/asyncpg)，接口查询改为在线程池中执行")
+            return
+        from core.dbpool import InstrumentedAsyncQueuePool, PoolMonitor
+        if url.startswith("sqlite"):
+            busy_timeout = int(cfg.get("sqlite.busy_timeout", 5000))
+            self.engine = create_async_engine(url, poolclass=InstrumentedAsyncQueuePool,
+                                              pool_size=int(cfg.get("sqlite.pool_size", 5)),
+                                              max_overflow=int(cfg.get("sqlite.max_overflow", 10)),
+                                              pool_timeout=int(cfg.get("db_pool.pool_timeout", 30)),
+                                              connect_args={"timeout": busy_timeout / 1000})
+            pragmas = sqlite_pragmas(con_str)
+
+            @event.listens_for(self.engine.sync_engine, "connect")
+            def set_pragmas(dbapi_connection, connection_record):
+                cursor = dbapi_connection.cursor()
+                try:
+                    for sql in pragmas:
+                        cursor.execute(sql)
+                finally:
+                    cursor.close()
+        else:
+            self.engine = create_async_engine(url, poolclass=InstrumentedAsyncQueuePool,
+                                              pool_size=int(cfg.get("db_pool.pool_size", 10)),
+                                              max_overflow=int(cfg.get("db_pool.max_overflow", 20)),
+                                              pool_timeout=int(cfg.get("db_pool.pool_timeout", 30)),
+                                              pool_recycle=3600, pool_pre_ping=True)
+        self.monitor = PoolMonitor(self.engine.sync_engine)
+        self._session_factory = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def session(self):
+        """异步会话，退出时关闭(归还连接)，出现异常时回滚"""
+        if self._session_factory is None:
+            session = _ThreadSession(DB.get_session())
+        else:
+            session = self._session_factory()
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
+    async def session_dependency(self):
+        """FastAPI依赖项，每个请求一个异步会话，请求结束时关闭"""
+        async with self.session() as session:
+            yield session
+
+    async def run(self, fn, *args, **kwargs):
+        """在新会话中执行同步查询函数 fn(session, ...)，用于复用已有的同步查询代码"""
+        async with self.session() as session:
+            return await session.run_sync(fn, *args, **kwargs)
+
+    async def write(self, fn):
+        """执行写操作fn(session)并提交，返回fn的返回值
+        写操作交给Db.write(SQLite下由单写线程排队，避免与同步写入争抢文件锁)，在线程池中等待
+        """
+        return await run_in_threadpool(DB.write, fn)
+
+    def stats(self) -> dict:
+        if self.monitor is None:
+            return {"driver": None}
+        data = self.monitor.stats()
+        data["driver"] = self.engine.dialect.driver
+        return data
+
+# 全局异步数据库实例
+ADB = AsyncDb()
+ADB.init(cfg.get("db"))
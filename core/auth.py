@@ -51,9 +51,9 @@ def get_user(username: str) -> Optional[DBUser]:
     if username in _user_cache:
         return _user_cache[username]
         
-    session = DB.get_session()
     try:
-        user = session.query(DBUser).filter(DBUser.username == username).first()
+        with DB.session_scope() as session:
+            user = session.query(DBUser).filter(DBUser.username == username).first()
         if user:
             # 存入缓存
             _user_cache[username] = user
@@ -62,6 +62,22 @@ def get_user(username: str) -> Optional[DBUser]:
         print(f"获取用户错误: {str(e)}")
         return None
         
+async def get_user_async(username: str) -> Optional[DBUser]:
+    """get_user的异步版本，供接口依赖使用，查询不阻塞事件循环"""
+    if username in _user_cache:
+        return _user_cache[username]
+    from core.async_db import ADB
+    from core.repo import user as user_repo
+    try:
+        async with ADB.session() as session:
+            user = await user_repo.get_user(session, username)
+        if user:
+            _user_cache[username] = user
+        return user
+    except Exception as e:
+        print(f"获取用户错误: {str(e)}")
+        return None
+
 def clear_user_cache(username: str):
     """清除指定用户的缓存"""
     if username in _user_cache:
@@ -99,7 +115,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     except jwt.PyJWTError:
         raise credentials_exception
     
-    user = get_user(username)
+    user = await get_user_async(username)
     if user is None:
         raise credentials_exception
         
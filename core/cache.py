@@ -0,0 +1,294 @@
+import os
+import json
+import time
+import atexit
+import tempfile
+import threading
+from core.config import cfg
+from core.print import print_warning
+# 磁盘缓存管理：按区域(rss/item/content/image)限制总大小，超出时按LRU/LFU淘汰
+# 索引文件记录每个缓存文件的大小与访问情况，启动时不必遍历目录
+
+INDEX_FILE = ".index.json"
+
+def atomic_write(path: str, data: bytes):
+    """先写临时文件再原子替换，读者不会读到写了一半的文件"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+class DiskCache:
+    """单个缓存目录
+    缓存文件的压缩副本等附属文件(siblings)与主文件一起计量和淘汰
+    """
+    def __init__(self, name: str, directory: str, max_bytes: int, policy: str = "lru", siblings: tuple = ()):
+        self.name = name
+        self.directory = os.path.normpath(directory)
+        self.max_bytes = int(max_bytes)
+        self.policy = policy
+        self.siblings = tuple(siblings)
+        self.entries = {}
+        self.total = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._removed = set()
+        self._dirty = False
+        self._flushed = time.monotonic()
+        self._lock = threading.RLock()
+        os.makedirs(self.directory, exist_ok=True)
+        self._load()
+
+    def _rel(self, path: str):
+        """缓存目录内的相对路径，不在目录内时返回None"""
+        path = os.path.normpath(path)
+        if not path.startswith(self.directory + os.sep):
+            return None
+        return os.path.relpath(path, self.directory)
+
+    def _size(self, path: str) -> int:
+        size = 0
+        for p in [path] + [path + s for s in self.siblings]:
+            try:
+                size += os.stat(p).st_size
+            except OSError:
+                pass
+        return size
+
+    def get(self, path: str):
+        """查询缓存文件，命中时更新访问记录
+        Returns:
+            命中时返回path，否则返回None
+        """
+        rel = self._rel(path)
+        exists = os.path.exists(path)
+        with self._lock:
+            if exists:
+                self.hits += 1
+                if rel is not None:
+                    entry = self.entries.get(rel)
+                    if entry is None:
+                        # 其他进程写入的文件
+                        entry = self._add(rel, self._size(path))
+                    entry[1] = time.time()
+                    entry[2] += 1
+                    self._dirty = True
+            else:
+                self.misses += 1
+                if rel is not None and rel in self.entries:
+                    self._drop(rel)
+        self._maybe_flush()
+        return path if exists else None
+
+    def last_access(self, path: str) -> float:
+        """缓存文件最近一次命中的时间，未登记时为文件修改时间，文件不存在时为0"""
+        rel = self._rel(path)
+        with self._lock:
+            entry = self.entries.get(rel) if rel is not None else None
+            if entry is not None:
+                return entry[1]
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
+            return 0
+
+    def put(self, path: str):
+        """登记已写入(原子替换完成)的缓存文件，超出容量时淘汰"""
+        rel = self._rel(path)
+        if rel is None:
+            return
+        size = self._size(path)
+        with self._lock:
+            if rel in self.entries:
+                self._drop(rel)
+            self._add(rel, size)
+            self._removed.discard(rel)
+            self._evict()
+        self._maybe_flush()
+
+    def write_bytes(self, path: str, data: bytes):
+        """原子写入缓存文件并登记"""
+        atomic_write(path, data)
+        self.put(path)
+
+    def discard(self, path: str):
+        """删除缓存文件及附属文件"""
+        for p in [path] + [path + s for s in self.siblings]:
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+        rel = self._rel(path)
+        if rel is None:
+            return
+        with self._lock:
+            if rel in self.entries:
+                self._drop(rel)
+            self._removed.add(rel)
+            self._dirty = True
+
+    def clear(self):
+        """删除目录下全部缓存文件(不含正在写入的临时文件)"""
+        with self._lock:
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    if name.startswith(".") or name.endswith(".tmp"):
+                        continue
+                    try:
+                        os.remove(os.path.join(root, name))
+                    except OSError:
+                        pass
+            self.entries = {}
+            self.total = 0
+            self._removed.clear()
+            self._dirty = False
+            self._flushed = time.monotonic()
+            atomic_write(os.path.join(self.directory, INDEX_FILE), b'{"entries":{}}')
+
+    def _add(self, rel: str, size: int) -> list:
+        entry = [size, time.time(), 0]
+        self.entries[rel] = entry
+        self.total += size
+        self._dirty = True
+        return entry
+
+    def _drop(self, rel: str):
+        entry = self.entries.pop(rel, None)
+        if entry is not None:
+            self.total -= entry[0]
+            self._dirty = True
+
+    def _evict(self):
+        if self.max_bytes <= 0 or self.total <= self.max_bytes:
+            return
+        # 淘汰到容量的90%，避免每次写入都触发淘汰
+        target = self.max_bytes * 0.9
+        if self.policy == "lfu":
+            order = sorted(self.entries.items(), key=lambda kv: (kv[1][2], kv[1][1]))
+        else:
+            order = sorted(self.entries.items(), key=lambda kv: kv[1][1])
+        for rel, _ in order:
+            if self.total <= target:
+                break
+            self.discard(os.path.join(self.directory, rel))
+            self.evictions += 1
+
+    def _load(self):
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                entries = json.load(f).get("entries", {})
+        except FileNotFoundError:
+            entries = self._scan()
+        except Exception as e:
+            print_warning(f"缓存索引损坏，重新扫描[{self.name}]: {e}")
+            entries = self._scan()
+        self.entries = {rel: list(entry) for rel, entry in entries.items()}
+        self.total = sum(entry[0] for entry in self.entries.values())
+        self._dirty = True
+
+    def _scan(self) -> dict:
+        """没有索引文件时遍历一次目录建立索引"""
+        entries = {}
+        sibling_suffixes = self.siblings
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                # 索引等以.开头的文件不属于缓存条目
+                if name.startswith(".") or name.endswith(".tmp"):
+                    continue
+                if sibling_suffixes and name.endswith(sibling_suffixes):
+                    continue
+                path = os.path.join(root, name)
+                rel = os.path.relpath(path, self.directory)
+                entries[rel] = [self._size(path), os.stat(path).st_mtime, 0]
+        return entries
+
+    def _maybe_flush(self):
+        if self._dirty and time.monotonic() - self._flushed >= float(cfg.get("cache.index_interval", 60)):
+            self.flush()
+
+    def flush(self):
+        """保存索引文件，合并其他进程登记的条目"""
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        with self._lock:
+            try:
+                with open(index_path, "r", encoding="utf-8") as f:
+                    on_disk = json.load(f).get("entries", {})
+            except Exception:
+                on_disk = {}
+            for rel, entry in on_disk.items():
+                if rel not in self.entries and rel not in self._removed:
+                    self.entries[rel] = list(entry)
+                    self.total += entry[0]
+            self._removed.clear()
+            self._evict()
+            data = json.dumps({"entries": self.entries}, separators=(",", ":"))
+            self._dirty = False
+            self._flushed = time.monotonic()
+        atomic_write(index_path, data.encode("utf-8"))
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "directory": self.directory,
+                "policy": self.policy,
+                "entries": len(self.entries),
+                "size_bytes": self.total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+            }
+
+# 区域: (目录, 容量配置, 默认容量MB, 附属文件后缀)
+REGIONS = {
+    "rss": ("static/cache/rss", "cache.rss_max_mb", 200, (".gz", ".br")),
+    "item": ("static/cache/item", "cache.item_max_mb", 500, ()),
+    "content": ("static/cache/content", "cache.content_max_mb", 500, (".gz", ".br")),
+    "image": (None, "cache.image_max_mb", 1024, (".headers",)),
+}
+
+_lock = threading.Lock()
+_caches = {}
+
+def get_cache(name: str) -> DiskCache:
+    """获取指定区域的缓存管理器"""
+    with _lock:
+        cache = _caches.get(name)
+        if cache is None:
+            directory, key, default_mb, siblings = REGIONS[name]
+            if directory is None:
+                directory = cfg.get("cache.dir", "data/cache")
+            cache = DiskCache(
+                name,
+                directory,
+                max_bytes=float(cfg.get(key, default_mb)) * 1024 * 1024,
+                policy=str(cfg.get("cache.policy", "lru")).lower(),
+                siblings=siblings,
+            )
+            _caches[name] = cache
+        return cache
+
+def stats() -> dict:
+    """全部缓存区域的统计"""
+    return {name: get_cache(name).stats() for name in REGIONS}
+
+@atexit.register
+def flush_all():
+    with _lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        try:
+            cache.flush()
+        except Exception:
+            pass
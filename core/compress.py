@@ -0,0 +1,140 @@
+import os
+import gzip
+import tempfile
+from starlette.middleware.gzip import GZipMiddleware
+from core.config import cfg
+# 预压缩产物：缓存文件写入时同时生成 .gz/.br，请求时按 Accept-Encoding 直接返回，不再逐次压缩
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+# 编码名称与文件后缀，按优先级排列
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+def enabled() -> bool:
+    return bool(cfg.get("http.compress", True))
+
+class ArtifactWriter:
+    """写缓存文件，同时生成压缩副本；全部写完后 commit 原子替换，失败或中断时 discard"""
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, self._tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        self._file = os.fdopen(fd, "wb")
+        self._gz_tmp = self._br_tmp = None
+        self._gz = self._br_file = self._br = None
+        if enabled():
+            fd, self._gz_tmp = tempfile.mkstemp(dir=directory, suffix=".gz.tmp")
+            # mtime固定为0，内容相同则压缩结果相同
+            self._gz = gzip.GzipFile(fileobj=os.fdopen(fd, "wb"), mode="wb", mtime=0,
+                                     compresslevel=int(cfg.get("http.gzip_level", 6)))
+            if BROTLI_AVAILABLE:
+                fd, self._br_tmp = tempfile.mkstemp(dir=directory, suffix=".br.tmp")
+                self._br_file = os.fdopen(fd, "wb")
+                self._br = brotli.Compressor(quality=int(cfg.get("http.brotli_quality", 9)))
+
+    def write(self, text: str):
+        data = text.encode("utf-8")
+        self._file.write(data)
+        if self._gz is not None:
+            self._gz.write(data)
+        if self._br is not None:
+            self._br_file.write(self._br.process(data))
+
+    def _close(self):
+        if self._gz is not None:
+            fileobj = self._gz.fileobj
+            self._gz.close()
+            fileobj.close()
+            self._gz = None
+        if self._br is not None:
+            self._br_file.write(self._br.finish())
+            self._br_file.close()
+            self._br = None
+        self._file.close()
+
+    def commit(self):
+        self._close()
+        # 先替换压缩副本，避免新的原文件配上旧的压缩副本
+        for tmp, ext in ((self._br_tmp, ".br"), (self._gz_tmp, ".gz")):
+            if tmp is not None:
+                os.replace(tmp, self.path + ext)
+            else:
+                remove(self.path + ext)
+        os.replace(self._tmp, self.path)
+        self._tmp = self._gz_tmp = self._br_tmp = None
+
+    def discard(self):
+        if not self._file.closed:
+            try:
+                self._close()
+            except Exception:
+                pass
+        for tmp in (self._tmp, self._gz_tmp, self._br_tmp):
+            if tmp is not None:
+                remove(tmp)
+        self._tmp = self._gz_tmp = self._br_tmp = None
+
+def remove(path: str, with_siblings: bool = False):
+    """删除文件，with_siblings 时一并删除压缩副本"""
+    paths = [path] + ([path + ext for _, ext in ENCODINGS] if with_siblings else [])
+    for p in paths:
+        try:
+            os.remove(p)
+        except OSError:
+            pass
+
+def accepted_encodings(accept_encoding: str) -> list:
+    """解析Accept-Encoding，返回客户端接受的编码(按服务端优先级)"""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0
+        if name:
+            accepted[name.strip().lower()] = q
+    return [name for name, _ in ENCODINGS
+            if accepted.get(name, accepted.get("*", 0)) > 0]
+
+def file_response(path: str, request, media_type: str, headers: dict = None):
+    """按Accept-Encoding返回预压缩副本，没有可用副本时返回原文件"""
+    from fastapi.responses import FileResponse
+    headers = dict(headers or {})
+    headers["Vary"] = "Accept-Encoding"
+    for name in accepted_encodings(request.headers.get("accept-encoding", "")):
+        sibling = path + dict(ENCODINGS)[name]
+        if os.path.exists(sibling):
+            headers["Content-Encoding"] = name
+            # 不同编码的表示使用不同的强ETag
+            if headers.get("ETag", "").endswith('"'):
+                headers["ETag"] = headers["ETag"][:-1] + f'-{name}"'
+            return FileResponse(sibling, media_type=media_type, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+def strip_encoding_tag(etag: str) -> str:
+    """去掉file_response附加在ETag上的编码后缀"""
+    for name, _ in ENCODINGS:
+        if etag.endswith(f'-{name}"'):
+            return etag[:-len(name) - 2] + '"'
+    return etag
+
+class ApiGZipMiddleware(GZipMiddleware):
+    """只压缩指定前缀(接口JSON)的动态响应，小于minimum_size的响应不压缩"""
+    def __init__(self, app, prefix: str = "/api", minimum_size: int = 1024, compresslevel: int = 6):
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.prefix = prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(self.prefix):
+            await super().__call__(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
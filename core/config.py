@@ -3,12 +3,25 @@ import sys
 import os
 import argparse
 from string import Template
+import re
+import threading
+import copy
+from types import MappingProxyType
+ENV_PATTERN = re.compile(r'\$\{([^}:]+)(?::-([^}]*))?\}')
 class Config: 
     config_path=None
     config={}
     def __init__(self,config_path=None):
         self.args=self.parse_args()
         self.config_path = config_path or self.args.config
+        # 配置快照：已替换环境变量并展开为点分key的只读字典，整体替换保证原子性
+        self._snapshot = MappingProxyType({})
+        self._file_key = None
+        self._lock = threading.Lock()
+        # 已提示过不存在的key
+        self._missing = set()
+        # 配置版本号，每次快照更新时递增，缓存可以以此为key
+        self.version = 0
         self.get_config()
     def parse_args(self):
         parser = argparse.ArgumentParser()
@@ -20,7 +33,7 @@ class Config:
     def save_config(self):
         with open(self.config_path, 'w', encoding='utf-8') as f:
             yaml.dump(self.config, f)
-        self.reload()
+        self.get_config()
     def replace_env_vars(self,data):
             if isinstance(data, dict):
                 return {k: self.replace_env_vars(v) for k, v in data.items()}
@@ -28,29 +41,58 @@ class Config:
                 return [self.replace_env_vars(item) for item in data]
             elif isinstance(data, str):
                 try:
-                    import re
                     # 匹配 ${VAR:-default} 或 ${VAR} 格式
-                    pattern = re.compile(r'\$\{([^}:]+)(?::-([^}]*))?\}')
                     def replace_match(match):
                         var_name = match.group(1)
                         default_value = match.group(2)
                         return os.getenv(var_name, default_value) if default_value is not None else os.getenv(var_name, '')
-                    return pattern.sub(replace_match, data)
+                    return ENV_PATTERN.sub(replace_match, data)
                 except:
                     return data
             return data
+    def _stat_key(self):
+        """配置文件的mtime/inode/大小，用于判断文件是否变化"""
+        try:
+            st = os.stat(self.config_path)
+            return (st.st_mtime_ns, st.st_ino, st.st_size)
+        except OSError:
+            return None
+    def _build_snapshot(self, data) -> dict:
+        """将配置树展开为 点分key -> 值 的字典，叶子值预先做类型转换"""
+        flat = {}
+        def walk(prefix, node):
+            if isinstance(node, dict):
+                flat[prefix] = node
+                for k, v in node.items():
+                    walk(f"{prefix}.{k}" if prefix else k, v)
+            else:
+                flat[prefix] = self.__fix(node)
+        if isinstance(data, dict):
+            for k, v in data.items():
+                walk(k, v)
+        return flat
     def get_config(self):
         try:
+            file_key = self._stat_key()
             with open(self.config_path, 'r', encoding='utf-8') as f:
                 config = yaml.safe_load(f)
+            resolved = self.replace_env_vars(config)
+            snapshot = MappingProxyType(self._build_snapshot(resolved))
+            with self._lock:
                 self.config = config
-                self._config = self.replace_env_vars(config)
-                return self.config
+                self._config = resolved
+                self._snapshot = snapshot
+                self._file_key = file_key
+                self.version += 1
+            return self.config
         except Exception as e:
             print(f"Error loading configuration file {self.config_path}: {e}")
             sys.exit(1)
     def reload(self):
-        self.config=self.get_config()
+        """配置文件发生变化(mtime/inode)时才重新解析"""
+        if self._stat_key() != self._file_key:
+            self.get_config()
+        return self.config
     def set(self,key,default:any=None):
         self.config[key] = default
         self.save_config()
@@ -71,24 +113,22 @@ class Config:
         except:
             return v
     def get(self,key,default:any=None):
-        _config=self.replace_env_vars(self.config)
-        
-        # 支持嵌套key访问
-        keys = key.split('.') if isinstance(key, str) else [key]
-        value = _config
         try:
-            for k in keys:
-                value = value[k]
-            val=self.__fix(value)
-            if val is None and default is not None:
-                return default
-            else:
-                return val
+            val = self._snapshot[key]
         except (KeyError, TypeError):
-            print("Key {} not found in configuration".format(key))
             if default is not None:
                 return default
-        return None
+            # 未提供默认值时提示，每个key只提示一次
+            if key not in self._missing:
+                self._missing.add(key)
+                print("Key {} not found in configuration".format(key))
+            return None
+        if val is None and default is not None:
+            return default
+        if isinstance(val, (dict, list)):
+            # 非叶子节点返回副本，避免调用方修改共享的配置快照
+            return copy.deepcopy(val)
+        return val
 
 cfg=Config()
 def set_config(key:str,value:str):
@@ -0,0 +1,220 @@
+import re
+import time
+import zlib
+import threading
+from collections import Counter
+from core.config import cfg
+from core.print import print_info,print_warning
+# 文章正文压缩存储：正文HTML大量重复内联样式，压缩后通常只有原来的1/5~1/10
+# 压缩后的正文存放在 ArticleContent.data，编码记录在 ArticleContent.codec:
+#   None        未压缩，正文在 ArticleContent.content
+#   zlib / zstd 未使用字典
+#   zlib:3      使用 ContentDict(id=3) 中的共享字典
+# 字典由已有正文训练后存入数据库，不再修改，解码时按ID读取
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+CODECS = ("zlib", "zstd")
+# zlib预设字典只有最后32KB有效
+ZLIB_DICT_MAX = 32 * 1024
+
+_TAG_PATTERN = re.compile(r"<[a-zA-Z][^<>]{0,400}>|</[a-zA-Z]+>")
+_ATTR_PATTERN = re.compile(r'\s[a-zA-Z-]+="[^"<>]{0,200}"')
+
+_lock = threading.Lock()
+_dicts = {}
+_current = {}
+
+def algorithm() -> str:
+    """配置的压缩算法，不压缩时返回None"""
+    name = str(cfg.get("article.compress", "none") or "none").lower()
+    if name not in CODECS:
+        return None
+    if name == "zstd" and not ZSTD_AVAILABLE:
+        # 未安装zstandard时回退为zlib
+        return "zlib"
+    return name
+
+def _level(name: str) -> int:
+    return int(cfg.get("article.compress_level", 6 if name == "zlib" else 9))
+
+def _load_dict(dict_id: int) -> bytes:
+    """读取共享字典(字典不会修改，读取后一直缓存)"""
+    data = _dicts.get(dict_id)
+    if data is None:
+        from core.db import DB
+        from core.models.content_dict import ContentDict
+        session = DB.get_session()
+        try:
+            row = session.query(ContentDict.data).filter(ContentDict.id == dict_id).first()
+        finally:
+            session.close()
+        if row is None:
+            raise ValueError(f"正文压缩字典不存在: {dict_id}")
+        data = _dicts[dict_id] = row[0]
+    return data
+
+def current_dict(name: str):
+    """算法当前使用的字典ID，没有字典或未启用字典时返回None(结果缓存一段时间，其他进程训练的新字典随后生效)"""
+    if not cfg.get("article.compress_dict", True):
+        return None
+    with _lock:
+        cached = _current.get(name)
+        if cached is not None and time.monotonic() - cached[1] < 300:
+            return cached[0]
+    from core.db import DB
+    from core.models.content_dict import ContentDict
+    session = DB.get_session()
+    try:
+        row = session.query(ContentDict.id).filter(ContentDict.codec == name)\
+            .order_by(ContentDict.id.desc()).first()
+    finally:
+        session.close()
+    dict_id = row[0] if row else None
+    with _lock:
+        _current[name] = (dict_id, time.monotonic())
+    return dict_id
+
+def target_codec():
+    """新写入及重新编码时使用的编码"""
+    name = algorithm()
+    if name is None:
+        return None
+    dict_id = current_dict(name)
+    return name if dict_id is None else f"{name}:{dict_id}"
+
+def _split(codec: str):
+    name, _, dict_id = codec.partition(":")
+    return name, int(dict_id) if dict_id else None
+
+def compress(text: str, codec: str) -> bytes:
+    name, dict_id = _split(codec)
+    raw = text.encode("utf-8")
+    zdict = _load_dict(dict_id) if dict_id is not None else None
+    if name == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("未安装zstandard")
+        kwargs = {"dict_data": zstandard.ZstdCompressionDict(zdict)} if zdict else {}
+        return zstandard.ZstdCompressor(level=_level(name), **kwargs).compress(raw)
+    compressor = zlib.compressobj(_level(name), zlib.DEFLATED, 15, 9, zlib.Z_DEFAULT_STRATEGY,
+                                  **({"zdict": zdict} if zdict else {}))
+    return compressor.compress(raw) + compressor.flush()
+
+def decompress(data: bytes, codec: str) -> str:
+    name, dict_id = _split(codec)
+    zdict = _load_dict(dict_id) if dict_id is not None else None
+    if name == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("正文使用zstd压缩，需要安装zstandard")
+        kwargs = {"dict_data": zstandard.ZstdCompressionDict(zdict)} if zdict else {}
+        return zstandard.ZstdDecompressor(**kwargs).decompress(data).decode("utf-8")
+    decompressor = zlib.decompressobj(15, **({"zdict": zdict} if zdict else {}))
+    return (decompressor.decompress(data) + decompressor.flush()).decode("utf-8")
+
+def encode(text: str, codec: str = "") -> dict:
+    """把正文编码为 ArticleContent 的 content/data/codec 字段
+    Args:
+        codec: 使用的编码，默认为配置的编码(target_codec)
+    """
+    if codec == "":
+        codec = target_codec()
+    if codec is None or not text:
+        return {"content": text, "data": None, "codec": None}
+    data = compress(text, codec)
+    # 压缩后没有变小的短正文不压缩
+    if len(data) >= len(text.encode("utf-8")):
+        return {"content": text, "data": None, "codec": None}
+    return {"content": None, "data": data, "codec": codec}
+
+def decode(content, data, codec):
+    """读取正文，压缩存储时解压"""
+    if not codec:
+        return content
+    return decompress(data, codec)
+
+def decode_row(row: dict) -> dict:
+    """把查询结果中的 content/data/codec 合并为解压后的 content"""
+    row["content"] = decode(row.get("content"), row.pop("data", None), row.pop("codec", None))
+    return row
+
+def train_zlib(samples: list, size: int) -> bytes:
+    """由正文样本生成zlib预设字典
+    统计样本中反复出现的标签和属性(主要是内联样式)，出现越多的片段越靠近字典末尾(距离越近，编码越短)
+    """
+    counter = Counter()
+    for text in samples:
+        counter.update(set(_TAG_PATTERN.findall(text)))
+        counter.update(set(_ATTR_PATTERN.findall(text)))
+    size = min(size, ZLIB_DICT_MAX)
+    picked = []
+    total = 0
+    # 至少在两篇正文中出现的片段才有意义
+    for piece, count in counter.most_common():
+        if count < 2:
+            break
+        data = piece.encode("utf-8")
+        if total + len(data) > size:
+            continue
+        picked.append(data)
+        total += len(data)
+    return b"".join(reversed(picked))
+
+def train(name: str, samples: list, size: int = None) -> bytes:
+    """由正文样本训练共享字典"""
+    size = int(size or float(cfg.get("article.compress_dict_kb", 32)) * 1024)
+    if name == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("未安装zstandard")
+        return zstandard.train_dictionary(size, [s.encode("utf-8") for s in samples]).as_bytes()
+    return train_zlib(samples, size)
+
+def ensure_dict(engine=None, samples: int = None):
+    """配置的算法还没有共享字典时，用已有正文训练一个并保存
+    Returns:
+        当前字典ID，未启用字典或样本不足时返回None
+    """
+    name = algorithm()
+    if name is None or not cfg.get("article.compress_dict", True):
+        return None
+    dict_id = current_dict(name)
+    if dict_id is not None:
+        return dict_id
+    from sqlalchemy import select, func
+    from core.models.article_content import ArticleContent
+    from core.models.content_dict import ContentDict
+    if engine is None:
+        from core.db import DB
+        engine = DB.get_engine()
+    samples = int(samples or cfg.get("article.compress_dict_samples", 500))
+    texts = []
+    with engine.connect() as conn:
+        rows = conn.execute(select(ArticleContent.content, ArticleContent.data, ArticleContent.codec)
+                            .order_by(func.random()).limit(samples))
+        for content, data, codec in rows:
+            try:
+                text = decode(content, data, codec)
+            except Exception:
+                continue
+            if text:
+                texts.append(text)
+    # 样本太少时训练出的字典没有代表性
+    if len(texts) < 20:
+        return None
+    data = train(name, texts)
+    with engine.begin() as conn:
+        dict_id = conn.execute(ContentDict.__table__.insert().values(
+            codec=name, data=data, samples=len(texts))).inserted_primary_key[0]
+    with _lock:
+        _dicts[dict_id] = data
+        _current[name] = (dict_id, time.monotonic())
+    print_info(f"正文压缩：使用{len(texts)}篇正文训练{name}字典({len(data) // 1024}KB)")
+    return dict_id
+
+def check():
+    """配置了zstd但未安装zstandard时提示"""
+    if str(cfg.get("article.compress", "none")).lower() == "zstd" and not ZSTD_AVAILABLE:
+        print_warning("article.compress配置为zstd，但未安装zstandard，改用zlib")
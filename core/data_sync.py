@@ -1,8 +1,11 @@
-from sqlalchemy import inspect, create_engine, text,String,Text
+from sqlalchemy import inspect, create_engine, text, bindparam,String,Text
 from sqlalchemy.engine import Engine
 from typing import List, Type
 from .models.base import Base
 from .models.article import Article
+from .models.article_content import ArticleContent
+from .models.article_search import ArticleSearch
+from .models.content_dict import ContentDict
 from .models.config_management import ConfigManagement
 from .models.feed import Feed
 from .models.message_task import MessageTask
@@ -33,7 +36,10 @@ class ModelSync:
                 conn.execute(text("SELECT 1"))
             self.models: List[Type[Base]] = [
                 Article,
+                ArticleContent,
+                ArticleSearch,
                 ConfigManagement,
+                ContentDict,
                 Feed,
                 MessageTask,
                 User
@@ -52,6 +58,146 @@ class ModelSync:
             self.sync_model(model, force_update)
         printf("[SYNC] 所有模型同步完成")
     
+    def sync_columns(self) -> None:
+        """只为已存在的表补充模型中新增的列，不修改已有列"""
+        inspector = inspect(self.engine)
+        for model in self.models:
+            table_name = model.__tablename__
+            if not inspector.has_table(table_name):
+                continue
+            db_columns = {c['name'] for c in inspector.get_columns(table_name)}
+            for column in model.__table__.columns:
+                if column.name not in db_columns:
+                    printf(f"[SYNC] 表 {table_name} 添加新列 {column.name}({column.type})")
+                    self._add_column(table_name, column)
+
+    def _index_supported(self, index) -> bool:
+        """索引能否在当前数据库上创建(部分索引只支持SQLite/PostgreSQL)"""
+        dialects = index.info.get("dialects")
+        return not dialects or self.engine.dialect.name in dialects
+
+    def sync_indexes(self) -> None:
+        """为已存在的表创建模型中声明但数据库中缺少的索引"""
+        inspector = inspect(self.engine)
+        for model in self.models:
+            table_name = model.__tablename__
+            if not inspector.has_table(table_name):
+                continue
+            db_indexes = {i['name'] for i in inspector.get_indexes(table_name)}
+            for index in model.__table__.indexes:
+                if index.name not in db_indexes and self._index_supported(index):
+                    printf(f"[SYNC] 表 {table_name} 创建索引 {index.name}")
+                    index.create(self.engine)
+
+    def index_report(self) -> dict:
+        """对比模型声明与数据库中的索引
+        :return: {表名: {"missing": 声明了但数据库中缺少, "unsupported": 当前数据库不支持(部分索引),
+                  "undeclared": 数据库中存在但模型未声明, "unused": 数据库统计中从未使用(SQLite无统计时为None)}}
+        """
+        inspector = inspect(self.engine)
+        usage = self._index_usage()
+        report = {}
+        for model in self.models:
+            table_name = model.__tablename__
+            if not inspector.has_table(table_name):
+                continue
+            db_indexes = {i['name'] for i in inspector.get_indexes(table_name)}
+            declared = {index.name: index for index in model.__table__.indexes}
+            report[table_name] = {
+                "missing": sorted(name for name, index in declared.items()
+                                  if name not in db_indexes and self._index_supported(index)),
+                "unsupported": sorted(name for name, index in declared.items() if not self._index_supported(index)),
+                "undeclared": sorted(db_indexes - set(declared)),
+                "unused": None if usage is None else sorted(
+                    name for name in db_indexes if usage.get((table_name, name), 0) == 0),
+            }
+        return report
+
+    def _index_usage(self):
+        """读取数据库的索引使用统计 {(表名, 索引名): 使用次数}，数据库没有统计时返回None
+        MySQL统计自服务启动起累计，PostgreSQL自统计重置起累计
+        """
+        db_type = self.engine.dialect.name
+        if db_type in ('mysql', 'mariadb'):
+            sql = """SELECT object_name, index_name, count_star
+                     FROM performance_schema.table_io_waits_summary_by_index_usage
+                     WHERE object_schema = DATABASE() AND index_name IS NOT NULL"""
+        elif db_type == 'postgresql':
+            sql = "SELECT relname, indexrelname, idx_scan FROM pg_stat_user_indexes"
+        else:
+            return None
+        try:
+            with self.engine.connect() as conn:
+                return {(row[0], row[1]): int(row[2] or 0) for row in conn.execute(text(sql))}
+        except Exception as e:
+            printf(f"[SYNC] 读取索引使用统计失败: {e}")
+            return None
+
+    def print_index_report(self, unused: bool = False) -> None:
+        """输出缺少及模型未声明的索引
+        :param unused: 是否同时输出未使用的索引(依赖数据库统计，服务刚启动时不准确)
+        """
+        from core.print import print_warning
+        for table_name, item in self.index_report().items():
+            if item["missing"]:
+                print_warning(f"表 {table_name} 缺少索引: {', '.join(item['missing'])}")
+            if item["undeclared"]:
+                print_warning(f"表 {table_name} 存在模型未声明的索引: {', '.join(item['undeclared'])}")
+            if unused and item["unused"]:
+                print_warning(f"表 {table_name} 未使用的索引: {', '.join(item['unused'])}")
+
+    def migrate_article_contents(self, batch: int = 500) -> int:
+        """把旧版articles.content中的正文迁移到article_contents表，完成后删除该列
+        按文章ID分批迁移，中断后再次执行会从剩余的文章继续
+        :return: 迁移的文章数
+        """
+        from core.print import print_info, print_warning
+        from core.db import content_hash
+        inspector = inspect(self.engine)
+        if not inspector.has_table(Article.__tablename__):
+            return 0
+        if 'content' not in {c['name'] for c in inspector.get_columns(Article.__tablename__)}:
+            return 0
+        ArticleContent.__table__.create(self.engine, checkfirst=True)
+        contents = ArticleContent.__table__
+        total = 0
+        last_id = ""
+        while True:
+            with self.engine.begin() as conn:
+                rows = conn.execute(text(
+                    "SELECT id, content, content_hash FROM articles WHERE id > :last_id AND content IS NOT NULL "
+                    "ORDER BY id LIMIT :batch"), {"last_id": last_id, "batch": batch}).fetchall()
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+                ids = [row[0] for row in rows]
+                exists = {row[0] for row in conn.execute(
+                    contents.select().with_only_columns(contents.c.article_id).where(contents.c.article_id.in_(ids)))}
+                values = [{"article_id": row[0], "content": row[1]} for row in rows if row[0] not in exists and row[1]]
+                if values:
+                    conn.execute(contents.insert(), values)
+                # 旧数据可能没有正文哈希
+                for row in rows:
+                    if row[2] is None and row[1]:
+                        conn.execute(text("UPDATE articles SET content_hash = :hash WHERE id = :id"),
+                                     {"hash": content_hash(row[1]), "id": row[0]})
+                conn.execute(text("UPDATE articles SET content = NULL WHERE id IN :ids")
+                             .bindparams(bindparam("ids", expanding=True)), {"ids": ids})
+                total += len(values)
+        if total:
+            print_info(f"文章正文迁移到{ArticleContent.__tablename__}: {total}篇")
+        # 删除依赖旧列的索引后删除旧列(SQLite 3.35以下等不支持时保留空列)
+        if 'ix_articles_no_content' in {i['name'] for i in inspector.get_indexes(Article.__tablename__)}:
+            with self.engine.begin() as conn:
+                conn.execute(text("DROP INDEX ix_articles_no_content" if self.engine.dialect.name != 'mysql'
+                                  else "DROP INDEX ix_articles_no_content ON articles"))
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(text("ALTER TABLE articles DROP COLUMN content"))
+        except Exception as e:
+            print_warning(f"删除articles.content列失败，正文已迁移，该列保留为空: {e}")
+        return total
+
     def sync_model(self, model: Type[Base], force_update: bool = False) -> None:
         """
         同步单个模型到数据库，兼容SQLite和MySQL
@@ -521,9 +667,14 @@ class ModelSync:
                 return 'TEXT'
             elif 'DATETIME' in type_str:
                 return 'TEXT'  # SQLite没有专门的DATETIME类型
+        elif db_type == 'postgresql':
+            if 'BLOB' in type_str:
+                return 'BYTEA'
         elif db_type in ('mysql', 'mariadb'):
             # MySQL/MariaDB类型处理
-            if 'MEDIUMTEXT' in type_str:
+            if 'BLOB' in type_str:
+                return 'MEDIUMBLOB'
+            elif 'MEDIUMTEXT' in type_str:
                 return 'MEDIUMTEXT CHARACTER SET utf8mb4'
             elif 'TEXT' in type_str and 'VARCHAR' not in type_str:
                 return type_str.replace('TEXT', 'LONGTEXT') + ' CHARACTER SET utf8mb4'
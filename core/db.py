@@ -2,18 +2,90 @@ from sqlalchemy import create_engine, Engine,Text
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy import Column, Integer, String, DateTime
 from typing import Optional, List
-from .models import Feed, Article
+from contextlib import contextmanager
+from .models import Feed, Article, ArticleContent
 from .config import cfg
 from core.models.base import Base  
 from core.print import print_warning,print_info,print_error
+from core.content_codec import encode
 # 声明基类
 # Base = declarative_base()
 
+def content_hash(content: str) -> Optional[str]:
+    """计算文章正文哈希，正文为空时返回None"""
+    if not content:
+        return None
+    import hashlib
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+def sqlite_pragmas(con_str: str) -> list:
+    """SQLite连接建立时执行的PRAGMA(sqlite.*配置)"""
+    memory = con_str.split("://", 1)[-1] in ("", "/:memory:")
+    pragmas = [f"PRAGMA busy_timeout={int(cfg.get('sqlite.busy_timeout', 5000))}"]
+    if not memory:
+        if cfg.get("sqlite.wal", True):
+            pragmas.append("PRAGMA journal_mode=WAL")
+        pragmas += [
+            f"PRAGMA synchronous={cfg.get('sqlite.synchronous', 'NORMAL')}",
+            f"PRAGMA mmap_size={int(float(cfg.get('sqlite.mmap_mb', 256)) * 1024 * 1024)}",
+        ]
+    # cache_size为负数时单位为KB
+    pragmas += [f"PRAGMA cache_size={-int(float(cfg.get('sqlite.cache_mb', 64)) * 1024)}",
+                "PRAGMA temp_store=MEMORY"]
+    return pragmas
+
 class Db:
     connection_str: str=None
     def __init__(self):
         self._session_factory: Optional[sessionmaker] = None
         self.engine = None
+        self.writer = None
+        self.monitor = None
+    def is_sqlite(self) -> bool:
+        return str(self.connection_str or "").startswith("sqlite")
+
+    def _create_sqlite_engine(self, con_str: str) -> Engine:
+        """SQLite专用连接：WAL模式下读写互不阻塞，连接池只需容纳并发的读请求
+        写操作由单写线程执行(见write)，其他写入在busy_timeout内等待文件锁而不是立即报错
+        """
+        from sqlalchemy import event
+        busy_timeout = int(cfg.get("sqlite.busy_timeout", 5000))
+        from core.dbpool import InstrumentedQueuePool
+        engine = create_engine(con_str, poolclass=InstrumentedQueuePool,
+                               pool_size=int(cfg.get("sqlite.pool_size", 5)),
+                               max_overflow=int(cfg.get("sqlite.max_overflow", 10)),
+                               pool_timeout=int(cfg.get("db_pool.pool_timeout", 30)),
+                               connect_args={"timeout": busy_timeout / 1000})
+        pragmas = sqlite_pragmas(con_str)
+
+        @event.listens_for(engine, "connect")
+        def set_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                for sql in pragmas:
+                    cursor.execute(sql)
+            finally:
+                cursor.close()
+        return engine
+
+    def write(self, fn):
+        """执行写操作fn(session)并提交，返回fn的返回值
+        SQLite单写模式下交给写线程排队执行(积压的写操作合并为一次提交)，否则在当前线程执行
+        fn中不要提交事务，出错时抛出的异常会传给调用方
+        """
+        if self.writer is not None:
+            return self.writer.run(fn)
+        session = self.get_session()
+        try:
+            result = fn(session)
+            session.commit()
+            return result
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
     def get_engine(self) -> Engine:
         """Return the SQLAlchemy engine for this database connection."""
         if self.engine is None:
@@ -36,9 +108,23 @@ class Db:
                         pass
                     open(db_path, 'w').close()
                     
-            self.engine = create_engine(con_str,pool_size=10, max_overflow=300, pool_recycle=3600, pool_pre_ping=True)
+            from core.dbpool import InstrumentedQueuePool, PoolMonitor
+            if self.is_sqlite():
+                self.engine = self._create_sqlite_engine(con_str)
+            else:
+                self.engine = create_engine(con_str,poolclass=InstrumentedQueuePool,
+                                            pool_size=int(cfg.get("db_pool.pool_size", 10)),
+                                            max_overflow=int(cfg.get("db_pool.max_overflow", 20)),
+                                            pool_timeout=int(cfg.get("db_pool.pool_timeout", 30)),
+                                            pool_recycle=3600, pool_pre_ping=True)
+            self.monitor = PoolMonitor(self.engine)
+            self.monitor.start()
             Session = sessionmaker(bind=self.engine,expire_on_commit=True)
             self._session = Session()
+            self.writer = None
+            if self.is_sqlite() and cfg.get("sqlite.single_writer", True):
+                from core.writer import WriteQueue
+                self.writer = WriteQueue(self.get_session, batch_size=int(cfg.get("sqlite.write_batch", 100)))
         except Exception as e:
             print(f"Error creating database connection: {e}")
             raise
@@ -61,21 +147,29 @@ class Db:
             
     def add_article(self, article_data: dict) -> bool:
         try:
-            session=self.get_session()
             from datetime import datetime
-            art = Article(**article_data)
+            data = dict(article_data)
+            content = data.pop('content', None)
+            art = Article(**data)
             if art.created_at is None:
                 art.created_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             if art.updated_at is None:
                 art.updated_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             art.created_at=datetime.strptime(art.created_at ,'%Y-%m-%d %H:%M:%S')
             art.updated_at=datetime.strptime(art.updated_at,'%Y-%m-%d %H:%M:%S')
-            art.content=art.content
+            art.content_hash=content_hash(content)
             from core.models.base import DATA_STATUS
             art.status=DATA_STATUS.ACTIVE
-            session.add(art) 
-            # self._session.merge(art)
-            session.commit()
+            article_content = ArticleContent.of(art.id, content) if art.content_hash is not None else None
+
+            def insert(session):
+                session.add(art)
+                if article_content is not None:
+                    session.add(article_content)
+            self.write(insert)
+            from core.pagination import invalidate_counts
+            invalidate_counts()
+            self._articles_changed([article_data])
         except Exception as e:
             if "UNIQUE" in str(e) or "Duplicate entry" in str(e):
                 print_warning(f"Article already exists: {art.id}")
@@ -84,10 +178,198 @@ class Db:
             return False
         return True    
         
+    def _parse_datetime(self, value):
+        from datetime import datetime
+        if value is None:
+            return datetime.now().replace(microsecond=0)
+        if isinstance(value, datetime):
+            return value
+        return datetime.fromisoformat(value)
+
+    def add_articles(self, batch: List[dict]) -> List[bool]:
+        """批量添加文章，单个事务内完成
+        先在内存中去重，再在写事务内用数据库原生的冲突忽略语法批量插入
+        (SQLite/PostgreSQL: ON CONFLICT DO NOTHING, MySQL: INSERT IGNORE)
+        Args:
+            batch: 文章数据列表，字段同add_article
+        Returns:
+            与batch一一对应的列表，True为新插入，False为已存在或重复
+        """
+        from core.models.base import DATA_STATUS
+        result = [False] * len(batch)
+        if not batch:
+            return result
+        columns = {c.name for c in Article.__table__.columns}
+        rows = {}
+        contents = {}
+        for i, data in enumerate(batch):
+            article_id = str(data['id'])
+            if article_id in rows:
+                continue
+            row = {k: v for k, v in data.items() if k in columns}
+            row['id'] = article_id
+            row['created_at'] = self._parse_datetime(row.get('created_at'))
+            row['updated_at'] = self._parse_datetime(row.get('updated_at'))
+            row['content_hash'] = content_hash(data.get('content'))
+            row['status'] = DATA_STATUS.ACTIVE
+            rows[article_id] = (i, row)
+            if row['content_hash'] is not None:
+                contents[article_id] = data['content']
+        try:
+            # 先读出已存在的文章，只为可能新增的文章压缩正文(压缩在写线程外完成)
+            session = self.get_session()
+            try:
+                known = {r[0] for r in session.query(Article.id).filter(Article.id.in_(list(rows.keys()))).all()}
+            finally:
+                session.close()
+            for article_id in known:
+                rows.pop(article_id)
+            encoded = {article_id: encode(contents[article_id]) for article_id in rows if article_id in contents}
+            # executemany要求每行字段一致
+            keys = set()
+            for _, row in rows.values():
+                keys.update(row.keys())
+
+            def insert(session):
+                # 存在性检查和插入在同一个写事务内，并以实际插入的行为准，并发入库时同一篇文章只会报告一次新增
+                exists = {r[0] for r in session.query(Article.id).filter(Article.id.in_(list(rows.keys()))).all()}
+                values = [{k: row.get(k) for k in keys} for article_id, (_, row) in rows.items() if article_id not in exists]
+                if not values:
+                    return set()
+                stmt = self._insert_ignore(Article.__table__)
+                if session.get_bind().dialect.insert_executemany_returning:
+                    # SQLite(>=3.35)/PostgreSQL: RETURNING只返回真正插入的行
+                    inserted = set(session.execute(stmt.returning(Article.__table__.c.id), values).scalars())
+                else:
+                    # MySQL等: 批量INSERT IGNORE后再查一次，本事务内新出现的即为新插入的
+                    # (可重复读隔离级别下看不到其他事务在此期间提交的行)
+                    session.execute(stmt, values)
+                    ids = [v['id'] for v in values]
+                    inserted = {r[0] for r in session.query(Article.id).filter(Article.id.in_(ids)).all()} - exists
+                content_values = [dict(encoded[article_id], article_id=article_id)
+                                  for article_id in inserted if article_id in encoded]
+                if content_values:
+                    session.execute(self._insert_ignore(ArticleContent.__table__), content_values)
+                return inserted
+            inserted = self.write(insert) if rows else set()
+            new_rows = [(i, row) for article_id, (i, row) in rows.items() if article_id in inserted]
+            for i, _ in new_rows:
+                result[i] = True
+            if new_rows:
+                from core.pagination import invalidate_counts
+                invalidate_counts()
+                self._articles_changed([dict(row, content=contents.get(row['id'])) for _, row in new_rows])
+        except Exception as e:
+            print_error(f"Failed to add articles: {e}")
+        skipped = len(batch) - sum(result)
+        if skipped:
+            print_warning(f"Articles already exist: {skipped}")
+        return result
+
+    def _articles_changed(self, articles: List[dict]):
+        """文章入库或正文变化后预先渲染<item>片段和阅读页、更新全文检索，并通知后台重建对应公众号的RSS"""
+        from core.rss import RSS
+        from core.materializer import feed_changed
+        rss = RSS()
+        try:
+            rss.cache_items(articles)
+        except Exception as e:
+            print_error(f"Failed to cache rss items: {e}")
+        try:
+            rss.cache_contents(articles)
+        except Exception as e:
+            print_error(f"Failed to cache article content: {e}")
+        try:
+            from core import search
+            search.index_articles(articles)
+        except Exception as e:
+            print_error(f"Failed to index articles for search: {e}")
+        for mp_id in {article.get('mp_id') for article in articles}:
+            if mp_id:
+                feed_changed(mp_id)
+
+    def _insert_ignore(self, model):
+        """按数据库方言生成忽略主键冲突的INSERT语句"""
+        dialect = self.engine.dialect.name
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+            return insert(model).on_conflict_do_nothing()
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+            return insert(model).on_conflict_do_nothing()
+        from sqlalchemy import insert
+        if dialect in ('mysql', 'mariadb'):
+            return insert(model).prefix_with('IGNORE')
+        return insert(model)
+
+    def update_article_content(self, article_id: str, content: str, etag: str = None, last_modified: str = None) -> bool:
+        """更新文章正文，正文哈希未变化时只更新校验信息
+        Returns:
+            正文是否发生变化
+        """
+        # 正文压缩在写线程之外完成
+        article_content = ArticleContent.of(article_id, content)
+        new_hash = content_hash(content)
+
+        def update(session):
+            art = session.query(Article).filter(Article.id == article_id).first()
+            if art is None:
+                return None
+            changed = new_hash is not None and new_hash != art.content_hash
+            if changed:
+                from datetime import datetime
+                session.merge(article_content)
+                art.content_hash = new_hash
+                art.updated_at = datetime.now().replace(microsecond=0)
+            if etag is not None:
+                art.etag = etag
+            if last_modified is not None:
+                art.last_modified = last_modified
+            if not changed:
+                return None
+            return {
+                'id': art.id, 'mp_id': art.mp_id, 'title': art.title, 'url': art.url,
+                'description': art.description, 'content': content, 'publish_time': art.publish_time,
+            }
+        try:
+            changed = self.write(update)
+        except Exception as e:
+            print_error(f"Failed to update article content: {e}")
+            return False
+        if changed is None:
+            return False
+        from core.rss import RSS
+        RSS.drop_article(article_id)
+        self._articles_changed([changed])
+        return True
+
+    def update_feed(self, mp_id: str, **values) -> bool:
+        """更新公众号字段
+        Returns:
+            公众号是否存在
+        """
+        def update(session):
+            feed = session.query(Feed).filter(Feed.id == mp_id).first()
+            if feed is None:
+                return False
+            for key, value in values.items():
+                setattr(feed, key, value)
+            return True
+        return self.write(update)
+
+    def get_article_content(self, article_id: str) -> Optional[str]:
+        """读取文章正文，没有正文时返回None"""
+        session = self.get_session()
+        try:
+            row = session.get(ArticleContent, article_id)
+            return row.body if row else None
+        finally:
+            session.close()
+
     def get_articles(self, id:str=None, limit:int=30, offset:int=0) -> List[Article]:
         try:
-            data = self.get_session().query(Article).limit(limit).offset(offset)
-            return data
+            with self.session_scope() as session:
+                return session.query(Article).limit(limit).offset(offset).all()
         except Exception as e:
             print(f"Failed to fetch Feed: {e}")
             return e    
@@ -95,7 +377,8 @@ class Db:
     def get_all_mps(self) -> List[Feed]:
         """Get all Feed records"""
         try:
-            return self.get_session().query(Feed).all()
+            with self.session_scope() as session:
+                return session.query(Feed).all()
         except Exception as e:
             print(f"Failed to fetch Feed: {e}")
             return e
@@ -103,16 +386,16 @@ class Db:
     def get_mps_list(self, mp_ids:str) -> List[Feed]:
         try:
             ids=mp_ids.split(',')
-            data =  self.get_session().query(Feed).filter(Feed.id.in_(ids)).all()
-            return data
+            with self.session_scope() as session:
+                return session.query(Feed).filter(Feed.id.in_(ids)).all()
         except Exception as e:
             print(f"Failed to fetch Feed: {e}")
             return e
     def get_mps(self, mp_id:str) -> Optional[Feed]:
         try:
             ids=mp_id.split(',')
-            data =  self.get_session().query(Feed).filter_by(id= mp_id).first()
-            return data
+            with self.session_scope() as session:
+                return session.query(Feed).filter_by(id= mp_id).first()
         except Exception as e:
             print(f"Failed to fetch Feed: {e}")
             return e
@@ -135,6 +418,27 @@ class Db:
         finally:
             session.close()
 
+    @contextmanager
+    def session_scope(self):
+        """会话上下文管理器，退出时关闭会话(归还连接)，出现异常时回滚
+        用法: with DB.session_scope() as session: ...
+        """
+        session = self.get_session()
+        try:
+            yield session
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def pool_stats(self) -> dict:
+        """连接池及写线程统计"""
+        data = self.monitor.stats() if self.monitor is not None else {}
+        if self.writer is not None:
+            data["writer"] = self.writer.stats()
+        return data
+
 # 全局数据库实例
 DB = Db()
 DB.init(cfg.get("db"))
\ No newline at end of file
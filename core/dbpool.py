@@ -0,0 +1,149 @@
+import time
+import threading
+import traceback
+from collections import deque
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from core.config import cfg
+from core.print import print_warning
+# 连接池监控：记录取连接的等待时间、使用中的连接数，以及长时间未归还(疑似泄漏)的连接
+# 用于判断连接池大小是否合适，统计见 GET /sys/db
+
+class InstrumentedQueuePool(QueuePool):
+    """记录从连接池取连接时等待时间的QueuePool"""
+    monitor = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            if self.monitor is not None:
+                self.monitor.timeout((time.perf_counter() - start) * 1000)
+            raise
+        if self.monitor is not None:
+            self.monitor.waited((time.perf_counter() - start) * 1000)
+        return connection
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """异步引擎(aiosqlite/asyncmy)使用的连接池，同样记录等待时间"""
+    pass
+
+class PoolMonitor:
+    """连接池统计
+    检出超过 db_pool.leak_seconds 秒仍未归还的连接视为疑似泄漏(会话未关闭或事务一直未结束)，
+    db_pool.leak_trace 开启时记录取连接时的调用栈，便于定位
+    """
+    def __init__(self, engine):
+        self.engine = engine
+        self._lock = threading.Lock()
+        self._checked_out = {}
+        self._waits = deque(maxlen=1000)
+        self.checkouts = 0
+        self.waits = 0
+        self.peak_in_use = 0
+        self.timeouts = 0
+        self.wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.hold_ms = 0.0
+        self.max_hold_ms = 0.0
+        self.leaks_reported = 0
+        self._warned = set()
+        pool = engine.pool
+        if isinstance(pool, InstrumentedQueuePool):
+            pool.monitor = self
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        self._thread = None
+
+    def start(self):
+        """后台定期检查疑似泄漏的连接"""
+        if self._thread is not None:
+            return
+        def run():
+            while True:
+                time.sleep(max(1.0, float(cfg.get("db_pool.leak_seconds", 30))))
+                try:
+                    self.leaks()
+                except Exception:
+                    pass
+        self._thread = threading.Thread(target=run, name="db-pool-monitor", daemon=True)
+        self._thread.start()
+
+    def waited(self, ms: float):
+        with self._lock:
+            self._waits.append(ms)
+            self.waits += 1
+            self.wait_ms += ms
+            self.max_wait_ms = max(self.max_wait_ms, ms)
+
+    def timeout(self, ms: float):
+        with self._lock:
+            self.timeouts += 1
+            self.max_wait_ms = max(self.max_wait_ms, ms)
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        stack = None
+        if cfg.get("db_pool.leak_trace", False):
+            # 去掉SQLAlchemy内部的调用栈
+            stack = [f"{f.filename}:{f.lineno} {f.name}" for f in traceback.extract_stack()
+                     if "sqlalchemy" not in f.filename][-6:]
+        with self._lock:
+            self._checked_out[id(connection_record)] = (time.monotonic(), threading.current_thread().name, stack)
+            self.checkouts += 1
+            self.peak_in_use = max(self.peak_in_use, len(self._checked_out))
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            entry = self._checked_out.pop(id(connection_record), None)
+            self._warned.discard(id(connection_record))
+            if entry is not None:
+                held = (time.monotonic() - entry[0]) * 1000
+                self.hold_ms += held
+                self.max_hold_ms = max(self.max_hold_ms, held)
+
+    def leaks(self) -> list:
+        """检出时间超过阈值的连接，首次发现时输出警告"""
+        threshold = float(cfg.get("db_pool.leak_seconds", 30))
+        now = time.monotonic()
+        result = []
+        with self._lock:
+            for key, (since, thread, stack) in self._checked_out.items():
+                held = now - since
+                if held < threshold:
+                    continue
+                result.append({"held_seconds": round(held, 1), "thread": thread, "stack": stack})
+                if key not in self._warned:
+                    self._warned.add(key)
+                    self.leaks_reported += 1
+                    print_warning(f"数据库连接已检出{held:.0f}秒未归还(线程{thread})，可能有会话未关闭"
+                                  + (f": {stack[-1]}" if stack else ""))
+        return result
+
+    def stats(self) -> dict:
+        pool = self.engine.pool
+        with self._lock:
+            waits = sorted(self._waits)
+            checkouts = self.checkouts
+            data = {
+                "pool": type(pool).__name__,
+                "size": pool.size() if hasattr(pool, "size") else None,
+                "max_overflow": getattr(pool, "_max_overflow", None),
+                "in_use": len(self._checked_out),
+                "idle": pool.checkedin() if hasattr(pool, "checkedin") else None,
+                "peak_in_use": self.peak_in_use,
+                "checkouts": checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms": {
+                    "avg": round(self.wait_ms / self.waits, 3) if self.waits else None,
+                    "p99": round(waits[int(len(waits) * 0.99) - 1], 3) if len(waits) >= 100 else None,
+                    "max": round(self.max_wait_ms, 3),
+                },
+                "hold_ms": {
+                    "avg": round(self.hold_ms / max(1, checkouts - len(self._checked_out)), 3),
+                    "max": round(self.max_hold_ms, 3),
+                },
+            }
+        data["leaks"] = self.leaks()
+        data["leaks_reported"] = self.leaks_reported
+        return data
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import requests
+import httpx
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from core.config import cfg
+# 共享HTTP客户端：按名称复用连接池，统一超时与重试策略
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+def _timeout():
+    return float(cfg.get("http.connect_timeout", 5)), float(cfg.get("http.read_timeout", 15))
+
+class PooledSession(requests.Session):
+    """带默认超时的requests会话(requests本身会忽略session.timeout)"""
+    def __init__(self, timeout: tuple):
+        super().__init__()
+        self.default_timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.default_timeout
+        return super().request(method, url, **kwargs)
+
+_lock = threading.Lock()
+_sessions = {}
+_async_clients = {}
+
+def get_session(name: str = "default") -> requests.Session:
+    """获取共享的同步会话，同名会话复用同一组按主机划分的keep-alive连接池"""
+    with _lock:
+        session = _sessions.get(name)
+        if session is None:
+            pool_size = int(cfg.get("http.pool_size", 20))
+            # 只对幂等请求重试，避免重复发送通知
+            retry = Retry(
+                total=int(cfg.get("http.retries", 2)),
+                backoff_factor=0.5,
+                status_forcelist=(502, 503, 504),
+                allowed_methods=frozenset(["GET", "HEAD", "OPTIONS"]),
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+            session = PooledSession(_timeout())
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[name] = session
+        return session
+
+def new_async_client(**kwargs) -> httpx.AsyncClient:
+    """按统一配置创建异步客户端，调用方负责关闭"""
+    connect, read = _timeout()
+    pool_size = int(cfg.get("http.pool_size", 20))
+    kwargs.setdefault("timeout", httpx.Timeout(read, connect=connect))
+    kwargs.setdefault("limits", httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size))
+    kwargs.setdefault("http2", HTTP2_AVAILABLE and bool(cfg.get("http.http2", False)))
+    transport = httpx.AsyncHTTPTransport(
+        retries=int(cfg.get("http.retries", 2)),
+        http2=kwargs["http2"],
+        limits=kwargs["limits"],
+        verify=kwargs.pop("verify", True),
+    )
+    return httpx.AsyncClient(transport=transport, **kwargs)
+
+def get_async_client(name: str = "default") -> httpx.AsyncClient:
+    """获取当前事件循环内共享的异步客户端"""
+    key = (name, id(asyncio.get_running_loop()))
+    with _lock:
+        client = _async_clients.get(key)
+        if client is None or client.is_closed:
+            client = new_async_client(follow_redirects=True)
+            _async_clients[key] = client
+        return client
+
+async def aclose_all():
+    """关闭当前事件循环内的异步客户端"""
+    loop_id = id(asyncio.get_running_loop())
+    with _lock:
+        keys = [key for key in _async_clients if key[1] == loop_id]
+        clients = [_async_clients.pop(key) for key in keys]
+    for client in clients:
+        await client.aclose()
+
+def close_all():
+    """关闭所有同步会话"""
+    with _lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
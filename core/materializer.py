@@ -0,0 +1,128 @@
+import os
+import time
+import threading
+from core.config import cfg
+from core.print import print_info,print_error,print_warning
+# 公众号RSS后台预生成：采集完成后发布"公众号已变化"事件，由后台线程重建RSS并原子替换
+# 读者请求始终命中已生成的文件，无需在请求中查询数据库和序列化XML
+
+class FeedMaterializer:
+    """后台重建公众号RSS
+    同一公众号在 rss.materialize_delay 秒内的多次变化合并为一次重建
+    """
+    def __init__(self):
+        self._cond=threading.Condition()
+        self._pending={}
+        self._thread=None
+        self.built=0
+        self.failed=0
+
+    @property
+    def enabled(self)->bool:
+        return bool(cfg.get("rss.materialize",True))
+
+    def feed_changed(self,feed_id:str,rss_domain:str=None):
+        """发布公众号变化事件
+        Args:
+            feed_id: 公众号ID
+            rss_domain: 请求中的RSS域名，未配置rss.base_url时用于生成链接
+        """
+        if not feed_id or not self.enabled:
+            return
+        with self._cond:
+            entry=self._pending.get(feed_id)
+            if entry is None:
+                entry=self._pending[feed_id]=[time.monotonic()+float(cfg.get("rss.materialize_delay",5)),set()]
+            if rss_domain is not None:
+                entry[1].add(str(rss_domain))
+            self._start()
+            self._cond.notify_all()
+
+    def warm_up(self):
+        """启动时预生成全部公众号的RSS"""
+        if not self.enabled:
+            return
+        from core.db import DB
+        from core.models.feed import Feed
+        session=DB.get_session()
+        try:
+            ids=[row[0] for row in session.query(Feed.id).all()]
+        finally:
+            session.close()
+        for feed_id in ids:
+            self.feed_changed(feed_id)
+        print_info(f"RSS预生成：已加入{len(ids)}个公众号")
+
+    def _start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread=threading.Thread(target=self._run,name="feed-materializer",daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                feed_id,(due,domains)=min(self._pending.items(),key=lambda kv:kv[1][0])
+                wait=due-time.monotonic()
+                if wait>0:
+                    self._cond.wait(wait)
+                    continue
+                del self._pending[feed_id]
+            try:
+                self.build(feed_id,domains)
+            except Exception as e:
+                self.failed+=1
+                print_error(f"RSS预生成失败[{feed_id}]: {e}")
+
+    def build(self,feed_id:str,domains=None)->int:
+        """重建公众号的默认分页及最近访问过的分页，完成后删除旧版本(含未重建的分页)
+        Returns:
+            新生成的文件数
+        """
+        from core.db import DB
+        from core.models.feed import Feed
+        from core.rss import RSS
+        domains=set(domains or [])
+        # 与接口一致：配置了rss.base_url(含空值)时使用配置，否则只能使用请求中的域名
+        base_url=cfg.get("rss.base_url",None)
+        if base_url is not None:
+            domains.add(str(base_url))
+        if not domains:
+            print_warning(f"未配置rss.base_url，跳过RSS预生成[{feed_id}]")
+            return 0
+        session=DB.get_session()
+        try:
+            feed=session.query(Feed).filter(Feed.id==feed_id).first()
+            if feed is None:
+                RSS.invalidate(feed_id)
+                return 0
+            session.expunge(feed)
+            # 接口默认分页(limit=100,offset=0)及最近访问过的rss.materialize_variants个其他分页，
+            # 其余分页只失效不重建，读者再次访问时按需生成
+            variants=set(RSS.cached_variants(feed_id,int(cfg.get("rss.materialize_variants",5))))|{(100,0)}
+            keep=set()
+            built=0
+            for domain in domains:
+                for limit,offset in sorted(variants):
+                    version=RSS.feed_version(session,feed,limit,offset,domain)
+                    rss=RSS(name=f'{feed_id}_{limit}_{offset}_{version["tag"]}')
+                    keep.add(rss.rss_file)
+                    if os.path.exists(rss.rss_file):
+                        continue
+                    items,next_link=rss.feed_page(DB.get_session(),feed,domain,limit,offset)
+                    for _ in rss.stream_rss(items,title=f"{feed.mp_name}",link=domain,description=feed.mp_intro,next_link=next_link):
+                        pass
+                    built+=1
+        finally:
+            session.close()
+        RSS.invalidate(feed_id,keep=keep)
+        self.built+=built
+        if built:
+            print_info(f"RSS预生成完成[{feed.mp_name}]: {built}个文件")
+        return built
+
+materializer=FeedMaterializer()
+
+def feed_changed(feed_id:str,rss_domain:str=None):
+    materializer.feed_changed(feed_id,rss_domain)
@@ -1,5 +1,11 @@
 # 导入文章模型
 from .article import Article 
+# 导入文章正文模型
+from .article_content import ArticleContent
+# 导入正文压缩字典模型
+from .content_dict import ContentDict
+# 导入文章全文检索模型
+from .article_search import ArticleSearch
 # 导入订阅源模型
 from .feed import Feed
 # 导入用户模型
@@ -1,17 +1,33 @@
-from  .base import Base,Column,String,Integer,DateTime,Text,MEDIUMTEXT
+from  .base import Base,Column,String,Integer,DateTime,Text,MEDIUMTEXT,Index,PartialIndex,DATA_STATUS
 class Article(Base):
     __tablename__ = 'articles'
+    __table_args__ = (
+        # 游标分页索引：公众号内及全部文章均按(publish_time, id)倒序
+        Index('ix_articles_mp_publish', 'mp_id', 'publish_time', 'id'),
+        Index('ix_articles_publish', 'publish_time', 'id'),
+        # RSS版本号：公众号内文章数、最新发布及更新时间(覆盖索引，无需回表)
+        Index('ix_articles_mp_updated', 'mp_id', 'updated_at', 'publish_time'),
+        # 文章列表按状态筛选
+        Index('ix_articles_status_publish', 'status', 'publish_time', 'id'),
+        # 文章列表默认排除已删除文章
+        PartialIndex('ix_articles_active_publish', 'publish_time', 'id', where=f'status != {DATA_STATUS.DELETED}'),
+        # 待抓取正文的文章(正文存放在article_contents，没有正文时content_hash为空)
+        PartialIndex('ix_articles_pending_content', 'id', where='content_hash IS NULL'),
+    )
     id = Column(String(255), primary_key=True)
     mp_id = Column(String(255))
     title = Column(String(500))
     pic_url = Column(String(500))
     url=Column(String(500))
-    content = Column(Text)
     description=Column(String(800))
     status = Column(Integer,default=1)
     publish_time = Column(Integer)
     created_at = Column(DateTime)
     updated_at = Column(DateTime)  
     is_export = Column(Integer)
+    # 正文内容哈希(正文见ArticleContent)及文章页面的缓存校验信息，用于条件刷新
+    content_hash = Column(String(64))
+    etag = Column(String(255))
+    last_modified = Column(String(64))
 
 
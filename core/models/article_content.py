@@ -0,0 +1,31 @@
+from  .base import Base,Column,String,Text,MEDIUMTEXT,LargeBinary,MEDIUMBLOB,Index
+class ArticleContent(Base):
+    """文章正文，与文章表分开存放，列表、RSS摘要等查询不会读取正文
+    文章是否已有正文以 Article.content_hash 是否为空判断
+    开启压缩存储(article.compress)时正文压缩后存放在data，codec记录编码，见core/content_codec.py
+    """
+    __tablename__ = 'article_contents'
+    __table_args__ = (
+        # 后台重新编码时查找编码与配置不一致的正文
+        Index('ix_article_contents_codec', 'codec', 'article_id'),
+    )
+    article_id = Column(String(255), primary_key=True)
+    content = Column(Text().with_variant(MEDIUMTEXT(), 'mysql'))
+    data = Column(LargeBinary().with_variant(MEDIUMBLOB(), 'mysql'))
+    codec = Column(String(32))
+
+    @classmethod
+    def of(cls, article_id: str, content: str) -> "ArticleContent":
+        """按配置的压缩方式创建正文记录"""
+        from core.content_codec import encode
+        return cls(article_id=article_id, **encode(content))
+
+    @property
+    def body(self) -> str:
+        """正文，压缩存储时在首次访问时解压"""
+        key = (self.codec, self.content, self.data)
+        cached = self.__dict__.get("_body")
+        if cached is None or cached[0] != key:
+            from core.content_codec import decode
+            cached = self.__dict__["_body"] = (key, decode(self.content, self.data, self.codec))
+        return cached[1]
@@ -0,0 +1,19 @@
+from  .base import Base,Column,String,Integer,Text,MEDIUMTEXT,Index
+class ArticleSearch(Base):
+    """文章全文检索表：标题、摘要及去除HTML标签后的正文
+    SQLite上由FTS5外部内容表(article_search_fts)建立索引，见core/search.py
+    """
+    __tablename__ = 'article_search'
+    __table_args__ = (
+        # MySQL全文索引，ngram分词支持中文
+        Index('ft_article_search', 'title', 'description', 'body',
+              mysql_prefix='FULLTEXT', mysql_with_parser='ngram',
+              info={"dialects": ("mysql",)}).ddl_if(dialect="mysql"),
+    )
+    # 整数主键，FTS5以此作为rowid
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    article_id = Column(String(255), unique=True, index=True)
+    mp_id = Column(String(255))
+    title = Column(String(500))
+    description = Column(String(800))
+    body = Column(Text().with_variant(MEDIUMTEXT(), 'mysql'))
@@ -1,7 +1,7 @@
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import create_engine, Column, Integer, String, DateTime,Date,ForeignKey,Boolean,Text,Enum,Table
-from sqlalchemy import inspect
-from sqlalchemy.dialects.mysql import MEDIUMTEXT
+from sqlalchemy import create_engine, Column, Integer, String, DateTime,Date,ForeignKey,Boolean,Text,Enum,Table,Index,LargeBinary
+from sqlalchemy import inspect,text
+from sqlalchemy.dialects.mysql import MEDIUMTEXT,MEDIUMBLOB
 from sqlalchemy.exc import SQLAlchemyError
 
 
@@ -13,4 +13,11 @@ class DataStatus():
     COMPLETED:int = 4
     FAILED:int = 5
 DATA_STATUS=DataStatus()
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
+
+# 支持部分索引(CREATE INDEX ... WHERE)的数据库，MySQL不支持
+PARTIAL_INDEX_DIALECTS=("sqlite","postgresql")
+def PartialIndex(name:str,*columns,where:str)->Index:
+    """部分索引，只索引满足where条件的行，在不支持部分索引的数据库上不创建"""
+    return Index(name,*columns,sqlite_where=text(where),postgresql_where=text(where),
+                 info={"dialects":PARTIAL_INDEX_DIALECTS}).ddl_if(dialect=PARTIAL_INDEX_DIALECTS)
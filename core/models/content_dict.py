@@ -0,0 +1,14 @@
+from  .base import Base,Column,String,Integer,DateTime,LargeBinary,MEDIUMBLOB
+from datetime import datetime
+class ContentDict(Base):
+    """正文压缩共享字典，由已有正文训练生成
+    压缩后的正文依赖字典解压，字典只新增不修改
+    """
+    __tablename__ = 'content_dicts'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # 压缩算法 zlib/zstd
+    codec = Column(String(16))
+    data = Column(LargeBinary().with_variant(MEDIUMBLOB(), 'mysql'))
+    # 训练使用的正文数
+    samples = Column(Integer)
+    created_at = Column(DateTime, default=datetime.now)
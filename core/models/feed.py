@@ -1,6 +1,9 @@
-from  .base import Base,Column,String,Integer,DateTime
+from  .base import Base,Column,String,Integer,DateTime,Index
 class Feed(Base):   
     __tablename__ = 'feeds'
+    __table_args__ = (
+        Index('ix_feeds_created', 'created_at', 'id'),
+    )
     id = Column(String(255), primary_key=True)
     mp_name =Column(String(255))
     mp_cover = Column(String(255))
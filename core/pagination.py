@@ -0,0 +1,106 @@
+import os
+import json
+import time
+import base64
+import threading
+from datetime import datetime
+from sqlalchemy import and_, or_
+from core.config import cfg
+# 游标分页：按 (时间, id) 倒序，用上一页最后一条记录作为游标，深翻页与第一页开销相同
+
+class InvalidCursor(ValueError):
+    """游标格式错误"""
+    pass
+
+def encode_cursor(sort_value, row_id) -> str:
+    """把上一页最后一条记录的(时间, id)编码为不透明的游标"""
+    if isinstance(sort_value, datetime):
+        data = {"d": sort_value.isoformat(), "i": str(row_id)}
+    else:
+        data = {"t": sort_value, "i": str(row_id)}
+    raw = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str):
+    """解析游标，返回(时间, id)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        if "d" in data:
+            return datetime.fromisoformat(data["d"]), data["i"]
+        return data["t"], data["i"]
+    except Exception:
+        raise InvalidCursor(f"无效的游标: {cursor}")
+
+def keyset(query, sort_column, id_column, cursor: str = None):
+    """按(sort_column, id_column)倒序排序，并从游标之后开始取数据
+    sort_column为空的记录无法用游标定位，只在offset翻页中出现，游标翻页不返回这些记录
+    """
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        query = query.filter(sort_column.isnot(None), or_(
+            sort_column < sort_value,
+            and_(sort_column == sort_value, id_column < row_id),
+        ))
+    return query.order_by(sort_column.desc(), id_column.desc())
+
+def next_cursor(rows: list, limit: int, sort_attr: str, id_attr: str = "id"):
+    """本页已取满时返回下一页游标，否则(或最后一条记录排序字段为空时)返回None"""
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    if getattr(last, sort_attr) is None:
+        # 已翻到排序字段为空的记录，无法继续用游标定位
+        return None
+    return encode_cursor(getattr(last, sort_attr), getattr(last, id_attr))
+
+_count_lock = threading.Lock()
+_count_cache = {}
+_count_stamp = [None]
+
+def _count_stamp_path() -> str:
+    """文章增删时更新的标记文件，用于跨进程(采集任务与接口)失效总数缓存"""
+    return os.path.join(cfg.get("cache.dir", "data/cache"), ".count_stamp")
+
+def invalidate_counts():
+    """文章入库或删除后清空总数缓存(含其他进程)"""
+    path = _count_stamp_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a"):
+            pass
+        os.utime(path)
+    except OSError:
+        pass
+    with _count_lock:
+        _count_cache.clear()
+
+def get_cached_count(key):
+    """读取未过期的总数缓存，缓存时长由 pagination.total_ttl 配置(秒)，没有时返回None"""
+    ttl = float(cfg.get("pagination.total_ttl", 60))
+    try:
+        stamp = os.stat(_count_stamp_path()).st_mtime_ns
+    except OSError:
+        stamp = None
+    with _count_lock:
+        if stamp != _count_stamp[0]:
+            _count_cache.clear()
+            _count_stamp[0] = stamp
+        hit = _count_cache.get(key)
+        if hit is not None and time.monotonic() - hit[1] < ttl:
+            return hit[0]
+    return None
+
+def set_cached_count(key, total: int):
+    with _count_lock:
+        if len(_count_cache) > 1024:
+            _count_cache.clear()
+        _count_cache[key] = (total, time.monotonic())
+
+def cached_count(key, query) -> int:
+    """带短时缓存的总数查询"""
+    total = get_cached_count(key)
+    if total is None:
+        total = query.order_by(None).count()
+        set_cached_count(key, total)
+    return total
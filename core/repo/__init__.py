@@ -0,0 +1,10 @@
+# 接口使用的异步数据访问，会话由 core.async_db.ADB 提供(Depends(ADB.session_dependency))
+# 查询函数以异步会话为第一个参数；写操作经 ADB.write 执行，不需要传入会话
+# 公众号
+from . import feed
+# 文章
+from . import article
+# 消息任务
+from . import message_task
+# 用户
+from . import user
@@ -0,0 +1,82 @@
+from sqlalchemy import select, func
+from starlette.concurrency import run_in_threadpool
+from core.async_db import ADB
+from core.config import cfg
+from core.models.base import DATA_STATUS
+from core.models.article import Article
+from core.models.article_content import ArticleContent
+from core.pagination import keyset, get_cached_count, set_cached_count, invalidate_counts
+from core.search import search as search_articles
+
+async def list_articles(session, status: str = None, mp_id: str = None, limit: int = 5, offset: int = 0,
+                        cursor: str = None, with_total: bool = True):
+    """按发布时间倒序分页查询文章(默认排除已删除)，返回(文章列表, 总数)
+    传入游标时从游标之后开始(keyset分页)，总数短时缓存，不需要时返回None
+    """
+    stmt = select(Article)
+    if status:
+        stmt = stmt.where(Article.status == status)
+    else:
+        stmt = stmt.where(Article.status != DATA_STATUS.DELETED)
+    if mp_id:
+        stmt = stmt.where(Article.mp_id == mp_id)
+    total = None
+    if with_total:
+        key = ("articles", status, mp_id)
+        total = get_cached_count(key)
+        if total is None:
+            total = await session.scalar(select(func.count()).select_from(stmt.subquery()))
+            set_cached_count(key, total)
+    stmt = keyset(stmt, Article.publish_time, Article.id, cursor)
+    if not cursor:
+        stmt = stmt.offset(offset)
+    return (await session.execute(stmt.limit(limit))).scalars().all(), total
+
+async def search(session, keyword: str, mp_id: str = None, limit: int = 5, offset: int = 0, with_total: bool = True):
+    """全文检索文章，按相关度排序
+    Returns:
+        (文章列表, {文章ID: 命中信息(score/snippet)}, 总数或None)
+    """
+    hits, total = await session.run_sync(search_articles, keyword, mp_id=mp_id, limit=limit, offset=offset,
+                                         with_total=with_total)
+    if not hits:
+        return [], {}, total
+    result = await session.execute(select(Article).where(Article.id.in_([h["id"] for h in hits])))
+    rows = {a.id: a for a in result.scalars()}
+    return [rows[h["id"]] for h in hits if h["id"] in rows], {h["id"]: h for h in hits}, total
+
+async def get_article(session, article_id: str):
+    """读取未删除的文章，不存在时返回None"""
+    result = await session.execute(
+        select(Article).where(Article.id == article_id).where(Article.status != DATA_STATUS.DELETED))
+    return result.scalars().first()
+
+async def get_content(session, article_id: str):
+    """读取文章正文，没有正文时返回None"""
+    row = await session.get(ArticleContent, article_id)
+    return row.body if row else None
+
+async def delete_article(article_id: str) -> bool:
+    """删除文章：默认标记为已删除，article.true_delete开启时同时删除文章和正文
+    Returns:
+        文章不存在时返回False
+    """
+    true_delete = cfg.get("article.true_delete", False)
+
+    def delete(session):
+        article = session.get(Article, article_id)
+        if article is None:
+            return False
+        article.status = DATA_STATUS.DELETED
+        if true_delete:
+            session.delete(article)
+            session.query(ArticleContent).filter(ArticleContent.article_id == article_id).delete()
+        return True
+    if not await ADB.write(delete):
+        return False
+    invalidate_counts()
+    if true_delete:
+        # 同时删除全文检索内容(逻辑删除的文章在检索时过滤)
+        from core.search import remove_articles
+        await run_in_threadpool(remove_articles, [article_id])
+    return True
@@ -0,0 +1,82 @@
+from datetime import datetime
+from sqlalchemy import select, func
+from core.async_db import ADB
+from core.models.feed import Feed
+from core.pagination import keyset
+from core.rss import RSS
+
+async def get_feed(session, feed_id: str):
+    """按ID读取公众号，不存在时返回None"""
+    return await session.get(Feed, feed_id)
+
+async def list_feeds(session, limit: int = 10, offset: int = 0, kw: str = ""):
+    """按添加时间倒序分页查询公众号，返回(公众号列表, 总数)"""
+    stmt = select(Feed)
+    if kw:
+        stmt = stmt.where(Feed.mp_name.ilike(f"%{kw}%"))
+    total = await session.scalar(select(func.count()).select_from(stmt.subquery()))
+    result = await session.execute(stmt.order_by(Feed.created_at.desc()).limit(limit).offset(offset))
+    return result.scalars().all(), total
+
+async def page_feeds(session, limit: int = 100, offset: int = 0, cursor: str = None):
+    """RSS订阅列表的一页，传入游标时从游标之后开始(keyset分页)"""
+    stmt = keyset(select(Feed), Feed.created_at, Feed.id, cursor)
+    if not cursor:
+        stmt = stmt.offset(offset)
+    return (await session.execute(stmt.limit(limit))).scalars().all()
+
+async def feed_names(session, feed_ids) -> dict:
+    """公众号ID -> 名称"""
+    feed_ids = list({i for i in feed_ids if i})
+    if not feed_ids:
+        return {}
+    result = await session.execute(select(Feed.id, Feed.mp_name).where(Feed.id.in_(feed_ids)))
+    return {row.id: row.mp_name for row in result}
+
+async def save_feed(feed_id: str, faker_id: str, mp_name: str, mp_cover: str, mp_intro: str):
+    """添加公众号，faker_id已存在时更新名称、头像和简介
+    Returns:
+        (公众号, 是否新添加)
+    """
+    def save(session):
+        now = datetime.now()
+        feed = session.query(Feed).filter(Feed.faker_id == faker_id).first()
+        if feed is not None:
+            feed.mp_name = mp_name
+            feed.mp_cover = mp_cover
+            feed.mp_intro = mp_intro
+            feed.updated_at = now
+            return feed, False
+        feed = Feed(
+            id=feed_id,
+            mp_name=mp_name,
+            mp_cover=mp_cover,
+            mp_intro=mp_intro,
+            status=1,  # 默认启用状态
+            created_at=now,
+            updated_at=now,
+            faker_id=faker_id,
+            update_time=0,
+            sync_time=0,
+        )
+        session.add(feed)
+        return feed, True
+    feed, created = await ADB.write(save)
+    # 订阅列表(all_*)中包含公众号名称和简介，添加或更新后失效
+    RSS.invalidate_feed_list()
+    return feed, created
+
+async def delete_feed(feed_id: str) -> bool:
+    """删除公众号，不存在时返回False"""
+    def delete(session):
+        feed = session.get(Feed, feed_id)
+        if feed is None:
+            return False
+        session.delete(feed)
+        return True
+    if not await ADB.write(delete):
+        return False
+    # 删除该公众号的RSS缓存，并使订阅列表失效
+    RSS.invalidate(feed_id)
+    RSS.invalidate_feed_list()
+    return True
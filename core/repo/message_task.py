@@ -0,0 +1,47 @@
+from sqlalchemy import select, func
+from core.async_db import ADB
+from core.models.message_task import MessageTask
+
+async def list_tasks(session, limit: int = 10, offset: int = 0, status: int = None):
+    """分页查询消息任务，返回(任务列表, 总数)"""
+    stmt = select(MessageTask)
+    if status is not None:
+        stmt = stmt.where(MessageTask.status == status)
+    total = await session.scalar(select(func.count()).select_from(stmt.subquery()))
+    result = await session.execute(stmt.offset(offset).limit(limit))
+    return result.scalars().all(), total
+
+async def get_task(session, task_id: int):
+    """按ID读取消息任务，不存在时返回None"""
+    return await session.get(MessageTask, task_id)
+
+async def create_task(values: dict) -> MessageTask:
+    """创建消息任务"""
+    def create(session):
+        task = MessageTask(**values)
+        session.add(task)
+        session.flush()
+        return task
+    return await ADB.write(create)
+
+async def update_task(task_id: int, values: dict):
+    """更新消息任务中值不为None的字段，任务不存在时返回None"""
+    def update(session):
+        task = session.get(MessageTask, task_id)
+        if task is None:
+            return None
+        for key, value in values.items():
+            if value is not None:
+                setattr(task, key, value)
+        return task
+    return await ADB.write(update)
+
+async def delete_task(task_id: int) -> bool:
+    """删除消息任务，不存在时返回False"""
+    def delete(session):
+        task = session.get(MessageTask, task_id)
+        if task is None:
+            return False
+        session.delete(task)
+        return True
+    return await ADB.write(delete)
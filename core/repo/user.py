@@ -0,0 +1,19 @@
+from sqlalchemy import select
+from core.async_db import ADB
+from core.models.user import User
+
+async def get_user(session, username: str):
+    """按用户名读取用户，不存在时返回None"""
+    result = await session.execute(select(User).where(User.username == username))
+    return result.scalars().first()
+
+async def update_user(username: str, **values) -> bool:
+    """更新用户字段，用户不存在时返回False"""
+    def update(session):
+        user = session.query(User).filter(User.username == username).first()
+        if user is None:
+            return False
+        for key, value in values.items():
+            setattr(user, key, value)
+        return True
+    return await ADB.write(update)
@@ -1,11 +1,52 @@
 import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta
 import os
+import re
 import json
+import glob
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from xml.sax.saxutils import escape
+from core.compress import ArtifactWriter, ENCODINGS, strip_encoding_tag, remove as remove_file
+from core.content_codec import decode_row
+from core.cache import get_cache, atomic_write
+from core.pagination import keyset, next_cursor
+# 文章图片地址，已经指向图片代理(/static/res/logo/)的不再替换
+IMG_SRC_PATTERN = re.compile(r'(<img[^>]*src=["\'])(?!(?:https?://[^/"\']*)?/static/res/logo/)([^"\']*)', re.IGNORECASE)
+
+# 文章阅读页模板
+PAGE_TEMPLATE = '''
+    <!DOCTYPE html>
+    <html lang="zh-CN">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <meta http-equiv="X-UA-Compatible" content="ie=edge">
+        <title>{title}</title>
+        </head>
+    <body>
+    <center>
+    <h1 style="text-align:center;">{title}</h1>
+    <div class="author">来源:{source}</div>
+    <div class="author">发布时间:{publish_time}</div>
+    <div class="copyright">
+        <p>
+        本文章仅用于学习和交流目的，不代表本网站观点和立场，如涉及版权问题，请及时联系我们删除。
+        </p>
+    </div>
+    <div id=content>{text}</div>
+    </center>
+    </body>
+    </html>
+    '''
+
 class RSS:
     cache_dir = os.path.normpath("static/cache/rss")
     content_cache_dir = os.path.normpath("static/cache/content")
+    item_cache_dir = os.path.normpath("static/cache/item")
     rss_file="all"
+    # 已检查图片前缀标记时的配置版本
+    _prefix_checked = None
     
     def __init__(self, name:str="all",cache_dir: str = None):
         if cache_dir is not None:
@@ -19,27 +60,431 @@ class RSS:
         self.rss_file = normalized_path
         pass
 
-    def cache_content(self, content_id: str, content: dict):
-        """缓存文章内容"""
-        content["content"]=self.add_logo_prefix_to_urls(content["content"])
+    @classmethod
+    def invalidate(cls, feed_id: str, keep=None):
+        """删除公众号的RSS缓存(各分页及历史版本)
+        Args:
+            keep: 需要保留的缓存文件路径
+        """
+        for path in cls.cached_files(feed_id):
+            if keep and path in keep:
+                continue
+            get_cache("rss").discard(path)
+
+    @classmethod
+    def invalidate_feed_list(cls):
+        """删除RSS订阅列表(all_*)的缓存，公众号添加、修改或删除后调用"""
+        cls.invalidate("all")
+
+    @classmethod
+    def cached_files(cls, feed_id: str) -> list:
+        if not feed_id or os.sep in feed_id or "/" in feed_id:
+            return []
+        return glob.glob(os.path.join(glob.escape(cls.cache_dir), f"{glob.escape(feed_id)}_*.xml"))
+
+    @classmethod
+    def cached_variants(cls, feed_id: str, count: int = None) -> list:
+        """已缓存过的分页参数[(limit, offset)]，按最近访问时间从新到旧排列
+        Args:
+            count: 最多返回的数量，None为全部
+        """
+        cache = get_cache("rss")
+        variants = {}
+        for path in cls.cached_files(feed_id):
+            parts = os.path.basename(path)[len(feed_id) + 1:-4].split("_")
+            if len(parts) >= 2 and parts[0].isdigit() and parts[1].isdigit():
+                key = (int(parts[0]), int(parts[1]))
+                variants[key] = max(variants.get(key, 0), cache.last_access(path))
+        ordered = sorted(variants, key=variants.get, reverse=True)
+        return ordered if count is None else ordered[:max(0, count)]
+
+    @classmethod
+    def latest_cached(cls, feed_id: str, limit: int, offset: int):
+        """该分页最近生成的缓存文件(可能是旧版本)，没有时返回None"""
+        paths = glob.glob(os.path.join(glob.escape(cls.cache_dir), f"{glob.escape(feed_id)}_{limit}_{offset}_*.xml"))
+        paths = [p for p in paths if os.path.exists(p)]
+        if not paths:
+            return None
+        return max(paths, key=lambda p: os.stat(p).st_mtime_ns)
+
+    @staticmethod
+    def file_version(path: str) -> dict:
+        """由缓存文件名和修改时间得到版本信息"""
+        tag = os.path.basename(path)[:-4].rsplit("_", 1)[-1]
+        return {"tag": tag, "etag": f'"{tag}"', "last_modified": int(os.stat(path).st_mtime)}
+
+    @classmethod
+    def feed_version(cls, session, feed, limit: int = 100, offset: int = 0, rss_domain: str = "", cursor: str = None) -> dict:
+        """计算公众号RSS当前版本，有新文章入库或正文更新后版本随之变化
+        Returns:
+            {"tag": 缓存版本号, "etag": 强ETag, "last_modified": 最后修改时间戳}
+        """
+        from sqlalchemy import func
+        from core.models.article import Article
+        from core.config import cfg
+        latest, count, updated = session.query(
+            func.max(Article.publish_time), func.count(), func.max(Article.updated_at)
+        ).filter(Article.mp_id == feed.id).one()
+        updated_ts = int(updated.timestamp()) if updated is not None else 0
+        last_modified = max(int(latest or 0), updated_ts) or int(feed.update_time or 0)
+        key = "|".join(str(v) for v in (
+            feed.id, limit, offset, cursor, latest, count, updated_ts, feed.mp_name, feed.mp_intro, rss_domain,
+            cfg.get("rss.full_context", False), cfg.get("rss.cdata", False), cfg.get("rss.local", False),
+        ))
+        tag = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        return {"tag": tag, "etag": f'"{tag}"', "last_modified": last_modified}
+
+    @staticmethod
+    def cache_headers(version: dict) -> dict:
+        """RSS响应的缓存校验头"""
+        return {
+            "ETag": version["etag"],
+            "Last-Modified": formatdate(version["last_modified"], usegmt=True),
+            "Cache-Control": "no-cache",
+        }
+
+    @staticmethod
+    def is_not_modified(headers, version: dict) -> bool:
+        """按If-None-Match/If-Modified-Since判断客户端缓存是否仍然有效"""
+        if_none_match = headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = [t.strip() for t in if_none_match.split(",")]
+            tags = [strip_encoding_tag(t[2:] if t.startswith("W/") else t) for t in tags]
+            return "*" in tags or version["etag"] in tags
+        if_modified_since = headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                return parsedate_to_datetime(if_modified_since).timestamp() >= version["last_modified"]
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    @classmethod
+    def item_profile(cls, rss_domain: str = None):
+        """当前RSS输出配置对应的<item>片段目录，依赖域名但未提供时返回None"""
+        from core.config import cfg
+        full_context = bool(cfg.get("rss.full_context", False))
+        cdata = bool(cfg.get("rss.cdata", False))
+        local = bool(cfg.get("rss.local", False))
+        if local:
+            if rss_domain is None:
+                rss_domain = cfg.get("rss.base_url", None)
+            if rss_domain is None:
+                return None
+        else:
+            # 非本地链接时片段与域名无关
+            rss_domain = ""
+        key = hashlib.sha1(f"{full_context}|{cdata}|{local}|{rss_domain}".encode("utf-8")).hexdigest()[:12]
+        return {
+            "dir": os.path.join(cls.item_cache_dir, key),
+            "rss_domain": str(rss_domain),
+            "full_context": full_context,
+            "cdata": cdata,
+            "local": local,
+        }
+
+    def _item_path(self, profile: dict, article_id: str) -> str:
+        item_path = os.path.normpath(os.path.join(profile["dir"], f"{article_id}.xml"))
+        if not item_path.startswith(profile["dir"]):
+            raise ValueError("Invalid item path: Path traversal detected.")
+        return item_path
+
+    def render_article(self, article: dict, profile: dict) -> str:
+        """按输出配置渲染一篇文章的<item>片段"""
+        return self.render_item({
+            "id": str(article["id"]),
+            "title": article.get("title"),
+            "link": f"{profile['rss_domain']}rss/feed/{article['id']}" if profile["local"] else article.get("url"),
+            "description": article.get("description") if article.get("description") != "" else article.get("title"),
+            "content": article.get("content"),
+            "updated": datetime.fromtimestamp(int(article.get("publish_time") or 0)),
+        }, full_context=profile["full_context"], cdata=profile["cdata"])
+
+    def cache_items(self, articles: list, profile: dict = None) -> int:
+        """文章入库时预先渲染<item>片段
+        Args:
+            articles: 文章字段字典列表(id/title/url/description/content/publish_time)
+        Returns:
+            写入的片段数
+        """
+        profile = profile or self.item_profile()
+        if profile is None:
+            return 0
+        cache = get_cache("item")
+        count = 0
+        for article in articles:
+            item_path = self._item_path(profile, article["id"])
+            cache.write_bytes(item_path, self.render_article(article, profile).encode("utf-8"))
+            count += 1
+        return count
+
+    @classmethod
+    def drop_article(cls, article_id: str):
+        """文章正文变化后删除其<item>片段和内容缓存"""
+        if not article_id or os.sep in article_id or "/" in article_id:
+            return
+        for path in glob.glob(os.path.join(glob.escape(cls.item_cache_dir), "*", f"{glob.escape(article_id)}.xml")):
+            get_cache("item").discard(path)
+        for ext in (".json", ".html"):
+            get_cache("content").discard(os.path.join(cls.content_cache_dir, f"{article_id}{ext}"))
+
+    @staticmethod
+    def page_slot(offset: int = 0, cursor: str = None) -> str:
+        """缓存文件名中的分页标识，游标分页使用游标摘要"""
+        if cursor:
+            return "c" + hashlib.sha1(cursor.encode("utf-8")).hexdigest()[:12]
+        return str(offset)
+
+    @staticmethod
+    def page_query(feed_id: str, limit: int = 100, offset: int = 0, cursor: str = None):
+        """一页文章(id, publish_time)的查询语句
+        传入游标时从游标之后开始(keyset分页)，否则使用offset
+        """
+        from sqlalchemy import select
+        from core.models.article import Article
+        stmt = keyset(select(Article.id, Article.publish_time).where(Article.mp_id == feed_id),
+                      Article.publish_time, Article.id, cursor)
+        if not cursor:
+            stmt = stmt.offset(offset)
+        return stmt.limit(limit)
+
+    @staticmethod
+    def page_link(rows: list, feed, rss_domain: str, limit: int):
+        """本页已取满时返回下一页链接"""
+        cursor = next_cursor(rows, limit, "publish_time")
+        return f"{rss_domain}rss/{feed.id}?limit={limit}&cursor={cursor}" if cursor else None
+
+    def feed_page(self, session, feed, rss_domain: str, limit: int = 100, offset: int = 0, cursor: str = None):
+        """查询一页文章ID，返回(<item>片段生成器, 下一页链接)"""
+        rows = session.execute(self.page_query(feed.id, limit, offset, cursor)).all()
+        # 先归还连接，流式输出期间只在补齐缺失片段时再取连接(会话关闭后仍可继续使用)
+        session.close()
+        return self.feed_items(session, feed, rss_domain, [row.id for row in rows]), self.page_link(rows, feed, rss_domain, limit)
+
+    async def feed_page_async(self, session, feed, rss_domain: str, limit: int = 100, offset: int = 0, cursor: str = None):
+        """feed_page的异步版本：用异步会话查询本页文章ID
+        缺失片段在流式输出时(线程池中)用新的同步会话补齐
+        """
+        from core.db import DB
+        rows = (await session.execute(self.page_query(feed.id, limit, offset, cursor))).all()
+        return self.feed_items(DB.get_session(), feed, rss_domain, [row.id for row in rows]), self.page_link(rows, feed, rss_domain, limit)
+
+    def feed_items(self, session, feed, rss_domain: str, ids: list):
+        """按ids顺序逐条读出文章的<item>片段，结束后关闭会话
+        缺失的片段从数据库补齐后再读出
+        """
+        from core.models.article import Article
+        from core.models.article_content import ArticleContent
+        from core.config import cfg
+        profile = self.item_profile(str(rss_domain))
+        try:
+            cache = get_cache("item")
+            missing = [i for i in ids if cache.get(self._item_path(profile, i)) is None]
+            if missing:
+                columns = (Article.id, Article.title, Article.url, Article.description, Article.publish_time)
+                query = session.query(*columns)
+                # 只有全文输出时才读取正文
+                if profile["full_context"]:
+                    query = query.add_columns(ArticleContent.content, ArticleContent.data, ArticleContent.codec)\
+                        .outerjoin(ArticleContent, ArticleContent.article_id == Article.id)
+                rows = query.filter(Article.id.in_(missing))\
+                    .yield_per(int(cfg.get("rss.fetch_size", 20)))
+                for row in rows:
+                    self.cache_items([decode_row(row._asdict())], profile)
+        finally:
+            session.close()
+        for article_id in ids:
+            try:
+                with open(self._item_path(profile, article_id), "r", encoding="utf-8") as f:
+                    yield f.read()
+            except FileNotFoundError:
+                pass
+
+    def _content_path(self, content_id: str) -> str:
         content_path = os.path.normpath(f"{self.content_cache_dir}/{content_id}.json")
         if not content_path.startswith(self.content_cache_dir):
             raise ValueError("Invalid content path: Path traversal detected.")
-        
-        with open(content_path, "w", encoding="utf-8") as f:
-            json.dump(content, f, ensure_ascii=False, indent=2)
+        return content_path
+
+    @staticmethod
+    def image_prefix() -> str:
+        """文章图片代理地址前缀，配置了rss.base_url时使用绝对地址"""
+        from core.config import cfg
+        base_url = str(cfg.get("rss.base_url", "") or "")
+        return base_url.rstrip("/") + "/static/res/logo/"
+
+    @classmethod
+    def check_content_prefix(cls):
+        """图片前缀(rss.base_url)变化后清空文章内容缓存
+        前缀记录在缓存目录的标记文件中，首次使用目录时写入标记，配置版本不变时不再检查
+        """
+        from core.config import cfg
+        if cls._prefix_checked == cfg.version:
+            return
+        prefix = cls.image_prefix()
+        marker = os.path.join(cls.content_cache_dir, ".image_prefix")
+        try:
+            with open(marker, "r", encoding="utf-8") as f:
+                old = f.read()
+        except FileNotFoundError:
+            old = None
+        if old != prefix:
+            # 没有标记文件(升级后首次运行或新目录)时只记录前缀，不清空缓存；
+            # 各缓存文件开头也记录了图片前缀，读取时不一致的会单独重新生成
+            if old is not None:
+                get_cache("content").clear()
+            atomic_write(marker, prefix.encode("utf-8"))
+        cls._prefix_checked = cfg.version
+
+    def _cached_version(self, content_path: str):
+        """读取缓存文件开头记录的正文哈希和图片前缀，不解析整个文件"""
+        try:
+            with open(content_path, "r", encoding="utf-8") as f:
+                head = f.read(512)
+        except FileNotFoundError:
+            return None
+        match = re.match(r'\{"content_hash":"([0-9a-f]+)","image_prefix":("(?:[^"\\]|\\.)*")', head)
+        return (match.group(1), json.loads(match.group(2))) if match else None
+
+    def _render_content(self, content: dict, content_hash: str) -> dict:
+        """替换图片地址，得到缓存的文章内容"""
+        prefix = self.image_prefix()
+        data = {"content_hash": content_hash, "image_prefix": prefix}
+        data.update(content)
+        data["content"] = self.add_logo_prefix_to_urls(content["content"], prefix)
+        return data
+
+    def _write_content(self, content_path: str, data: dict):
+        """写入文章内容缓存及阅读页"""
+        get_cache("content").write_bytes(content_path, json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        self._write_page(content_path[:-5] + ".html", data)
+
+    def _write_page(self, page_path: str, data: dict):
+        writer = ArtifactWriter(page_path)
+        try:
+            writer.write(self.render_page(data))
+            writer.commit()
+        except Exception:
+            writer.discard()
+            raise
+        get_cache("content").put(page_path)
+
+    def cache_content(self, content_id: str, content: dict, content_hash: str = None) -> bool:
+        """缓存文章内容并生成阅读页，正文和图片前缀都未变化时跳过
+        Returns:
+            是否写入了缓存文件
+        """
+        if not content.get("content"):
+            return False
+        if content_hash is None:
+            from core.db import content_hash as hash_content
+            content_hash = hash_content(content["content"])
+        self.check_content_prefix()
+        content_path = self._content_path(content_id)
+        if self._cached_version(content_path) == (content_hash, self.image_prefix()):
+            return False
+        self._write_content(content_path, self._render_content(content, content_hash))
+        return True
+
+    def cache_contents(self, articles: list) -> int:
+        """文章入库时生成内容缓存和阅读页
+        Args:
+            articles: 文章字段字典列表(id/mp_id/title/content/content_hash/publish_time)
+        Returns:
+            写入的文章数
+        """
+        articles = [article for article in articles if article.get("content")]
+        if not articles:
+            return 0
+        from core.db import DB
+        from core.models.feed import Feed
+        session = DB.get_session()
+        try:
+            mp_ids = {article.get("mp_id") for article in articles}
+            names = dict(session.query(Feed.id, Feed.mp_name).filter(Feed.id.in_(mp_ids)).all())
+        finally:
+            session.close()
+        count = 0
+        for article in articles:
+            content = {
+                "id": article["id"],
+                "title": article.get("title"),
+                "content": article["content"],
+                "publish_time": article.get("publish_time"),
+                "mp_id": article.get("mp_id"),
+                "mp_name": names.get(article.get("mp_id")),
+            }
+            if self.cache_content(article["id"], content, content_hash=article.get("content_hash")):
+                count += 1
+        return count
 
     def get_cached_content(self, content_id: str) -> dict:
         """获取缓存的文章内容"""
-        content_path = os.path.normpath(f"{self.content_cache_dir}/{content_id}.json")
-        if not content_path.startswith(self.content_cache_dir):
-            raise ValueError("Invalid content path: Path traversal detected.")
-        
+        self.check_content_prefix()
+        content_path = self._content_path(content_id)
+        if get_cache("content").get(content_path) is None:
+            return None
         try:
             with open(content_path, "r", encoding="utf-8") as f:
                 return json.load(f)
         except FileNotFoundError:
             return None
+
+    def get_content(self, content_id: str) -> dict:
+        """获取文章内容，缓存未命中时从数据库读取并写入缓存
+        Returns:
+            文章内容(图片地址已加前缀)，文章不存在或没有正文时返回None
+        """
+        content = self.get_cached_content(content_id)
+        if content is not None:
+            return content
+        from core.db import DB, content_hash
+        from core.models.article import Article
+        from core.models.article_content import ArticleContent
+        from core.models.feed import Feed
+        session = DB.get_session()
+        try:
+            row = session.query(Article, Feed.mp_name, ArticleContent)\
+                .join(ArticleContent, ArticleContent.article_id == Article.id)\
+                .outerjoin(Feed, Feed.id == Article.mp_id)\
+                .filter(Article.id == content_id).first()
+        finally:
+            session.close()
+        if row is None or not row[2].body:
+            return None
+        article, mp_name, body = row[0], row[1], row[2].body
+        data = self._render_content({
+            "id": article.id,
+            "title": article.title,
+            "content": body,
+            "publish_time": article.publish_time,
+            "mp_id": article.mp_id,
+            "mp_name": mp_name
+        }, article.content_hash or content_hash(body))
+        self._write_content(self._content_path(article.id), data)
+        return data
+
+    def render_page(self, content: dict) -> str:
+        """生成文章阅读页HTML"""
+        return PAGE_TEMPLATE.format(title=content.get('title'),text=content.get('content'),source=content.get('mp_name'),publish_time=content.get('publish_time'))
+
+    def content_page(self, content_id: str):
+        """获取文章阅读页文件(含预压缩副本)
+        阅读页在文章入库时生成，缓存被淘汰后在首次访问时重新生成
+        Returns:
+            阅读页文件路径，文章不存在时返回None
+        """
+        self.check_content_prefix()
+        page_path = self._content_path(content_id)[:-5] + ".html"
+        if get_cache("content").get(page_path) is not None:
+            return page_path
+        content = self.get_content(content_id)
+        if content is None:
+            return None
+        if not os.path.exists(page_path):
+            self._write_page(page_path, content)
+        return page_path
+
     def serialize_datetime(self,obj):
         if isinstance(obj, datetime):
             return obj.isoformat
@@ -102,22 +547,103 @@ class RSS:
                 ET.tostring(rss, encoding="utf-8", method="xml", short_empty_elements=False).decode("utf-8")
         
         if self.rss_file is not None:
-            with open(self.rss_file, "w", encoding="utf-8") as f:
-                f.write(tree_str)
+            # 旧的压缩副本已过期，先删除再原子写入
+            for _, ext in ENCODINGS:
+                remove_file(self.rss_file + ext)
+            get_cache("rss").write_bytes(self.rss_file, tree_str.encode("utf-8"))
         return tree_str
 
-    def add_logo_prefix_to_urls(self, text: str) -> str:
-        """在字符串中所有http/https开头的图片URL前添加/static/res/logo/前缀
+    def _text(self, value) -> str:
+        if value is None:
+            return ""
+        return escape(str(value))
+
+    def _cdata(self, value) -> str:
+        if value is None:
+            return ""
+        return "<![CDATA[" + str(value).replace("]]>", "]]]]><![CDATA[>") + "]]>"
+
+    def render_item(self, rss_item: dict, full_context: bool = False, cdata: bool = False) -> str:
+        """渲染单个<item>片段，字段与generate_rss一致"""
+        parts = [
+            "<item>",
+            f"<id>{self._text(rss_item['id'])}</id>",
+            f"<title>{self._text(rss_item['title'])}</title>",
+            f"<description>{self._text(rss_item['description'])}</description>",
+            f"<guid>{self._text(rss_item['link'])}</guid>",
+        ]
+        if full_context:
+            content = self._cdata(rss_item.get('content')) if cdata else self._text(rss_item.get('content'))
+            parts.append(f"<content:encoded>{content}</content:encoded>")
+        parts.append(f"<link>{self._text(rss_item['link'])}</link>")
+        parts.append(f"<pubDate>{self.datetime_to_rfc822(str(rss_item['updated']))}</pubDate>")
+        parts.append("</item>")
+        return "".join(parts)
+
+    def stream_rss(self, rss_items, title: str = "Mp-We-Rss",
+                    link: str = "https://github.com/rachelos/we-mp-rss",
+                    description: str = "RSS频道", language: str = "zh-CN", next_link: str = None):
+        """流式生成RSS，逐条渲染rss_items(可为数据库游标或已渲染的<item>片段)并同时写入缓存文件
+        缓存先写入临时文件，完整输出后再原子替换，中途断开时丢弃
+        Yields:
+            XML文本片段
+        """
+        from core.config import cfg
+        full_context = bool(cfg.get("rss.full_context", False))
+        cdata = bool(cfg.get("rss.cdata", False))
+        ns = ' xmlns:content="http://purl.org/rss/1.0/modules/content/"' if full_context else ""
+        paging = ""
+        if next_link:
+            # RFC 5005 分页：下一页链接
+            ns += ' xmlns:atom="http://www.w3.org/2005/Atom"'
+            paging = f'<atom:link rel="next" href="{escape(next_link, {chr(34): "&quot;"})}"></atom:link>'
+        head = ('<?xml version="1.0" encoding="utf-8"?>\r\n'
+                f'<rss version="2.0"{ns}><channel>'
+                f"<title>{self._text(title)}</title>"
+                f"<link>{self._text(link)}</link>"
+                f"<description>{self._text(description)}</description>"
+                f"<language>{self._text(language)}</language>"
+                "<generator>Mp-We-Rss</generator>"
+                f"<lastBuildDate>{datetime.now().strftime('%a, %d %b %Y %H:%M:%S %z')}</lastBuildDate>"
+                f"{paging}")
+        # 缓存文件及其预压缩副本
+        cache = ArtifactWriter(self.rss_file) if self.rss_file is not None else None
+        try:
+            for chunk in self._iter_rss(head, rss_items, full_context, cdata):
+                if cache is not None:
+                    cache.write(chunk)
+                yield chunk
+            if cache is not None:
+                cache.commit()
+                cache = None
+                get_cache("rss").put(self.rss_file)
+        finally:
+            if cache is not None:
+                cache.discard()
+
+    def _iter_rss(self, head: str, rss_items, full_context: bool, cdata: bool):
+        yield head
+        for rss_item in rss_items:
+            # 已渲染的<item>片段直接输出
+            if isinstance(rss_item, str):
+                yield rss_item
+            else:
+                yield self.render_item(rss_item, full_context=full_context, cdata=cdata)
+        yield "</channel></rss>"
+
+    def add_logo_prefix_to_urls(self, text: str, prefix: str = None) -> str:
+        """在字符串中所有http/https开头的图片URL前添加图片代理前缀
         
         Args:
             text: 包含URL的原始字符串
+            prefix: 图片代理前缀，默认为image_prefix()
             
         Returns:
             处理后的字符串，所有图片URL前添加了前缀
         """
-        import re
+        if prefix is None:
+            prefix = self.image_prefix()
         try:
-            pattern = re.compile(r'(<img[^>]*src=["\'])(?!\/static\/res\/logo\/)([^"\']*)', re.IGNORECASE)
-            return pattern.sub(r'\1/static/res/logo/\2', text)
+            return IMG_SRC_PATTERN.sub(lambda m: m.group(1) + prefix + m.group(2), text)
         except:
             return text
\ No newline at end of file
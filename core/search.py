@@ -0,0 +1,270 @@
+import re
+import html
+import threading
+from sqlalchemy import text, select
+from core.config import cfg
+from core.print import print_info,print_error,print_warning
+# 文章全文检索：标题、摘要和正文文本写入 article_search 表
+# SQLite 使用 FTS5(trigram分词)外部内容表，MySQL 使用 ngram 全文索引，其他数据库回退为 LIKE
+# 文章入库或正文变化时同步(Db._articles_changed)，已有文章在启动时后台补齐
+
+FTS_TABLE = "article_search_fts"
+# 片段中命中词的标记，输出时替换为<mark>(先转义文本，避免正文中的<>被当作HTML)
+MARK_START, MARK_END = "\ue000", "\ue001"
+
+# 块级标签替换为空格，其余(行内)标签直接去除，避免把正文中的词拆开
+_SCRIPT_PATTERN = re.compile(r"<(script|style)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_BLOCK_TAG_PATTERN = re.compile(r"</?(?:p|div|br|li|ul|ol|h[1-6]|tr|td|th|table|section|blockquote|pre|hr)\b[^>]*>", re.IGNORECASE)
+_TAG_PATTERN = re.compile(r"<[^>]+>")
+_SPACE_PATTERN = re.compile(r"\s+")
+
+def enabled() -> bool:
+    return bool(cfg.get("search.enabled", True))
+
+def to_text(content: str) -> str:
+    """去除HTML标签，得到用于检索的纯文本"""
+    if not content:
+        return ""
+    content = _BLOCK_TAG_PATTERN.sub(" ", _SCRIPT_PATTERN.sub(" ", content))
+    return _SPACE_PATTERN.sub(" ", html.unescape(_TAG_PATTERN.sub("", content))).strip()
+
+# 各SQLite库是否支持FTS5 trigram分词，按数据库缓存探测结果(同步与异步引擎共用)
+_fts5_support = {}
+
+def _fts5_trigram(engine) -> bool:
+    """探测链接的SQLite是否带FTS5且支持trigram分词(SQLite>=3.34)，在临时库中建表测试"""
+    key = (engine.dialect.name, engine.url.database)
+    if key not in _fts5_support:
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("CREATE VIRTUAL TABLE IF NOT EXISTS temp.fts5_probe USING fts5(x, tokenize='trigram')"))
+                conn.execute(text("DROP TABLE temp.fts5_probe"))
+            _fts5_support[key] = True
+        except Exception as e:
+            print_warning(f"当前SQLite不支持FTS5 trigram分词(需要3.34以上)，全文检索改用LIKE: {e}")
+            _fts5_support[key] = False
+    return _fts5_support[key]
+
+def backend(engine) -> str:
+    """当前数据库使用的检索方式: fts5 / fulltext / like"""
+    name = engine.dialect.name
+    if name == "sqlite":
+        return "fts5" if _fts5_trigram(engine) else "like"
+    if name == "mysql" and not getattr(engine.dialect, "is_mariadb", False):
+        return "fulltext"
+    return "like"
+
+def ensure_schema(engine):
+    """创建检索表，SQLite上另建FTS5索引表及同步触发器(MySQL全文索引随模型创建)"""
+    from core.models.article_search import ArticleSearch
+    ArticleSearch.__table__.create(engine, checkfirst=True)
+    if backend(engine) != "fts5":
+        return
+    statements = [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+            title, description, body, content='article_search', content_rowid='id', tokenize='trigram')""",
+        f"""CREATE TRIGGER IF NOT EXISTS article_search_ai AFTER INSERT ON article_search BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, title, description, body) VALUES (new.id, new.title, new.description, new.body);
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS article_search_ad AFTER DELETE ON article_search BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, body) VALUES ('delete', old.id, old.title, old.description, old.body);
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS article_search_au AFTER UPDATE ON article_search BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, body) VALUES ('delete', old.id, old.title, old.description, old.body);
+            INSERT INTO {FTS_TABLE}(rowid, title, description, body) VALUES (new.id, new.title, new.description, new.body);
+        END""",
+    ]
+    with engine.begin() as conn:
+        for sql in statements:
+            conn.execute(text(sql))
+
+def index_articles(articles: list, engine=None) -> int:
+    """写入或更新文章的检索内容
+    Args:
+        articles: 文章字段字典列表(id/mp_id/title/description/content)
+    Returns:
+        写入的文章数
+    """
+    if not articles or not enabled():
+        return 0
+    from core.models.article_search import ArticleSearch
+    table = ArticleSearch.__table__
+    rows = {}
+    for article in articles:
+        rows[str(article["id"])] = {
+            "article_id": str(article["id"]),
+            "mp_id": article.get("mp_id"),
+            "title": article.get("title") or "",
+            "description": article.get("description") or "",
+            "body": to_text(article.get("content")),
+        }
+    def write(conn):
+        # 先删后插，FTS5由触发器同步
+        conn.execute(table.delete().where(table.c.article_id.in_(list(rows))))
+        conn.execute(table.insert(), list(rows.values()))
+    _write(write, engine)
+    return len(rows)
+
+def _write(fn, engine=None):
+    """未指定engine时交给数据库写线程执行(见Db.write)"""
+    if engine is None:
+        from core.db import DB
+        DB.write(fn)
+        return
+    with engine.begin() as conn:
+        fn(conn)
+
+def remove_articles(article_ids: list, engine=None):
+    """从检索表中删除文章"""
+    if not article_ids:
+        return
+    from core.models.article_search import ArticleSearch
+    table = ArticleSearch.__table__
+    _write(lambda conn: conn.execute(table.delete().where(table.c.article_id.in_([str(i) for i in article_ids]))), engine)
+
+def backfill(engine=None, batch: int = None) -> int:
+    """为尚未建立检索内容的文章补齐索引(按文章ID顺序单次遍历)
+    Returns:
+        补齐的文章数
+    """
+    if not enabled():
+        return 0
+    from core.models.article import Article
+    from core.models.article_content import ArticleContent
+    from core.models.article_search import ArticleSearch
+    from core.content_codec import decode_row
+    # 写入检索内容时使用调用方指定的engine，未指定时交给数据库写线程
+    write_engine = engine
+    if engine is None:
+        from core.db import DB
+        engine = DB.get_engine()
+    batch = int(batch or cfg.get("search.backfill_batch", 500))
+    total = 0
+    last_id = ""
+    while True:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                select(Article.id, ArticleSearch.id.label("search_id"))
+                .outerjoin(ArticleSearch, ArticleSearch.article_id == Article.id)
+                .where(Article.id > last_id)
+                .order_by(Article.id).limit(batch)
+            ).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            # 只为缺少检索内容的文章读取正文
+            missing_ids = [row.id for row in rows if row.search_id is None]
+            missing = []
+            if missing_ids:
+                missing = [decode_row(row._asdict()) for row in conn.execute(
+                    select(Article.id, Article.mp_id, Article.title, Article.description,
+                           ArticleContent.content, ArticleContent.data, ArticleContent.codec)
+                    .outerjoin(ArticleContent, ArticleContent.article_id == Article.id)
+                    .where(Article.id.in_(missing_ids))
+                )]
+        total += index_articles(missing, write_engine)
+    if total:
+        print_info(f"全文检索：补齐{total}篇文章")
+    return total
+
+def start_backfill():
+    """在后台线程中补齐检索索引"""
+    def run():
+        try:
+            from core.db import DB
+            ensure_schema(DB.get_engine())
+            backfill()
+        except Exception as e:
+            print_error(f"全文检索补齐失败: {e}")
+    if enabled():
+        threading.Thread(target=run, name="search-backfill", daemon=True).start()
+
+def _terms(keyword: str) -> list:
+    return [t for t in _SPACE_PATTERN.split((keyword or "").strip()) if t]
+
+def highlight(snippet: str) -> str:
+    """转义片段文本并把命中标记替换为<mark>"""
+    return html.escape(snippet or "", quote=False).replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
+
+def make_snippet(value: str, terms: list, width: int = 60) -> str:
+    """在文本中截取第一个命中词附近的片段并标记命中词(FTS5之外的检索方式使用)"""
+    value = value or ""
+    lowered = value.lower()
+    positions = [lowered.find(t.lower()) for t in terms]
+    positions = [p for p in positions if p >= 0]
+    start = max(0, min(positions) - width // 2) if positions else 0
+    piece = value[start:start + width]
+    for t in terms:
+        piece = re.sub(re.escape(t), lambda m: MARK_START + m.group(0) + MARK_END, piece, flags=re.IGNORECASE)
+    return ("…" if start > 0 else "") + piece + ("…" if start + width < len(value) else "")
+
+def search(session, keyword: str, mp_id: str = None, limit: int = 20, offset: int = 0, with_total: bool = True):
+    """全文检索文章(排除已删除)，按相关度排序
+    Returns:
+        ([{"id": 文章ID, "score": 相关度, "snippet": 带<mark>的片段}], 总数或None)
+    """
+    from core.models.base import DATA_STATUS
+    terms = _terms(keyword)
+    if not terms:
+        return [], 0
+    mode = backend(session.get_bind())
+    # trigram分词无法匹配少于3个字符的词(中文常见的两字词)：
+    # 有3字以上的词时先用FTS5缩小范围，短词只在命中的文章中用LIKE过滤；
+    # 全部是短词时改用LIKE，默认只检索标题和摘要(search.short_term_body开启时包括正文，需全表扫描)
+    short_terms = [t for t in terms if len(t) < 3] if mode == "fts5" else []
+    long_terms = [t for t in terms if t not in short_terms]
+    like_columns = ("title", "description", "body")
+    if mode == "fts5" and not long_terms:
+        mode = "like"
+        if not cfg.get("search.short_term_body", False):
+            like_columns = ("title", "description")
+    params = {"deleted": DATA_STATUS.DELETED, "limit": limit, "offset": offset}
+    where = "a.status != :deleted"
+    if mp_id:
+        where += " AND s.mp_id = :mp_id"
+        params["mp_id"] = mp_id
+
+    def like_conditions(like_terms, columns):
+        conditions = []
+        for i, t in enumerate(like_terms):
+            # 使用!作为转义字符，各数据库写法一致
+            params[f"t{i}"] = "%" + t.replace("!", "!!").replace("%", "!%").replace("_", "!_") + "%"
+            conditions.append("(" + " OR ".join(f"s.{c} LIKE :t{i} ESCAPE '!'" for c in columns) + ")")
+        return conditions
+    if mode == "fts5":
+        params["q"] = " ".join('"' + t.replace('"', '""') + '"' for t in long_terms)
+        for condition in like_conditions(short_terms, like_columns):
+            where += f" AND {condition}"
+        source = (f"FROM {FTS_TABLE} JOIN article_search s ON s.id = {FTS_TABLE}.rowid "
+                  f"JOIN articles a ON a.id = s.article_id WHERE {FTS_TABLE} MATCH :q AND {where}")
+        # 标题、摘要命中的权重高于正文
+        sql = (f"SELECT s.article_id, bm25({FTS_TABLE}, 10.0, 5.0, 1.0) AS score, "
+               f"snippet({FTS_TABLE}, -1, '{MARK_START}', '{MARK_END}', '…', 24) AS snippet "
+               f"{source} ORDER BY score LIMIT :limit OFFSET :offset")
+    elif mode == "fulltext":
+        params["q"] = " ".join('+"' + t.replace('"', ' ') + '"' for t in terms)
+        match = "MATCH(s.title, s.description, s.body) AGAINST(:q IN BOOLEAN MODE)"
+        source = f"FROM article_search s JOIN articles a ON a.id = s.article_id WHERE {match} AND {where}"
+        sql = (f"SELECT s.article_id, {match} AS score, s.title, s.description, s.body "
+               f"{source} ORDER BY score DESC LIMIT :limit OFFSET :offset")
+    else:
+        conditions = like_conditions(terms, like_columns)
+        source = f"FROM article_search s JOIN articles a ON a.id = s.article_id WHERE {' AND '.join(conditions)} AND {where}"
+        sql = (f"SELECT s.article_id, 0 AS score, s.title, s.description, s.body "
+               f"{source} ORDER BY a.publish_time DESC, a.id DESC LIMIT :limit OFFSET :offset")
+    results = []
+    for row in session.execute(text(sql), params).mappings():
+        if mode == "fts5":
+            snippet = row["snippet"]
+            # bm25越小越相关，取相反数使分数越大越相关
+            score = -row["score"]
+        else:
+            value = next((row[c] for c in ("title", "description", "body")
+                          if any(t.lower() in (row[c] or "").lower() for t in terms)), row["body"])
+            snippet = make_snippet(value, terms)
+            score = float(row["score"] or 0)
+        results.append({"id": row["article_id"], "score": round(score, 4), "snippet": highlight(snippet)})
+    total = None
+    if with_total:
+        total = session.execute(text(f"SELECT COUNT(*) {source}"), params).scalar()
+    return results, total
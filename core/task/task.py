@@ -1,6 +1,7 @@
 import threading
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from typing import Callable, Any, Optional
 from core.log import logger
 # 设置日志
@@ -91,28 +92,57 @@ class TaskScheduler:
                     day_of_week=day_of_week
                 )
                 
-                # 包装任务函数以捕获异常
-                def wrapped_func(*args, **kwargs):
-                    try:
-                        # logger.info(f"Executing job {job_id or 'anonymous'}")
-                        return func(*args, **kwargs)
-                    except Exception as e:
-                        logger.error(f"Job {job_id or 'anonymous'} failed: {str(e)}")
-                        raise
-                
-                job = self._scheduler.add_job(
-                    wrapped_func,
-                    trigger=trigger,
-                    args=args,
-                    kwargs=kwargs,
-                    id=job_id
-                )
-                self._jobs[job.id] = job
-                logger.info(f"Successfully added job {job.id}")
-                return job.id
+                return self._add_job(func, trigger, args, kwargs, job_id)
             except Exception as e:
                 logger.error(f"Failed to add cron job: {str(e)}")
                 raise
+
+    def add_interval_job(self,
+                        func: Callable,
+                        minutes: int,
+                        args: Optional[tuple] = None,
+                        kwargs: Optional[dict] = None,
+                        job_id: Optional[str] = None) -> str:
+        """
+        添加一个固定间隔执行的任务，适用于间隔超过一小时等无法用"*/n"表示的周期
+
+        :param func: 要执行的函数
+        :param minutes: 执行间隔(分钟)，须大于0
+        :param args: 函数的位置参数
+        :param kwargs: 函数的关键字参数
+        :param job_id: 任务ID，如果不指定则自动生成
+        :return: 任务ID
+        """
+        with self._lock:
+            try:
+                if int(minutes) <= 0:
+                    raise ValueError(f"Invalid interval: {minutes}. Expected a positive number of minutes.")
+                logger.info(f"Adding interval job every {minutes} minutes")
+                return self._add_job(func, IntervalTrigger(minutes=int(minutes)), args, kwargs, job_id)
+            except Exception as e:
+                logger.error(f"Failed to add interval job: {str(e)}")
+                raise
+
+    def _add_job(self, func: Callable, trigger, args, kwargs, job_id) -> str:
+        # 包装任务函数以捕获异常
+        def wrapped_func(*args, **kwargs):
+            try:
+                # logger.info(f"Executing job {job_id or 'anonymous'}")
+                return func(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"Job {job_id or 'anonymous'} failed: {str(e)}")
+                raise
+
+        job = self._scheduler.add_job(
+            wrapped_func,
+            trigger=trigger,
+            args=args,
+            kwargs=kwargs,
+            id=job_id
+        )
+        self._jobs[job.id] = job
+        logger.info(f"Successfully added job {job.id}")
+        return job.id
     
     def remove_job(self, job_id: str) -> bool:
         """
@@ -0,0 +1,131 @@
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from core.print import print_error,print_warning
+# SQLite单写线程：写操作排队后由同一个线程执行，避免多个线程同时写入时争抢文件锁("database is locked")
+# 写线程每次取出队列中积压的全部写操作(最多batch_size个)在一个事务中执行，合并为一次提交
+
+class WriteQueue:
+    """写操作队列
+    写操作为 fn(session) 形式的函数，由写线程执行后统一提交，调用方等待提交完成后得到fn的返回值
+    """
+    def __init__(self, session_factory, batch_size: int = 100, name: str = "db-writer"):
+        self._session_factory = session_factory
+        self.batch_size = max(1, int(batch_size))
+        self.name = name
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.tasks = 0
+        self.batches = 0
+        self.retried = 0
+        self.failed = 0
+        self.max_batch = 0
+        self.wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    def submit(self, fn) -> Future:
+        """提交写操作，返回在提交完成后得到结果的Future"""
+        future = Future()
+        self._start()
+        self._queue.put((fn, future, time.perf_counter()))
+        return future
+
+    def run(self, fn):
+        """提交写操作并等待提交完成，写线程内部调用时直接执行"""
+        if threading.current_thread() is self._thread:
+            return self._execute_one(fn)
+        return self.submit(fn).result()
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # 不额外等待，只合并已经在排队的写操作
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            now = time.perf_counter()
+            for _, _, queued in batch:
+                wait = (now - queued) * 1000
+                self.wait_ms += wait
+                self.max_wait_ms = max(self.max_wait_ms, wait)
+            try:
+                self._execute(batch)
+            except Exception as e:
+                print_error(f"写线程异常: {e}")
+
+    def _execute(self, batch: list):
+        session = self._session_factory()
+        results = []
+        try:
+            for fn, _, _ in batch:
+                results.append(fn(session))
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            session.close()
+            if len(batch) == 1:
+                self._finish(batch[0][1], exception=e)
+                return
+            # 合并提交失败时逐个重新执行，只让出错的写操作失败
+            print_warning(f"合并写入失败，逐个重试{len(batch)}个写操作: {e}")
+            self.retried += len(batch)
+            for fn, future, _ in batch:
+                try:
+                    self._finish(future, result=self._execute_one(fn))
+                except Exception as err:
+                    self._finish(future, exception=err)
+            return
+        session.close()
+        self.batches += 1
+        self.max_batch = max(self.max_batch, len(batch))
+        for (_, future, _), result in zip(batch, results):
+            self._finish(future, result=result)
+
+    def _execute_one(self, fn):
+        session = self._session_factory()
+        try:
+            result = fn(session)
+            session.commit()
+            self.batches += 1
+            return result
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def _finish(self, future: Future, result=None, exception: Exception = None):
+        self.tasks += 1
+        if exception is not None:
+            self.failed += 1
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending(),
+            "tasks": self.tasks,
+            "batches": self.batches,
+            "avg_batch": round(self.tasks / self.batches, 2) if self.batches else None,
+            "max_batch": self.max_batch,
+            "retried": self.retried,
+            "failed": self.failed,
+            "avg_wait_ms": round(self.wait_ms / self.tasks, 3) if self.tasks else None,
+            "max_wait_ms": round(self.max_wait_ms, 3),
+        }
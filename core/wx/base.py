@@ -1,4 +1,3 @@
-import requests
 import json
 from core.models import Feed
 
@@ -7,6 +6,13 @@ from core.models.feed import Feed
 from core.config import Config
 from core.config import cfg
 from core.print import print_error,print_info
+from core.wx.governor import governor,INTERACTIVE,BACKGROUND
+from core.http import get_session
+
+def batch_callback(func):
+    """标记文章回调接收整批文章(list[dict])并返回list[bool]"""
+    func.batch=True
+    return func
 
 # 定义基类
 class WxGather:
@@ -15,25 +21,39 @@ class WxGather:
         if getattr(self, 'articles', None) is not None:
             return len(self.articles)
         return 0
-    def Model(self):
-        if cfg.get("gather.model","web")=="web":
+    def Model(self,priority:int=BACKGROUND,incremental:bool=True):
+        """按配置返回采集实例
+        Args:
+            priority: 请求优先级，接口中手动触发的采集使用INTERACTIVE
+            incremental: 是否在到达已采集位置时停止翻页(需开启gather.incremental)，
+                手动刷新和添加公众号后的回填传False，按MaxPage完整翻页
+        """
+        model=cfg.get("gather.model","web")
+        if model=="web":
             from core.wx import MpsWeb
             wx=MpsWeb()
+        elif model=="async":
+            from core.wx import MpsAsync
+            wx=MpsAsync()
         else:
             from core.wx import MpsApi
             wx=MpsApi()
+        wx.priority=priority
+        wx.stop_at_known=incremental
         return wx
     def __init__(self,is_add:bool=False):
         self.articles=[]
         self.is_add=is_add
-        session=  requests.Session()
-        timeout = (5, 10)
-        session.timeout = timeout
-        self.session=session
+        self.priority=BACKGROUND
+        # 增量采集时到达已采集位置即停止翻页，见Model
+        self.stop_at_known=True
+        # 同一进程内的采集实例共享连接池
+        self.session=get_session("wx")
         self.get_token()
     def get_token(self):
         cfg.reload()
         self.Gather_Content=cfg.get('gather.content',False)
+        self.Incremental=cfg.get('gather.incremental',True)
         self.user_agent = cfg.get('user_agent', '')
         self.cookies = cfg.get('cookie', '')
         self.token=cfg.get('token','')
@@ -41,27 +61,176 @@ class WxGather:
             "Cookie":self.cookies,
             "User-Agent": self.user_agent 
         }
+    def to_article(self,data:dict)->dict:
+        """将采集到的文章数据转换为入库字段"""
+        art={
+            "id":str(data['id']),
+            "mp_id":data['mp_id'],
+            "title":data['title'],
+            "url":data['link'],
+            "pic_url":data['cover'],
+            "content":data['content'],
+            "publish_time":data['update_time'],
+        }
+        if 'digest' in data:
+            art['description']=data['digest']
+        for key in ('etag','last_modified'):
+            if data.get(key):
+                art[key]=data[key]
+        return art
     def FillBack(self,CallBack=None,data=None,Ext_Data=None):
         if CallBack is not None:
             if data is not  None:
-                from core.models import Article
-                from datetime import datetime
-                art={
-                    "id":str(data['id']),
-                    "mp_id":data['mp_id'],
-                    "title":data['title'],
-                    "url":data['link'],
-                    "pic_url":data['cover'],
-                    "content":data['content'],
-                    "publish_time":data['update_time'],
+                return self.FillBackBatch(CallBack=CallBack,items=[data],Ext_Data=Ext_Data)[0]
+        return None
+    def FillBackBatch(self,CallBack=None,items:list=None,Ext_Data=None)->list:
+        """批量回填文章
+        CallBack 标记了 batch_callback 时整批调用一次，返回每篇是否新增；否则逐篇调用
+        Returns:
+            与items一一对应的列表，新增文章为入库字段字典，否则为None
+        """
+        if CallBack is None or not items:
+            return [None]*len(items or [])
+        arts=[self.to_article(data) for data in items]
+        if getattr(CallBack,"batch",False):
+            results=CallBack(arts)
+        else:
+            results=[CallBack(art) for art in arts]
+        added=[]
+        for art,ok in zip(arts,results):
+            if ok:
+                art["ext"]=Ext_Data
+                art.pop("content")
+                self.articles.append(art)
+                added.append(art)
+            else:
+                added.append(None)
+        return added
+
+    def gather_feeds(self,mps:list=None,CallBack=None,MaxPage:int=1,interval=1,Item_Over_CallBack=None,Over_CallBack=None,Feed_Over_CallBack=None):
+        """依次采集多个公众号
+        Args:
+            mps: Feed列表
+            Feed_Over_CallBack: 每个公众号采集结束后回调，参数为(feed, 本公众号新增文章列表)
+        """
+        for item in mps or []:
+            try:
+                self.get_Articles(item.faker_id,CallBack=CallBack,Mps_id=item.id,Mps_title=item.mp_name,MaxPage=MaxPage,interval=interval,Item_Over_CallBack=Item_Over_CallBack,Over_CallBack=Over_CallBack)
+            except Exception as e:
+                print_error(f"采集公众号[{item.mp_name}]失败: {e}")
+            finally:
+                if Feed_Over_CallBack is not None:
+                    Feed_Over_CallBack(item,list(self.articles))
+
+
+    # 提取一篇文章的内容
+    def content_extract(self,url):
+        return self.content_fetch(url).get("content","")
+
+    def content_fetch(self,url,etag:str=None,last_modified:str=None)->dict:
+        """获取文章正文，带上校验信息时发送条件请求
+        Returns:
+            {"content","etag","last_modified"}，页面未变化(304)时为{"not_modified":True}，失败时为{}
+        """
+        try:
+            headers=dict(self.headers)
+            if etag:
+                headers["If-None-Match"]=etag
+            if last_modified:
+                headers["If-Modified-Since"]=last_modified
+            governor.acquire(self.priority)
+            r = self.session.get(url, headers=headers)
+            if r.status_code == 304:
+                return {"not_modified":True}
+            if r.status_code == 200:
+                return {
+                    "content":self.content_parse(r.content),
+                    "etag":r.headers.get("ETag"),
+                    "last_modified":r.headers.get("Last-Modified"),
                 }
-                if 'digest' in data:
-                    art['description']=data['digest']
-                if CallBack(art):
-                    art["ext"]=Ext_Data
-                    art.pop("content")
-                    self.articles.append(art)
+            print_error(f"下载文章失败,status_code:{r.status_code},{url}")
+        except Exception as e:
+            print_error(f"采集文章内容失败: {e}")
+        return {}
+
+    def content_refresh(self,article)->bool:
+        """条件刷新一篇已入库文章的正文
+        页面未变化(304)时跳过解析与写库，正文哈希未变化时跳过正文写入
+        Returns:
+            正文是否发生变化
+        """
+        url=article.url or f"https://mp.weixin.qq.com/s/{article.id}"
+        result=self.content_fetch(url,etag=article.etag,last_modified=article.last_modified)
+        if result.get("not_modified") or not result.get("content"):
+            return False
+        return DB.update_article_content(article.id,result["content"],etag=result.get("etag"),last_modified=result.get("last_modified"))
+
+    # 解析文章页面，提取正文内容
+    def content_parse(self,text):
+        from core.wx.extract import content_extract
+        return content_extract(text)
 
+    def request_list(self,url:str,params:dict)->dict:
+        """请求列表页接口，经由全局速率调控器
+        遇到流量控制(200013)时降速，后台采集会在冷却后重试
+        """
+        retries=int(cfg.get("rate_limit.retries",1)) if self.priority==BACKGROUND else 0
+        while True:
+            governor.acquire(self.priority,timeout=self._acquire_timeout())
+            resp = self.session.get(url, headers=self.headers, params=params)
+            msg = resp.json()
+            if msg.get('base_resp',{}).get('ret') == 200013:
+                governor.on_throttle()
+                if retries>0:
+                    retries-=1
+                    continue
+                return msg
+            governor.on_success()
+            return msg
+
+    def _acquire_timeout(self):
+        if self.priority==INTERACTIVE:
+            return float(cfg.get("rate_limit.interactive_timeout",30))
+        return None
+
+    def get_watermark(self,mp_id:str)->int:
+        """获取公众号已入库文章的最新发布时间(高水位)，没有文章或不按高水位停止翻页时返回0"""
+        if not (self.Incremental and self.stop_at_known):
+            return 0
+        from core.models import Article
+        from sqlalchemy import func
+        session=DB.get_session()
+        try:
+            value=session.query(func.max(Article.publish_time)).filter(Article.mp_id==mp_id).scalar()
+            return int(value or 0)
+        finally:
+            session.close()
+
+    def filter_new(self,mp_id:str,items:list,watermark:int=0):
+        """增量采集：过滤掉已入库的文章
+        Args:
+            mp_id: 公众号ID
+            items: 列表页返回的文章(含aid/update_time)
+            watermark: 该公众号已入库文章的最新发布时间
+        Returns:
+            (新文章列表, 是否已到达已采集位置)，stop_at_known为False时始终未到达
+        """
+        if not self.Incremental or not items:
+            return items,False
+        from core.models import Article
+        ids=[str(item["aid"]) for item in items]
+        session=DB.get_session()
+        try:
+            exists={row[0] for row in session.query(Article.id).filter(Article.id.in_(ids)).all()}
+        finally:
+            session.close()
+        new_items=[item for item in items if str(item["aid"]) not in exists]
+        reached=self.stop_at_known and (len(exists)>0 or (watermark>0 and any(int(item.get("update_time") or 0)<=watermark for item in items)))
+        if reached:
+            print_info(f"增量采集：[{mp_id}]已到达已采集位置,跳过{len(items)-len(new_items)}篇已存在文章")
+        elif exists:
+            print_info(f"[{mp_id}]跳过{len(exists)}篇已存在文章")
+        return new_items,reached
 
     #通过公众号码平台接口查询公众号
     def search_Biz(self,kw:str="",limit=5,offset=0):
@@ -84,7 +253,8 @@ class WxGather:
         }
         data={}
         try:
-            response = requests.get(
+            governor.acquire(INTERACTIVE,timeout=float(cfg.get("rate_limit.interactive_timeout",30)))
+            response = self.session.get(
             url,
             params=params,
             headers=headers,
@@ -93,8 +263,10 @@ class WxGather:
             data = response.text  # 解析JSON数据
             msg = json.loads(data)  # 手动解析
             if msg['base_resp']['ret'] == 200013:
+                governor.on_throttle()
                 self.Error("frequencey control, stop at {}".format(str(kw)))
                 return
+            governor.on_success()
             if msg['base_resp']['ret'] != 0:
                 self.Error("错误原因:{}:代码:{}".format(msg['base_resp']['err_msg'],msg['base_resp']['ret']))
                 return 
@@ -168,19 +340,11 @@ class WxGather:
             if hasattr(mp,'status') and mp.status is not None:
                 update_data['status']=mp.status
 
-            # 获取数据库会话并执行更新
-            session = DB.get_session()
-            try:
-                feed = session.query(Feed).filter(Feed.id == mp_id).first()
-                if feed:
-                    for key, value in update_data.items():
-                        print(f"更新公众号{mp_id}的{key}为{value}")
-                        setattr(feed, key, value)
-                    session.commit()
-                else:
-                    print_error(f"未找到ID为{mp_id}的公众号记录")
-            finally:
-                pass
+            # 由数据库写线程执行更新
+            for key, value in update_data.items():
+                print(f"更新公众号{mp_id}的{key}为{value}")
+            if not DB.update_feed(mp_id, **update_data):
+                print_error(f"未找到ID为{mp_id}的公众号记录")
                 
         except Exception as e:
             print_error(f"更新公众号状态失败: {e}")
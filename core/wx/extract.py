@@ -0,0 +1,64 @@
+import re
+try:
+    from lxml import html as lxml_html
+    from lxml import etree
+except ImportError:
+    lxml_html = None
+from bs4 import BeautifulSoup
+# 图片宽度统一设置为1080px
+WIDTH_PATTERN = re.compile(r'width\s*:\s*\d+\s*px')
+WIDTH_VALUE = 'width: 1080px'
+
+def content_extract(text) -> str:
+    """从微信文章页面中提取正文(#js_content)
+
+    移除正文容器的style(visibility: hidden)，将图片的data-src改写为src并统一宽度，
+    输出紧凑HTML(不做prettify缩进)。优先使用lxml解析，未安装时回退到BeautifulSoup。
+
+    Args:
+        text: 文章页面HTML(str或bytes)
+
+    Returns:
+        正文HTML，页面中没有正文时返回None
+    """
+    if not text:
+        return None
+    if lxml_html is not None:
+        return _extract_lxml(text)
+    return _extract_bs4(text)
+
+def _extract_lxml(text) -> str:
+    if isinstance(text, str):
+        text = text.encode('utf-8')
+    parser = lxml_html.HTMLParser(encoding='utf-8')
+    doc = lxml_html.document_fromstring(text, parser=parser)
+    nodes = doc.xpath('//div[@id="js_content"]')
+    if not nodes:
+        return None
+    js_content_div = nodes[0]
+    # 移除style属性中的visibility: hidden;
+    js_content_div.attrib.pop('style', None)
+    for img_tag in js_content_div.iter('img'):
+        src = img_tag.attrib.pop('data-src', None)
+        if src is not None:
+            img_tag.set('src', src)
+        style = img_tag.get('style')
+        if style:
+            img_tag.set('style', WIDTH_PATTERN.sub(WIDTH_VALUE, style))
+    # 不输出元素后面的尾随文本
+    js_content_div.tail = None
+    return etree.tostring(js_content_div, encoding='unicode', method='html')
+
+def _extract_bs4(text) -> str:
+    soup = BeautifulSoup(text, 'html.parser')
+    js_content_div = soup.find('div', {'id': 'js_content'})
+    if js_content_div is None:
+        return None
+    js_content_div.attrs.pop('style', None)
+    for img_tag in js_content_div.find_all('img'):
+        if 'data-src' in img_tag.attrs:
+            img_tag['src'] = img_tag['data-src']
+            del img_tag['data-src']
+        if 'style' in img_tag.attrs:
+            img_tag['style'] = WIDTH_PATTERN.sub(WIDTH_VALUE, img_tag['style'])
+    return str(js_content_div)
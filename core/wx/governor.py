@@ -0,0 +1,175 @@
+import time
+import random
+import asyncio
+import threading
+from core.config import cfg
+from core.print import print_warning
+# 全局请求速率调控：所有访问 mp.weixin.qq.com 的请求共享同一个令牌桶
+INTERACTIVE = 0
+BACKGROUND = 1
+
+class RateLimitTimeout(Exception):
+    """在超时时间内未获得请求配额"""
+    pass
+
+class RateGovernor:
+    """令牌桶 + AIMD 速率调控器
+
+    - 令牌按当前速率(每分钟请求数)补充，桶容量为 burst
+    - 遇到流量控制(ret=200013)时速率乘以 decrease，并暂停 cooldown 秒
+    - 每个 window 秒内请求均成功且未被限流时，速率增加 increase，直到 max_rate
+    - 交互请求(接口手动刷新、搜索)优先：有交互请求等待时后台请求让行，
+      且后台请求不能占用为交互请求保留的 reserve 个令牌
+    """
+    def __init__(self,rate:float=20,min_rate:float=2,max_rate:float=60,burst:int=5,increase:float=2,decrease:float=0.5,cooldown:int=300,window:int=60,reserve:int=1,jitter:float=1.0):
+        self.rate=float(rate)
+        self.min_rate=float(min_rate)
+        self.max_rate=float(max_rate)
+        self.burst=max(1,int(burst))
+        self.increase=float(increase)
+        self.decrease=float(decrease)
+        self.cooldown=int(cooldown)
+        self.window=int(window)
+        self.reserve=min(int(reserve),self.burst-1)
+        self.jitter=float(jitter)
+        self.tokens=float(self.burst)
+        self._lock=threading.Condition()
+        self._updated=time.monotonic()
+        self._adjusted=self._updated
+        self._blocked_until=0.0
+        self._waiting={INTERACTIVE:0,BACKGROUND:0}
+        self._successes=0
+        self.requests=0
+        self.throttled=0
+        self.last_throttle=None
+
+    @classmethod
+    def from_config(cls):
+        return cls(
+            rate=cfg.get("rate_limit.rate",20),
+            min_rate=cfg.get("rate_limit.min_rate",2),
+            max_rate=cfg.get("rate_limit.max_rate",60),
+            burst=cfg.get("rate_limit.burst",5),
+            increase=cfg.get("rate_limit.increase",2),
+            decrease=cfg.get("rate_limit.decrease",0.5),
+            cooldown=cfg.get("rate_limit.cooldown",300),
+            window=cfg.get("rate_limit.window",60),
+            reserve=cfg.get("rate_limit.reserve",1),
+            jitter=cfg.get("rate_limit.jitter",1.0),
+        )
+
+    def _refill(self,now:float):
+        self.tokens=min(self.burst,self.tokens+(now-self._updated)*self.rate/60)
+        self._updated=now
+        # 加性增：一个窗口内有成功请求且未被限流，则提高速率
+        if now-self._adjusted>=self.window:
+            if self._successes>0 and now>=self._blocked_until:
+                self.rate=min(self.max_rate,self.rate+self.increase)
+            self._successes=0
+            self._adjusted=now
+
+    def _try_take(self,priority:int)->float:
+        """尝试获取一个令牌，成功返回0，否则返回建议等待的秒数(需持有锁)"""
+        now=time.monotonic()
+        self._refill(now)
+        if now<self._blocked_until:
+            return self._blocked_until-now
+        need=1.0
+        if priority!=INTERACTIVE:
+            if self._waiting[INTERACTIVE]>0:
+                return 0.2
+            need+=self.reserve
+        if self.tokens>=need:
+            self.tokens-=1
+            self.requests+=1
+            return 0
+        return (need-self.tokens)*60/self.rate
+
+    def acquire(self,priority:int=BACKGROUND,timeout:float=None):
+        """阻塞直到获得一次请求配额"""
+        deadline=None if timeout is None else time.monotonic()+timeout
+        with self._lock:
+            self._waiting[priority]+=1
+            try:
+                while True:
+                    wait=self._try_take(priority)
+                    if wait<=0:
+                        break
+                    if deadline is not None:
+                        remaining=deadline-time.monotonic()
+                        if remaining<=0:
+                            raise RateLimitTimeout(f"请求过于频繁，请{int(wait)+1}秒后再试")
+                        wait=min(wait,remaining)
+                    self._lock.wait(wait)
+            finally:
+                self._waiting[priority]-=1
+                self._lock.notify_all()
+        self._sleep_jitter()
+
+    async def acquire_async(self,priority:int=BACKGROUND,timeout:float=None):
+        """协程版本的acquire"""
+        deadline=None if timeout is None else time.monotonic()+timeout
+        with self._lock:
+            self._waiting[priority]+=1
+        try:
+            while True:
+                with self._lock:
+                    wait=self._try_take(priority)
+                if wait<=0:
+                    break
+                if deadline is not None:
+                    remaining=deadline-time.monotonic()
+                    if remaining<=0:
+                        raise RateLimitTimeout(f"请求过于频繁，请{int(wait)+1}秒后再试")
+                    wait=min(wait,remaining)
+                await asyncio.sleep(min(wait,1.0))
+        finally:
+            with self._lock:
+                self._waiting[priority]-=1
+                self._lock.notify_all()
+        if self.jitter>0:
+            await asyncio.sleep(random.uniform(0,self.jitter))
+
+    def _sleep_jitter(self):
+        if self.jitter>0:
+            time.sleep(random.uniform(0,self.jitter))
+
+    def on_success(self):
+        with self._lock:
+            self._successes+=1
+
+    def on_throttle(self):
+        """收到流量控制(200013)：乘性减速并暂停一段时间"""
+        with self._lock:
+            now=time.monotonic()
+            self._refill(now)
+            self.rate=max(self.min_rate,self.rate*self.decrease)
+            self.tokens=0
+            self._blocked_until=now+self.cooldown
+            self._adjusted=now
+            self._successes=0
+            self.throttled+=1
+            self.last_throttle=time.time()
+            self._lock.notify_all()
+        print_warning(f"触发微信流量控制，速率降至每分钟{self.rate:.1f}次，暂停{self.cooldown}秒")
+
+    def state(self)->dict:
+        """当前请求预算"""
+        with self._lock:
+            now=time.monotonic()
+            self._refill(now)
+            return {
+                "rate_per_minute":round(self.rate,2),
+                "min_rate":self.min_rate,
+                "max_rate":self.max_rate,
+                "tokens":round(self.tokens,2),
+                "burst":self.burst,
+                "reserve":self.reserve,
+                "cooldown_remaining":round(max(0,self._blocked_until-now),1),
+                "waiting":{"interactive":self._waiting[INTERACTIVE],"background":self._waiting[BACKGROUND]},
+                "requests":self.requests,
+                "throttled":self.throttled,
+                "last_throttle":self.last_throttle,
+            }
+
+governor=RateGovernor.from_config()
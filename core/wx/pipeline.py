@@ -0,0 +1,255 @@
+import time
+import asyncio
+import functools
+from core.config import cfg
+from core.models.feed import Feed
+from core.log import logger
+from core.print import print_info
+# 采集流水线：列表页 -> 新文章过滤 -> 正文采集 -> 入库，各阶段之间通过有界队列连接
+class StageStats:
+    """单个阶段的统计信息"""
+    def __init__(self,name:str,workers:int,queue:asyncio.Queue=None):
+        self.name=name
+        self.workers=workers
+        self.queue=queue
+        self.processed=0
+        self.busy=0.0
+        self.max_depth=0
+
+    def record(self,seconds:float,count:int=1):
+        self.processed+=count
+        self.busy+=seconds
+
+    def sample(self):
+        if self.queue is not None:
+            self.max_depth=max(self.max_depth,self.queue.qsize())
+
+    def snapshot(self,elapsed:float)->dict:
+        return {
+            "stage":self.name,
+            "workers":self.workers,
+            "processed":self.processed,
+            "busy":round(self.busy,2),
+            "throughput":round(self.processed/elapsed,2) if elapsed>0 else 0,
+            "queue_depth":self.queue.qsize() if self.queue is not None else 0,
+            "max_queue_depth":self.max_depth,
+        }
+
+class FeedState:
+    """单个公众号在流水线中的进度"""
+    def __init__(self,feed:Feed):
+        self.feed=feed
+        self.pending=0
+        self.listed=False
+        self.finished=False
+        self.articles=[]
+
+class GatherPipeline:
+    def __init__(self,gather,client,CallBack=None,begin:int=0,MaxPage:int=1,interval=1,Gather_Content=False,Item_Over_CallBack=None,Over_CallBack=None,Feed_Over_CallBack=None):
+        """
+        Args:
+            gather: MpsAsync实例，提供请求、列表解析、增量过滤与回调
+            client: 共享的httpx.AsyncClient
+            interval: 同一公众号翻页之间的间隔(秒)
+        """
+        self.gather=gather
+        self.client=client
+        self.CallBack=CallBack
+        self.begin=begin
+        self.MaxPage=MaxPage
+        self.interval=interval
+        self.Gather_Content=Gather_Content
+        self.Item_Over_CallBack=Item_Over_CallBack
+        self.Over_CallBack=Over_CallBack
+        self.Feed_Over_CallBack=Feed_Over_CallBack
+        self.list_workers=max(1,int(cfg.get("gather.list_workers",2)))
+        self.content_workers=max(1,int(cfg.get("gather.content_workers",gather.concurrency)))
+        queue_size=max(1,int(cfg.get("gather.queue_size",50)))
+        self.write_batch=max(1,int(cfg.get("gather.write_batch",20)))
+        self.stats_interval=int(cfg.get("gather.stats_interval",30))
+        self.feed_q=asyncio.Queue()
+        self.filter_q=asyncio.Queue(maxsize=queue_size)
+        self.content_q=asyncio.Queue(maxsize=queue_size)
+        self.write_q=asyncio.Queue(maxsize=queue_size)
+        self.stages={
+            "list":StageStats("list",self.list_workers,self.feed_q),
+            "filter":StageStats("filter",1,self.filter_q),
+            "content":StageStats("content",self.content_workers,self.content_q),
+            "write":StageStats("write",1,self.write_q),
+        }
+        self.errors=[]
+        self.started=None
+
+    async def run(self,mps:list)->list:
+        """运行流水线，返回采集过程中出现的异常列表"""
+        self.started=time.time()
+        for feed in mps:
+            self.feed_q.put_nowait(FeedState(feed))
+        list_tasks=[asyncio.create_task(self._list_worker()) for _ in range(self.list_workers)]
+        workers=[asyncio.create_task(self._filter_worker())]
+        workers+=[asyncio.create_task(self._content_worker()) for _ in range(self.content_workers)]
+        workers.append(asyncio.create_task(self._write_worker()))
+        reporter=asyncio.create_task(self._reporter())
+        try:
+            await asyncio.gather(*list_tasks)
+            # 按阶段顺序等待队列清空
+            await self.filter_q.join()
+            await self.content_q.join()
+            await self.write_q.join()
+        finally:
+            for task in workers+[reporter]:
+                task.cancel()
+            await asyncio.gather(*workers,reporter,return_exceptions=True)
+        self.report(final=True)
+        return self.errors
+
+    def snapshot(self)->list:
+        elapsed=time.time()-self.started if self.started else 0
+        return [stage.snapshot(elapsed) for stage in self.stages.values()]
+
+    def report(self,final:bool=False):
+        lines=[f"{s['stage']:<8}workers={s['workers']:<3}processed={s['processed']:<6}busy={s['busy']:<8}throughput={s['throughput']}/s queue={s['queue_depth']}/{s['max_queue_depth']}" for s in self.snapshot()]
+        title="采集流水线统计" if final else "采集流水线进度"
+        text=f"{title}(耗时{time.time()-self.started:.1f}秒):\n"+"\n".join(lines)
+        if final:
+            print_info(text)
+        else:
+            logger.info(text)
+
+    async def _blocking(self,fn,*args,**kwargs):
+        """同步的数据库操作(含等待写线程)放到线程池执行，避免阻塞事件循环中的正文采集"""
+        return await asyncio.get_running_loop().run_in_executor(None,functools.partial(fn,*args,**kwargs))
+
+    async def _reporter(self):
+        while True:
+            for _ in range(max(1,self.stats_interval)):
+                await asyncio.sleep(1)
+                for stage in self.stages.values():
+                    stage.sample()
+            if self.stats_interval>0:
+                self.report()
+
+    async def _list_worker(self):
+        while not self.feed_q.empty():
+            state=self.feed_q.get_nowait()
+            try:
+                await self._list_feed(state)
+            except Exception as e:
+                self.errors.append(e)
+            finally:
+                state.listed=True
+                await self._maybe_finish(state)
+
+    async def _list_feed(self,state:FeedState):
+        feed=state.feed
+        gather=self.gather
+        now=int(time.time())
+        await self._blocking(gather.update_mps,feed.id,Feed(sync_time=now,update_time=now))
+        # 增量采集高水位
+        watermark=await self._blocking(gather.get_watermark,feed.id)
+        params = {
+            "sub": "list",
+            "sub_action": "list_ex",
+            "begin": 0,
+            "count": gather.count,
+            "fakeid": feed.faker_id,
+            "token": gather.token,
+            "lang": "zh_CN",
+            "f": "json",
+            "ajax": 1
+        }
+        for i in range(self.MaxPage):
+            if gather._stop_reason:
+                raise Exception(gather._stop_reason)
+            if i>0 and self.interval:
+                # 翻页间隔
+                await asyncio.sleep(self.interval)
+            params["begin"]=str(self.begin+i*gather.count)
+            start=time.time()
+            msg=await gather._get_json(self.client,gather.url,params)
+            items=gather._parse_list(msg,params["begin"])
+            self.stages["list"].record(time.time()-start)
+            if not items:
+                break
+            # 交给过滤阶段，等待是否到达已采集位置的判断后再翻页
+            verdict=asyncio.get_running_loop().create_future()
+            await self.filter_q.put((state,items,watermark,verdict))
+            reached=await verdict
+            print(f"[{feed.mp_name}]第{i+1}页爬取成功")
+            gather.Item_Over(item={"mp_id":feed.id,"mp_title":feed.mp_name},CallBack=self.Item_Over_CallBack)
+            if reached:
+                break
+
+    async def _filter_worker(self):
+        while True:
+            state,items,watermark,verdict=await self.filter_q.get()
+            try:
+                start=time.time()
+                try:
+                    # 增量采集：已入库的文章不再采集正文
+                    items,reached=await self._blocking(self.gather.filter_new,state.feed.id,items,watermark)
+                    state.pending+=len(items)
+                    verdict.set_result(reached)
+                except Exception as e:
+                    items=[]
+                    verdict.set_exception(e)
+                self.stages["filter"].record(time.time()-start,len(items))
+                for item in items:
+                    await self.content_q.put((state,item))
+            finally:
+                self.filter_q.task_done()
+
+    async def _content_worker(self):
+        while True:
+            state,item=await self.content_q.get()
+            try:
+                start=time.time()
+                if self.Gather_Content:
+                    item.update(await self.gather._content_fetch(self.client,item['link']))
+                item["content"]=item.get("content") or ""
+                self.stages["content"].record(time.time()-start)
+                await self.write_q.put((state,item))
+            finally:
+                self.content_q.task_done()
+
+    async def _write_worker(self):
+        while True:
+            # 取出队列中已就绪的文章，按公众号分组批量入库
+            batch=[await self.write_q.get()]
+            while len(batch)<self.write_batch and not self.write_q.empty():
+                batch.append(self.write_q.get_nowait())
+            groups={}
+            for state,item in batch:
+                item["id"]=item["aid"]
+                item["mp_id"]=state.feed.id
+                groups.setdefault(id(state),(state,[]))[1].append(item)
+            try:
+                for state,items in groups.values():
+                    start=time.time()
+                    try:
+                        added=await self._blocking(self.gather.FillBackBatch,CallBack=self.CallBack,items=items,Ext_Data={"mp_title":state.feed.mp_name,"mp_id":state.feed.id})
+                        state.articles.extend(art for art in added if art is not None)
+                    except Exception as e:
+                        logger.error(f"文章入库失败: {e}")
+                    self.stages["write"].record(time.time()-start,len(items))
+            finally:
+                try:
+                    for state,items in groups.values():
+                        state.pending-=len(items)
+                        await self._maybe_finish(state)
+                finally:
+                    for _ in batch:
+                        self.write_q.task_done()
+
+    async def _maybe_finish(self,state:FeedState):
+        if state.finished or not state.listed or state.pending>0:
+            return
+        state.finished=True
+        try:
+            # 完成回调中有通知、写库和RSS重建，同样放到线程池执行
+            if self.Over_CallBack is not None:
+                await self._blocking(self.Over_CallBack,self.gather)
+            if self.Feed_Over_CallBack is not None:
+                await self._blocking(self.Feed_Over_CallBack,state.feed,state.articles)
+        except Exception as e:
+            logger.error(f"[{state.feed.mp_name}]采集完成回调失败: {e}")
@@ -1,9 +1,9 @@
-import requests
 import json
 import re
 import datetime
 from datetime import datetime, timezone
 from core.config import cfg
+from core.http import get_session
 import core.db as db
 
 def dateformat(timestamp:any):
@@ -39,7 +39,7 @@ def search_Biz(kw:str="",limit=5,offset=0):
     }
     data={}
     try:
-        response = requests.get(
+        response = get_session("wx").get(
         url,
         params=params,
         headers=headers,
@@ -53,34 +53,19 @@ def search_Biz(kw:str="",limit=5,offset=0):
         print(f"请求失败: {e}")
     return data
 
-from bs4 import BeautifulSoup
+from core.wx.extract import content_extract as content_parse
 # 提取一篇文章的内容
 def content_extract(url):
     headers = {
         "Cookie": cfg.get("cookie"),
         "User-Agent": cfg.get("user_agent")
     }
-    r = requests.get(eval(url),headers=headers)
+    # 兼容带引号的链接字符串
+    if url.startswith('"'):
+        url = json.loads(url)
+    r = get_session("wx").get(url,headers=headers)
     if r.status_code == 200:
-        text = r.text
-        soup = BeautifulSoup(text, 'html.parser')
-        # 找到内容
-        js_content_div = soup.find('div', {'id': 'js_content'})
-        # 移除style属性中的visibility: hidden;
-        js_content_div.attrs.pop('style', None)
-        # 找到所有的img标签
-        img_tags = js_content_div.find_all('img')
-        # 遍历每个img标签并修改属性，设置宽度为1080p
-        for img_tag in img_tags:
-            if 'data-src' in img_tag.attrs:
-                img_tag['src'] = img_tag['data-src']
-                del img_tag['data-src']
-            if 'style' in img_tag.attrs:
-                style = img_tag['style']
-                # 使用正则表达式替换width属性
-                style = re.sub(r'width\s*:\s*\d+\s*px', 'width: 1080px', style)
-                img_tag['style'] = style
-        return js_content_div.prettify()
+        return content_parse(r.content) or ""
     else:
         print("download error,status_code: ",r.status_code,"\n")
     return ""
@@ -108,7 +93,7 @@ def get_Articles(faker_id:str):
     }
     data={}
     try:
-        response = requests.get(url, params=params, headers=headers)
+        response = get_session("wx").get(url, params=params, headers=headers)
         response.raise_for_status  # 检查状态码是否为200
         data = response.text  # 解析JSON数据
         data = json.loads(data)  # 手动解析
@@ -141,8 +126,7 @@ def get_list(faker_id:str=None,mp_id:str=None,is_add:bool=False):
     data=get_Articles(faker_id)
     try:
         data=data['publish_page']['publish_list']
-        wx_db=db.Db()
-        wx_db.init(cfg.get('db'))
+        wx_db=db.DB
         for i in data:
             art=i['publish_info']
             art=json.loads(art)
@@ -201,19 +185,11 @@ def update_mps(mp_id:str, mp:Feed):
         if hasattr(mp,'status') and mp.status is not None:
             update_data['status']=mp.status
 
-        # 获取数据库会话并执行更新
-        session = DB.get_session()
-        try:
-            feed = session.query(Feed).filter(Feed.id == mp_id).first()
-            if feed:
-                for key, value in update_data.items():
-                    print(f"更新公众号{mp_id}的{key}为{value}")
-                    setattr(feed, key, value)
-                session.commit()
-            else:
-                print(f"未找到ID为{mp_id}的公众号记录")
-        finally:
-           pass
+        # 由数据库写线程执行更新
+        for key, value in update_data.items():
+            print(f"更新公众号{mp_id}的{key}为{value}")
+        if not DB.update_feed(mp_id, **update_data):
+            print(f"未找到ID为{mp_id}的公众号记录")
             
     except Exception as e:
         print(f"更新公众号状态失败: {e}")
@@ -4,44 +4,12 @@ import time
 import random
 import yaml
 import re
-from bs4 import BeautifulSoup
 from .base import WxGather
+from .governor import RateLimitTimeout
 from core.log import logger
 # 继承 BaseGather 类
 class MpsWeb(WxGather):
 
-    # 重写 content_extract 方法
-    def content_extract(self,  url):
-        try:
-            session=self.session
-            r = session.get(url, headers=self.headers)
-            if r.status_code == 200:
-                text = r.text
-                if text is None:
-                    return
-                soup = BeautifulSoup(text, 'html.parser')
-                # 找到内容
-                js_content_div = soup.find('div', {'id': 'js_content'})
-                # 移除style属性中的visibility: hidden;
-                if js_content_div is None:
-                    return
-                js_content_div.attrs.pop('style', None)
-                # 找到所有的img标签
-                img_tags = js_content_div.find_all('img')
-                # 遍历每个img标签并修改属性，设置宽度为1080p
-                for img_tag in img_tags:
-                    if 'data-src' in img_tag.attrs:
-                        img_tag['src'] = img_tag['data-src']
-                        del img_tag['data-src']
-                    if 'style' in img_tag.attrs:
-                        style = img_tag['style']
-                        # 使用正则表达式替换width属性
-                        style = re.sub(r'width\s*:\s*\d+\s*px', 'width: 1080px', style)
-                        img_tag['style'] = style
-                return  js_content_div.prettify()
-        except Exception as e:
-                logger.error(e)
-        return ""
     # 重写 get_Articles 方法
     def get_Articles(self, faker_id:str=None,Mps_id:str=None,Mps_title="",CallBack=None,begin:int=0,MaxPage:int=1,interval=1,Gather_Content=False,Item_Over_CallBack=None,Over_CallBack=None):
         super().Start(mp_id=Mps_id)
@@ -64,6 +32,8 @@ class MpsWeb(WxGather):
     }
         # 连接超时
         session=self.session
+        # 增量采集高水位
+        watermark=super().get_watermark(Mps_id)
         # 起始页数
         i = 0
         while True:
@@ -72,12 +42,9 @@ class MpsWeb(WxGather):
             begin = i * count
             params["begin"] = str(begin)
             print(f"第{i+1}页开始爬取\n")
-            # 随机暂停几秒，避免过快的请求导致过快的被查到
-            time.sleep(random.randint(0,interval))
             try:
-                resp = session.get(url, headers=self.headers, params = params, verify=False)
-                
-                msg = resp.json()
+                # 请求间隔由全局速率调控器控制，interval参数仅为兼容保留，不再使用(async模式用作同一公众号的翻页间隔)
+                msg = super().request_list(url, params)
 
                 # 流量控制了, 退出
                 if msg['base_resp']['ret'] == 200013:
@@ -97,24 +64,34 @@ class MpsWeb(WxGather):
                     break  
                 if "publish_page" in msg:
                     msg["publish_page"]=json.loads(msg['publish_page'])
+                    items=[]
                     for item in msg["publish_page"]['publish_list']:
                         if "publish_info" in item:
                             publish_info= json.loads(item['publish_info'])
-                       
                             if "appmsgex" in publish_info:
-                                # info = '"{}","{}","{}","{}"'.format(str(item["aid"]), item['title'], item['link'], str(item['create_time']))
-                                for item in publish_info["appmsgex"]:
-                                    if Gather_Content:
-                                        item["content"] = self.content_extract(item['link'])
-                                    else:
-                                        item["content"] = ""
-                                    item["id"] = item["aid"]
-                                    item["mp_id"] = Mps_id
-                                    if CallBack is not None:
-                                        super().FillBack(CallBack=CallBack,data=item,Ext_Data={"mp_title":Mps_title,"mp_id":Mps_id})
+                                items.extend(publish_info["appmsgex"])
+                    # 增量采集：已入库的文章不再采集正文
+                    items,reached=super().filter_new(Mps_id,items,watermark)
+                    # info = '"{}","{}","{}","{}"'.format(str(item["aid"]), item['title'], item['link'], str(item['create_time']))
+                    for item in items:
+                        if Gather_Content:
+                            item.update(self.content_fetch(item['link']))
+                            item["content"] = item.get("content") or ""
+                        else:
+                            item["content"] = ""
+                        item["id"] = item["aid"]
+                        item["mp_id"] = Mps_id
+                    # 整页文章批量入库
+                    super().FillBackBatch(CallBack=CallBack,items=items,Ext_Data={"mp_title":Mps_title,"mp_id":Mps_id})
                     print(f"第{i+1}页爬取成功\n")
+                    if reached:
+                        break
                 # 翻页
                 i += 1
+            except RateLimitTimeout as e:
+                # 交互请求在等待时间内未获得请求配额
+                logger.warning(f"[{Mps_title}]{e}")
+                break
             except requests.exceptions.Timeout:
                 print("Request timed out")
                 break
@@ -0,0 +1,120 @@
+import json
+import asyncio
+import httpx
+from concurrent.futures import ThreadPoolExecutor
+from .wx2 import MpsWeb
+from .pipeline import GatherPipeline
+from .governor import governor,BACKGROUND
+from core.http import new_async_client
+from core.config import cfg
+from core.models.feed import Feed
+from core.log import logger
+from core.print import print_error,print_info,print_warning
+# 异步并发采集：多个公众号的列表页与文章正文在同一个并发上限下同时采集，分阶段流水线见 pipeline.py
+class MpsAsync(MpsWeb):
+    url = "https://mp.weixin.qq.com/cgi-bin/appmsgpublish"
+    count = 5
+    def __init__(self,is_add:bool=False):
+        super().__init__(is_add)
+        self.concurrency=max(1,int(cfg.get("gather.concurrency",5)))
+        # 最近一次采集的各阶段统计
+        self.stats=[]
+
+    # 重写 get_Articles 方法，回调约定与 MpsWeb 保持一致
+    def get_Articles(self, faker_id:str=None,Mps_id:str=None,Mps_title="",CallBack=None,begin:int=0,MaxPage:int=1,interval=1,Gather_Content=False,Item_Over_CallBack=None,Over_CallBack=None):
+        self.articles=[]
+        feed=Feed(id=Mps_id,faker_id=faker_id,mp_name=Mps_title)
+        errors=self._run(self._gather([feed],CallBack=CallBack,begin=begin,MaxPage=MaxPage,interval=interval,Gather_Content=Gather_Content,Item_Over_CallBack=Item_Over_CallBack,Over_CallBack=Over_CallBack))
+        if errors:
+            raise errors[0]
+
+    # 重写 gather_feeds 方法，所有公众号并发采集
+    def gather_feeds(self,mps:list=None,CallBack=None,MaxPage:int=1,interval=1,Item_Over_CallBack=None,Over_CallBack=None,Feed_Over_CallBack=None):
+        self.articles=[]
+        errors=self._run(self._gather(list(mps or []),CallBack=CallBack,MaxPage=MaxPage,interval=interval,Item_Over_CallBack=Item_Over_CallBack,Over_CallBack=Over_CallBack,Feed_Over_CallBack=Feed_Over_CallBack))
+        for e in errors:
+            print_error(e)
+
+    def _run(self,coro):
+        """执行协程；若当前线程已有事件循环(如在FastAPI接口中调用)，则放到独立线程执行"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run,coro).result()
+
+    async def _gather(self,mps:list,CallBack=None,begin:int=0,MaxPage:int=1,interval=1,Gather_Content=False,Item_Over_CallBack=None,Over_CallBack=None,Feed_Over_CallBack=None)->list:
+        """通过采集流水线并发采集多个公众号，返回采集过程中出现的异常列表"""
+        self.get_token()
+        if self.Gather_Content:
+            Gather_Content=True
+        self._sem=asyncio.Semaphore(self.concurrency)
+        self._stop_reason=None
+        print_info(f"异步并发模式,并发数:{self.concurrency},公众号数:{len(mps)},是否采集内容：{Gather_Content}")
+        limits=httpx.Limits(max_connections=self.concurrency,max_keepalive_connections=self.concurrency)
+        async with new_async_client(headers=self.headers,limits=limits,follow_redirects=True) as client:
+            pipeline=GatherPipeline(self,client,CallBack=CallBack,begin=begin,MaxPage=MaxPage,interval=interval,Gather_Content=Gather_Content,Item_Over_CallBack=Item_Over_CallBack,Over_CallBack=Over_CallBack,Feed_Over_CallBack=Feed_Over_CallBack)
+            errors=await pipeline.run(mps)
+        self.stats=pipeline.snapshot()
+        print(f"成功{len(self.articles)}条")
+        return errors
+
+    async def _get_json(self,client:httpx.AsyncClient,url:str,params:dict)->dict:
+        """请求列表页接口，经由全局速率调控器；遇到流量控制时降速，后台采集会在冷却后重试"""
+        retries=int(cfg.get("rate_limit.retries",1)) if self.priority==BACKGROUND else 0
+        while True:
+            await governor.acquire_async(self.priority,timeout=self._acquire_timeout())
+            async with self._sem:
+                resp=await client.get(url,params=params)
+            resp.raise_for_status()
+            msg=resp.json()
+            if msg.get('base_resp',{}).get('ret') == 200013:
+                governor.on_throttle()
+                if retries>0:
+                    retries-=1
+                    continue
+                return msg
+            governor.on_success()
+            return msg
+
+    def _parse_list(self,msg:dict,begin)->list:
+        """解析列表页，返回文章列表；遇到流量控制等错误时抛出异常"""
+        ret=msg.get('base_resp',{}).get('ret')
+        # 流量控制了, 同一账号下其余公众号也一并停止
+        if ret == 200013:
+            self._stop_reason="frequencey control, stop at {}".format(str(begin))
+            raise Exception(self._stop_reason)
+        if ret == 200003:
+            self._stop_reason="Invalid Session, stop at {}".format(str(begin))
+            raise Exception(self._stop_reason)
+        if ret != 0:
+            raise Exception("错误原因:{}:代码:{}".format(msg['base_resp'].get('err_msg'),ret))
+        # 如果返回的内容中为空则结束
+        if 'publish_page' not in msg:
+            return []
+        items=[]
+        publish_page=json.loads(msg['publish_page'])
+        for publish in publish_page.get('publish_list',[]):
+            if "publish_info" not in publish:
+                continue
+            publish_info=json.loads(publish['publish_info'])
+            items.extend(publish_info.get("appmsgex",[]))
+        return items
+
+    async def _content_fetch(self,client:httpx.AsyncClient,url:str)->dict:
+        """获取文章正文及页面校验信息，失败时返回{}"""
+        try:
+            await governor.acquire_async(self.priority)
+            async with self._sem:
+                r=await client.get(url)
+            if r.status_code == 200:
+                return {
+                    "content":self.content_parse(r.content),
+                    "etag":r.headers.get("ETag"),
+                    "last_modified":r.headers.get("Last-Modified"),
+                }
+            print_warning(f"下载文章失败,status_code:{r.status_code},{url}")
+        except Exception as e:
+            logger.error(e)
+        return {}
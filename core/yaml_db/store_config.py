@@ -35,10 +35,10 @@ class ConfigManager:
         config = self._load_config()
         return self._convert_to_nested_dict(config)
         
-    def _store_single_config(self, key, value, description=""):
+    def _store_single_config(self, session, key, value, description=""):
         """存储单个配置项到数据库"""
         try:
-            db.get_session().merge(ConfigManagement(
+            session.merge(ConfigManagement(
                 config_key=key,
                 config_value=str(value) if value is not None else '',
                 description=description
@@ -60,12 +60,14 @@ class ConfigManager:
                     for sub_key, sub_value in value.items():
                         config_key = f"{key}.{sub_key}"
                         self._store_single_config(
+                            session,
                             config_key, 
                             sub_value,
                             f"{key}配置的子项"
                         )
                 else:
                     self._store_single_config(
+                        session,
                         key, 
                         value,
                         "系统配置项"
@@ -78,6 +80,8 @@ class ConfigManager:
             session.rollback()
             self.logger.error(f"存储配置失败: {str(e)}")
             return False
+        finally:
+            session.close()
             
     def store_config_to_list(self,config=None) -> list:
         """
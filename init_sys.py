@@ -12,13 +12,13 @@ from core.print import print_info, print_error
 def init_user(_db: Db):
     try:
       username,password=os.getenv("USERNAME", "admin"),os.getenv("PASSWORD", "admin@123")
-      session=_db.get_session()
-      session.merge(User(
-          id=0,
-          username=username,
-          password_hash=pwd_context.hash(password),
-          ))
-      session.commit()
+      with _db.session_scope() as session:
+        session.merge(User(
+            id=0,
+            username=username,
+            password_hash=pwd_context.hash(password),
+            ))
+        session.commit()
     except Exception as e:
         # print_error(f"Init error: {str(e)}")
         pass
@@ -26,6 +26,15 @@ def sync_models():
      # 同步模型到表结构
          from core.data_sync import ModelSync
          DB.create_tables()
+         # 为已有表补充新增的列和索引
+         sync=ModelSync(eng=DB.get_engine())
+         sync.sync_columns()
+         # 旧版正文存放在articles.content，迁移到article_contents
+         sync.migrate_article_contents()
+         sync.sync_indexes()
+         sync.print_index_report()
+         from core.search import ensure_schema
+         ensure_schema(DB.get_engine())
         #  time.sleep(3)
         #  sync=ModelSync(eng=DB.get_engine())
         #  sync.sync_all()
@@ -4,12 +4,13 @@ import core.db as db
 from core.db import DB
 from core.config import DEBUG,cfg
 from core.models.article import Article
+from core.wx.base import batch_callback
 def delete_article(id:str):
     try:
-        session=DB.get_session()
-        article = session.query(Article).filter(Article.id == id).first()
-        session.delete(article)
-        session.commit()
+        with DB.session_scope() as session:
+            article = session.query(Article).filter(Article.id == id).first()
+            session.delete(article)
+            session.commit()
     except Exception as e:
         print(e)
         pass
@@ -25,6 +26,13 @@ def UpdateArticle(art:dict):
         mps_count=mps_count+1
         return True
     return False
+@batch_callback
+def UpdateArticles(arts:list)->list:
+    """批量入库，返回每篇文章是否新增"""
+    if DEBUG:
+        for art in arts:
+            delete_article(art['id'])
+    return DB.add_articles(arts)
 def Update_Over(data=None):
     print("更新完成",data)
     pass
\ No newline at end of file
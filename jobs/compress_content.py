@@ -0,0 +1,82 @@
+import threading
+from sqlalchemy import select, or_, bindparam
+from core.db import DB
+from core.config import cfg
+from core.models.article_content import ArticleContent
+from core import content_codec
+from core.print import print_error,print_success
+def reencode_contents(batch: int = None, engine=None) -> int:
+    """
+    按配置的压缩方式(article.compress)重新编码已有正文
+    首次启用字典时先用已有正文训练字典；关闭压缩时把已压缩的正文解压回原文
+    按文章ID分批处理，中断后再次执行会从编码不一致的正文继续
+    Returns:
+        重新编码的正文数
+    """
+    # 写入时使用调用方指定的engine，未指定时交给数据库写线程
+    write = (lambda fn: _write(engine, fn)) if engine is not None else DB.write
+    if engine is None:
+        engine = DB.get_engine()
+    content_codec.ensure_dict(engine)
+    target = content_codec.target_codec()
+    batch = int(batch or cfg.get("article.compress_batch", 200))
+    table = ArticleContent.__table__
+    codec = table.c.codec
+    pending = (codec != None) if target is None else or_(codec == None, codec != target)  # noqa: E711
+    total = 0
+    before = after = 0
+    last_id = ""
+    while True:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                select(table.c.article_id, table.c.content, table.c.data, codec)
+                .where(pending).where(table.c.article_id > last_id)
+                .order_by(table.c.article_id).limit(batch)
+            ).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1].article_id
+        updates = []
+        for row in rows:
+            try:
+                text = content_codec.decode(row.content, row.data, row.codec)
+            except Exception as e:
+                print_error(f"正文解码失败[{row.article_id}]: {e}")
+                continue
+            values = content_codec.encode(text, target)
+            # 压缩后没有变小的正文保持原文，不再重复处理
+            if values["codec"] is None and row.codec is None:
+                continue
+            updates.append({"b_id": row.article_id, "b_content": values["content"],
+                            "b_data": values["data"], "b_codec": values["codec"]})
+            before += len((row.content or "").encode("utf-8")) + len(row.data or b"")
+            after += len((values["content"] or "").encode("utf-8")) + len(values["data"] or b"")
+        if updates:
+            # 编码在写线程之外完成，写入时只执行批量更新
+            statement = table.update().where(table.c.article_id == bindparam("b_id"))\
+                .values(content=bindparam("b_content"), data=bindparam("b_data"), codec=bindparam("b_codec"))
+            write(lambda conn: conn.execute(statement, updates))
+            total += len(updates)
+    if total:
+        print_success(f"正文重新编码完成: {total}篇，编码{target or '不压缩'}，"
+                      f"{before // 1024}KB -> {after // 1024}KB(SQLite需执行VACUUM才会缩小数据库文件)")
+    return total
+
+def _write(engine, fn):
+    with engine.begin() as conn:
+        fn(conn)
+
+def start_reencode():
+    """在后台线程中重新编码已有正文"""
+    def run():
+        try:
+            reencode_contents()
+        except Exception as e:
+            print_error(f"正文重新编码失败: {e}")
+    content_codec.check()
+    if not cfg.get("article.compress_reencode", True):
+        return
+    threading.Thread(target=run, name="content-reencode", daemon=True).start()
+
+if __name__ == "__main__":
+    reencode_contents()
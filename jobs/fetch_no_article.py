@@ -1,18 +1,16 @@
 from core.models.article import Article
 from core.db import DB
 from core.wx.base import WxGather
-from time import sleep
 from core.print import print_success,print_error
-import random
 def fetch_articles_without_content():
     """
     查询content为空的文章，调用微信内容提取方法获取内容并更新数据库
     """
-    session = DB.get_session()
     ga=WxGather().Model()
     try:
-        # 查询content为空的文章
-        articles = session.query(Article).filter(Article.content == None).limit(10).all()
+        # 查询没有正文的文章(正文为空时content_hash为空)，抓取期间不占用数据库连接
+        with DB.session_scope() as session:
+            articles = session.query(Article).filter(Article.content_hash == None).limit(10).all()
         
         if not articles:
             print("没有找到content为空的文章")
@@ -28,18 +26,41 @@ def fetch_articles_without_content():
             print(f"正在处理文章: {article.title}, URL: {url}")
             
             # 获取内容
-            content = ga.content_extract(url)
-            sleep(random.randint(3,10))
+            # 请求间隔由全局速率调控器控制
+            result = ga.content_fetch(url)
+            content = result.get("content")
             if content:
-                # 更新内容
-                article.content = content
-                session.commit()
+                # 更新内容，同时刷新RSS片段、阅读页缓存和全文检索
+                DB.update_article_content(article.id, content,
+                                          etag=result.get("etag"), last_modified=result.get("last_modified"))
                 print_success(f"成功更新文章 {article.title} 的内容")
             else:
                 print_error(f"获取文章 {article.title} 内容失败")
                 
     except Exception as e:
         print(f"处理过程中发生错误: {e}")
+def revalidate_articles():
+    """
+    重新校验近期文章的正文，发送条件请求，页面或正文未变化时跳过写库
+    """
+    import time
+    from core.config import cfg
+    days=int(cfg.get("gather.content_revalidate_days",3))
+    limit=int(cfg.get("gather.content_revalidate_limit",20))
+    ga=WxGather().Model()
+    try:
+        with DB.session_scope() as session:
+            articles = session.query(Article).filter(Article.content_hash != None)\
+                .filter(Article.publish_time >= int(time.time())-days*86400)\
+                .order_by(Article.publish_time.desc()).limit(limit).all()
+        changed=0
+        for article in articles:
+            if ga.content_refresh(article):
+                changed+=1
+                print_success(f"文章 {article.title} 内容已更新")
+        print(f"重新校验{len(articles)}篇文章，{changed}篇内容有变化")
+    except Exception as e:
+        print(f"重新校验文章时发生错误: {e}")
 from core.task import TaskScheduler
 scheduler=TaskScheduler()
 from core.config import cfg
@@ -52,6 +73,16 @@ def start_sync_content():
     cron_exp=f"*/{interval} * * * *"
     job_id=scheduler.add_cron_job(fetch_articles_without_content,cron_expr=cron_exp)
     print_success(f"已添自动同步文章内容任务: {job_id}")
+    if cfg.get("gather.content_revalidate",False):
+        try:
+            interval=int(cfg.get("gather.content_revalidate_interval",30)) # 每隔多少分钟，可超过60
+        except (TypeError,ValueError):
+            interval=0
+        if interval<=0:
+            print_warning(f"gather.content_revalidate_interval配置无效({cfg.get('gather.content_revalidate_interval')})，使用默认值30分钟")
+            interval=30
+        job_id=scheduler.add_interval_job(revalidate_articles,minutes=interval)
+        print_success(f"已添加文章内容重新校验任务: {job_id}，每{interval}分钟执行一次")
     scheduler.start()
 if __name__ == "__main__":
     fetch_articles_without_content()
\ No newline at end of file
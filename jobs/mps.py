@@ -1,6 +1,6 @@
 from datetime import datetime
 from core.models.article import Article
-from .article import UpdateArticle,Update_Over
+from .article import UpdateArticle,UpdateArticles,Update_Over
 import core.db as db
 from core.wx import WxGather
 from core.log import logger
@@ -8,8 +8,8 @@ from core.task import TaskScheduler
 from core.models.feed import Feed
 from core.config import cfg,DEBUG
 from core.print import print_info,print_success,print_error
-wx_db=db.Db()
-wx_db.init(cfg.get("db"))
+# 与接口共用同一个数据库连接池
+wx_db=db.DB
 def fetch_all_article():
     print("开始更新")
     wx=WxGather().Model()
@@ -34,6 +34,7 @@ def test(info:str):
 from core.models.message_task import MessageTask
 # from core.queue import TaskQueue
 from .webhook import web_hook
+from core.materializer import feed_changed
 interval=int(cfg.get("interval",60)) # 每隔多少秒执行一次
 def do_job(mps:list[Feed]=None,task:MessageTask=None):
         # TaskQueue.add_task(test,info=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
@@ -41,18 +42,20 @@ def do_job(mps:list[Feed]=None,task:MessageTask=None):
         print("执行任务")
         all_count=0
         wx=WxGather().Model()
-        for item in mps:
+        def Feed_Over(item:Feed,articles:list):
+            nonlocal all_count
+            count=len(articles)
+            all_count+=count
+            from jobs.webhook import MessageWebHook 
+            tms=MessageWebHook(task=task,feed=item,articles=articles)
             try:
-                wx.get_Articles(item.faker_id,CallBack=UpdateArticle,Mps_id=item.id,Mps_title=item.mp_name, MaxPage=1,Over_CallBack=Update_Over,interval=interval)
-            except Exception as e:
-                print(e)
-            finally:
-                count=wx.all_count()
-                all_count+=count
-                from jobs.webhook import MessageWebHook 
-                tms=MessageWebHook(task=task,feed=item,articles=wx.articles)
                 web_hook(tms)
-                print_success(f"任务[{item.mp_name}]执行成功,{count}成功条数")
+            except Exception as e:
+                print_error(e)
+            # 通知后台重建该公众号的RSS
+            feed_changed(item.id)
+            print_success(f"任务[{item.mp_name}]执行成功,{count}成功条数")
+        wx.gather_feeds(mps,CallBack=UpdateArticles,MaxPage=1,Over_CallBack=Update_Over,interval=interval,Feed_Over_CallBack=Feed_Over)
         print_success(f"所有公众号更新完成,共更新{all_count}条数据")
 
 
@@ -74,6 +77,9 @@ def start_job():
     #开启自动同步未同步 文章任务
     from jobs.fetch_no_article import start_sync_content
     start_sync_content()
+    #按配置的压缩方式重新编码已有正文
+    from jobs.compress_content import start_reencode
+    start_reencode()
 
     from .taskmsg import get_message_task
     tasks=get_message_task()
@@ -1,8 +1,5 @@
-from core.db import Db
-from core.config import cfg
+from core.db import DB
 from core.models import MessageTask
-DB = Db()
-DB.init(cfg.get("db"))
 def get_message_task() -> list[MessageTask]:
     """
     获取单个消息任务详情
@@ -14,8 +11,8 @@ def get_message_task() -> list[MessageTask]:
         包含消息任务详情的字典，或None如果任务不存在
     """
     try:
-        session=DB.get_session()
-        message_task = session.query(MessageTask).filter(MessageTask.status==1).all()
+        with DB.session_scope() as session:
+            message_task = session.query(MessageTask).filter(MessageTask.status==1).all()
         if not message_task:
             return None
         return message_task
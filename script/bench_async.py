@@ -0,0 +1,190 @@
+"""RSS并发轮询基准测试：接口同步/异步数据库访问
+
+在临时SQLite库中写入 --feeds 个公众号、每个 --articles 篇文章，分别启动优化前版本(git worktree检出)
+和当前代码的uvicorn服务(单进程)，对比:
+- 原版本: async接口中直接调用同步SQLAlchemy，查询期间事件循环被阻塞
+- 当前:   接口经 core.async_db.ADB 在异步驱动(aiosqlite)上查询，阻塞操作放到线程池
+
+--clients 个客户端持续轮询 /rss/{id}(带If-None-Match，大部分返回304)，其中 --page-ratio 比例的请求
+翻到随机页(需要查询文章ID并流式输出)；另有一个客户端每隔20ms请求一次静态文件。
+输出各类请求的数量和p50/p99/最大延迟。
+
+用法:
+    python script/bench_async.py
+    python script/bench_async.py --baseline <git提交> --clients 64 --duration 20
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import httpx  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from core.models.base import Base, DATA_STATUS  # noqa: E402
+from core.models.article import Article  # noqa: E402
+from core.models.feed import Feed  # noqa: E402
+
+STATIC = "/static/default-avatar.png"
+
+
+def seed(path, feeds, articles):
+    engine = create_engine("sqlite:///" + path)
+    Base.metadata.create_all(engine)
+    now = datetime.now().replace(microsecond=0)
+    start = int(time.time()) - articles * 3600
+    with engine.begin() as conn:
+        conn.execute(Feed.__table__.insert(), [{
+            "id": f"MP_{f:04d}", "mp_name": f"公众号{f}", "mp_intro": "", "mp_cover": "", "status": 1,
+            "faker_id": f"F{f}", "sync_time": 0, "update_time": start, "created_at": now - timedelta(seconds=f), "updated_at": now,
+        } for f in range(feeds)])
+        for f in range(feeds):
+            conn.execute(Article.__table__.insert(), [{
+                "id": f"MP_{f:04d}-{i:06d}", "mp_id": f"MP_{f:04d}", "title": f"公众号{f}的第{i}篇文章",
+                "url": f"https://mp.weixin.qq.com/s/{f}-{i}", "description": "摘要" * 40, "status": DATA_STATUS.ACTIVE,
+                "publish_time": start + i * 3600, "created_at": now, "updated_at": now,
+            } for i in range(articles)])
+    engine.dispose()
+
+
+def baseline_rev():
+    """引入异步数据访问之前的提交(尚未提交时为HEAD)"""
+    added = subprocess.run(["git", "log", "--diff-filter=A", "--format=%H", "--", "core/async_db.py"],
+                           capture_output=True, text=True, cwd=ROOT).stdout.split()
+    return f"{added[-1]}^" if added else "HEAD"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(tree, db_path, cache_dir):
+    port = free_port()
+    env = dict(os.environ, DB="sqlite:///" + db_path, RSS_MATERIALIZE="False", PYTHONUNBUFFERED="1")
+    env["CACHE.DIR"] = cache_dir
+    env["SEARCH.ENABLED"] = "False"
+    proc = subprocess.Popen([sys.executable, "-m", "uvicorn", "web:app", "--port", str(port), "--log-level", "warning"],
+                            cwd=tree, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if httpx.get(base + STATIC, timeout=1).status_code == 200:
+                return proc, base
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"服务启动失败: {tree}")
+
+
+async def load(base, args):
+    latencies = {"304轮询": [], "翻页": [], "静态文件": []}
+    errors = []
+    etags = {}
+    deadline = time.perf_counter() + args.duration
+    limits = httpx.Limits(max_connections=args.clients + 1, max_keepalive_connections=args.clients + 1)
+
+    async def request(client, kind, url, headers=None):
+        start = time.perf_counter()
+        try:
+            r = await client.get(url, headers=headers)
+            await r.aread()
+            if r.status_code not in (200, 304):
+                errors.append(f"{r.status_code} {url}")
+                return None
+            latencies[kind].append((time.perf_counter() - start) * 1000)
+            return r
+        except httpx.HTTPError as e:
+            errors.append(f"{type(e).__name__} {url}")
+            return None
+
+    async def poller(client, index):
+        rnd = random.Random(index)
+        while time.perf_counter() < deadline:
+            feed_id = f"MP_{rnd.randrange(args.feeds):04d}"
+            if rnd.random() < args.page_ratio:
+                offset = rnd.randrange(0, max(1, args.articles - args.limit))
+                await request(client, "翻页", f"{base}/rss/{feed_id}?limit={args.limit}&offset={offset}")
+                continue
+            etag = etags.get(feed_id)
+            r = await request(client, "304轮询", f"{base}/rss/{feed_id}?limit={args.limit}",
+                              headers={"If-None-Match": etag} if etag else None)
+            if r is not None and r.headers.get("etag"):
+                etags[feed_id] = r.headers["etag"]
+
+    async def static_probe(client):
+        while time.perf_counter() < deadline:
+            await request(client, "静态文件", base + STATIC)
+            await asyncio.sleep(0.02)
+
+    async with httpx.AsyncClient(timeout=60, limits=limits) as client:
+        # 先完整请求一遍每个公众号，生成首页缓存
+        for f in range(args.feeds):
+            await request(client, "304轮询", f"{base}/rss/MP_{f:04d}?limit={args.limit}")
+        for values in latencies.values():
+            values.clear()
+        await asyncio.gather(static_probe(client), *(poller(client, i) for i in range(args.clients)))
+    return latencies, errors
+
+
+def pct(values, p):
+    return values[min(len(values) - 1, int(len(values) * p))] if values else float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RSS并发轮询基准测试")
+    parser.add_argument("--baseline", help="优化前版本的git提交，默认为引入core/async_db.py之前的提交")
+    parser.add_argument("--feeds", type=int, default=50, help="公众号数")
+    parser.add_argument("--articles", type=int, default=2000, help="每个公众号的文章数")
+    parser.add_argument("--clients", type=int, default=32, help="并发轮询的客户端数")
+    parser.add_argument("--page-ratio", type=float, default=0.1, help="翻到随机页的请求比例")
+    parser.add_argument("--limit", type=int, default=20, help="每页文章数")
+    parser.add_argument("--duration", type=int, default=15, help="每个版本的测试时长(秒)")
+    args = parser.parse_args()
+    directory = tempfile.mkdtemp(prefix="bench_async_")
+    baseline = args.baseline or baseline_rev()
+    worktree = os.path.join(directory, "baseline")
+    subprocess.run(["git", "worktree", "add", "--detach", worktree, baseline], cwd=ROOT, check=True,
+                   capture_output=True)
+    try:
+        if os.path.exists(os.path.join(ROOT, "config.yaml")):
+            shutil.copy(os.path.join(ROOT, "config.yaml"), worktree)
+        print(f"{args.feeds}个公众号，每个{args.articles}篇文章，{args.clients}个客户端轮询RSS"
+              f"(翻页{args.page_ratio:.0%})，每个版本{args.duration}秒")
+        print(f"\n{'版本':<8} {'请求':<8} {'次数':>8} {'p50(ms)':>9} {'p99(ms)':>9} {'max(ms)':>9}")
+        for mode, name, tree in (("old", "原版本", worktree), ("new", "当前", ROOT)):
+            db_path = os.path.join(directory, f"{mode}.db")
+            seed(db_path, args.feeds, args.articles)
+            proc, base = start_server(tree, db_path, os.path.join(directory, f"{mode}_cache"))
+            try:
+                latencies, errors = asyncio.run(load(base, args))
+            finally:
+                proc.terminate()
+                proc.wait()
+            for kind, values in latencies.items():
+                values.sort()
+                print(f"{name:<8} {kind:<8} {len(values):>8} {pct(values, 0.5):>9.1f} {pct(values, 0.99):>9.1f} "
+                      f"{values[-1] if values else float('nan'):>9.1f}")
+            if errors:
+                print(f"    失败{len(errors)}次: " + "; ".join(sorted(set(errors))[:3]))
+    finally:
+        subprocess.run(["git", "worktree", "remove", "--force", worktree], cwd=ROOT, capture_output=True)
+        shutil.rmtree(directory, ignore_errors=True)
+    print(f"\n原版本: {baseline}")
+
+
+if __name__ == "__main__":
+    main()
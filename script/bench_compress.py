@@ -0,0 +1,143 @@
+"""文章正文压缩存储基准测试
+
+分别以不压缩、zlib、zlib+共享字典、zstd、zstd+共享字典(需安装zstandard)写入同一批正文，
+对比VACUUM后的数据库大小、写入耗时以及按文章ID读取正文(含解压)的延迟。
+
+正文默认为模拟的微信文章HTML(大量重复的内联样式，带prettify缩进)；
+指定 --db 时从已有数据库的 article_contents 表读取正文样本。
+
+用法:
+    python script/bench_compress.py --rows 3000
+    python script/bench_compress.py --db data/db.db --rows 5000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from sqlalchemy import create_engine, select, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from core.models.article_content import ArticleContent  # noqa: E402
+from core.models.content_dict import ContentDict  # noqa: E402
+from core import content_codec  # noqa: E402
+
+STYLES = [
+    "margin: 0px 8px; padding: 0px; box-sizing: border-box;",
+    "font-size: 15px; color: rgb(62, 62, 62); line-height: 1.75em; letter-spacing: 1px;",
+    "text-align: center; margin-top: 10px; margin-bottom: 10px;",
+    "font-family: mp-quote, -apple-system-font, BlinkMacSystemFont, \"Helvetica Neue\", \"PingFang SC\", sans-serif;",
+    "display: inline-block; width: 100%; vertical-align: top; border-width: 0px; border-style: none;",
+    "color: rgb(0, 112, 192); font-weight: bold; font-size: 17px;",
+    "max-width: 100%; box-sizing: border-box !important; overflow-wrap: break-word !important;",
+    "background-color: rgb(255, 255, 255); padding: 10px 15px; border-radius: 4px;",
+]
+
+
+def wechat_article(rnd, paragraphs):
+    """模拟微信公众号正文HTML(BeautifulSoup.prettify()风格缩进)"""
+    words = "的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面而方后多定行学法所民得经十三之进着等部度家电力里如水化高自二理起小物现实加量都两体制机当使点从业本去把性好应开它合还因由其些然前外天政四日那社义事平形相全表间样与关各重新线内数正心反你明看原又么利比或但质气第向道命此变条只没结解问意建月公无系军很情者最立代想已通并提直题党程展五果料象员革位入常文总次品式活设及管特件长求老头基资边流路级少图山统接知较将组见计别她手角期根论运农指几九区强放决西被干做必战先回则任取据处理府研质".strip()
+    out = ['<div class="rich_media_content" id="js_content">']
+    for i in range(paragraphs):
+        style = rnd.choice(STYLES)
+        inner = "".join(rnd.choices(words, k=rnd.randint(40, 160)))
+        if rnd.random() < 0.15:
+            out.append(f' <p style="{STYLES[2]}">\n  <img class="rich_pages wxw-img" data-ratio="0.5625" data-type="png" '
+                       f'data-w="1080" data-src="https://mmbiz.qpic.cn/mmbiz_png/{rnd.getrandbits(64):x}/640?wx_fmt=png" '
+                       f'style="{STYLES[6]}"/>\n </p>')
+        out.append(f' <section style="{style}">\n  <p style="{rnd.choice(STYLES)}">\n'
+                   f'   <span style="{rnd.choice(STYLES)}">\n    {inner}\n   </span>\n  </p>\n </section>')
+    out.append("</div>")
+    return "\n".join(out)
+
+
+def samples_from_db(path, rows):
+    engine = create_engine("sqlite:///" + path)
+    with engine.connect() as conn:
+        result = conn.execute(select(ArticleContent.content, ArticleContent.data, ArticleContent.codec).limit(rows))
+        texts = [content_codec.decode(*row) for row in result]
+    engine.dispose()
+    return [t for t in texts if t]
+
+
+def build(path, texts, codec, dict_data):
+    """写入全部正文，返回写入耗时"""
+    engine = create_engine("sqlite:///" + path)
+    ArticleContent.__table__.create(engine)
+    ContentDict.__table__.create(engine)
+    if dict_data is not None:
+        name = codec.split(":")[0]
+        with engine.begin() as conn:
+            dict_id = conn.execute(ContentDict.__table__.insert().values(
+                codec=name, data=dict_data, samples=len(texts))).inserted_primary_key[0]
+        content_codec._dicts[dict_id] = dict_data
+        codec = f"{name}:{dict_id}"
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        values = [dict(content_codec.encode(t, codec), article_id=f"{i:08d}") for i, t in enumerate(texts)]
+        conn.execute(ArticleContent.__table__.insert(), values)
+    elapsed = time.perf_counter() - start
+    with engine.connect() as conn:
+        conn.execute(text("VACUUM"))
+    return engine, elapsed
+
+
+def read_latency(engine, count, repeat):
+    """随机按ID读取正文(新会话，含解压)的延迟(ms)"""
+    Session = sessionmaker(bind=engine)
+    rnd = random.Random(1)
+    latencies = []
+    for _ in range(repeat):
+        article_id = f"{rnd.randrange(count):08d}"
+        start = time.perf_counter()
+        session = Session()
+        row = session.get(ArticleContent, article_id)
+        body = row.body
+        session.close()
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert body
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="文章正文压缩存储基准测试")
+    parser.add_argument("--rows", type=int, default=3000, help="正文数")
+    parser.add_argument("--paragraphs", type=int, default=120, help="模拟正文段落数")
+    parser.add_argument("--db", help="从已有SQLite数据库读取正文样本")
+    parser.add_argument("--reads", type=int, default=2000, help="随机读取次数")
+    args = parser.parse_args()
+    if args.db:
+        texts = samples_from_db(args.db, args.rows)
+    else:
+        rnd = random.Random(7)
+        texts = [wechat_article(rnd, args.paragraphs) for _ in range(args.rows)]
+    raw = sum(len(t.encode("utf-8")) for t in texts)
+    print(f"正文 {len(texts)} 篇，原文共 {raw / 1024 / 1024:.1f}MB，平均 {raw / len(texts) / 1024:.1f}KB")
+    sample = texts[:500]
+    variants = [("不压缩", None, None), ("zlib", "zlib", None),
+                ("zlib+字典", "zlib", content_codec.train("zlib", sample))]
+    if content_codec.ZSTD_AVAILABLE:
+        variants += [("zstd", "zstd", None), ("zstd+字典", "zstd", content_codec.train("zstd", sample, 110 * 1024))]
+    else:
+        print("未安装zstandard，跳过zstd")
+    directory = tempfile.mkdtemp(prefix="bench_compress_")
+    print(f"\n{'方式':<10} {'数据库(MB)':>10} {'压缩比':>8} {'写入(s)':>8} {'读取p50(ms)':>12} {'读取p99(ms)':>12}")
+    base = None
+    for name, codec, dict_data in variants:
+        path = os.path.join(directory, f"{name}.db")
+        engine, elapsed = build(path, texts, codec, dict_data)
+        size = os.path.getsize(path)
+        base = base or size
+        p50, p99 = read_latency(engine, len(texts), args.reads)
+        engine.dispose()
+        print(f"{name:<10} {size / 1024 / 1024:>10.1f} {base / size:>7.1f}x {elapsed:>8.1f} {p50:>12.3f} {p99:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
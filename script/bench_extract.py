@@ -0,0 +1,94 @@
+"""文章正文提取基准测试
+
+对比旧实现(BeautifulSoup html.parser + prettify)与 core/wx/extract.py 的
+单篇解析耗时及入库HTML字节数。
+
+用法:
+    python script/bench_extract.py <保存的微信文章页面目录(*.html)>
+    python script/bench_extract.py --synthetic 50   # 无语料时使用合成页面
+"""
+import argparse
+import glob
+import importlib.util
+import os
+import re
+import statistics
+import time
+from bs4 import BeautifulSoup
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_spec = importlib.util.spec_from_file_location("extract", os.path.join(ROOT, "core", "wx", "extract.py"))
+extract = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(extract)
+
+
+def legacy_extract(text):
+    """优化前的提取逻辑(原 wx1/wx2 中的 content_extract)"""
+    soup = BeautifulSoup(text, 'html.parser')
+    js_content_div = soup.find('div', {'id': 'js_content'})
+    if js_content_div is None:
+        return None
+    js_content_div.attrs.pop('style', None)
+    for img_tag in js_content_div.find_all('img'):
+        if 'data-src' in img_tag.attrs:
+            img_tag['src'] = img_tag['data-src']
+            del img_tag['data-src']
+        if 'style' in img_tag.attrs:
+            img_tag['style'] = re.sub(r'width\s*:\s*\d+\s*px', 'width: 1080px', img_tag['style'])
+    return js_content_div.prettify()
+
+
+def synthetic_page(i):
+    paragraphs = "".join(
+        f'<section style="margin: 0px; padding: 0px; font-size: 15px; color: rgb(62, 62, 62);">'
+        f'<p style="line-height: 1.75em; text-align: justify;"><span style="font-size: 15px; letter-spacing: 1px;">'
+        f'第{i}篇第{n}段正文内容，用于测试解析性能。</span></p>'
+        f'<img data-src="https://mmbiz.qpic.cn/mmbiz_jpg/{i}_{n}/640" style="width: 677px !important; height: auto;"></section>'
+        for n in range(200)
+    )
+    head = "<script>var a=1;</script>" * 50
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8">{head}</head><body>'
+            f'<div id="js_content" style="visibility: hidden;">{paragraphs}</div></body></html>')
+
+
+def load_corpus(args):
+    if args.synthetic:
+        return [synthetic_page(i).encode("utf-8") for i in range(args.synthetic)]
+    pages = []
+    for path in sorted(glob.glob(os.path.join(args.corpus, "*.htm*"))):
+        with open(path, "rb") as f:
+            pages.append(f.read())
+    return pages
+
+
+def run(name, func, pages):
+    times = []
+    size = 0
+    for page in pages:
+        start = time.perf_counter()
+        html = func(page)
+        times.append(time.perf_counter() - start)
+        size += len((html or "").encode("utf-8"))
+    print(f"{name:<10} 平均 {statistics.mean(times) * 1000:8.2f} ms/篇  "
+          f"中位数 {statistics.median(times) * 1000:8.2f} ms  入库总字节 {size:>12,}")
+    return statistics.mean(times), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="文章正文提取基准测试")
+    parser.add_argument("corpus", nargs="?", help="保存的微信文章页面目录")
+    parser.add_argument("--synthetic", type=int, default=0, help="使用N篇合成页面代替语料")
+    args = parser.parse_args()
+    if not args.corpus and not args.synthetic:
+        parser.error("请指定语料目录或 --synthetic N")
+    pages = load_corpus(args)
+    if not pages:
+        parser.error("语料目录中没有 .html 文件")
+    print(f"共 {len(pages)} 篇, 解析器: {'lxml' if extract.lxml_html is not None else 'html.parser'}")
+    old_time, old_size = run("旧实现", legacy_extract, pages)
+    new_time, new_size = run("新实现", extract.content_extract, pages)
+    print(f"加速 {old_time / new_time:.1f}x, 存储体积 {new_size / max(old_size, 1):.0%}")
+
+
+if __name__ == "__main__":
+    main()
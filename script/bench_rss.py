@@ -0,0 +1,92 @@
+"""RSS生成基准测试
+
+对比 RSS.generate_rss(一次性构建ElementTree) 与 RSS.stream_rss(逐条流式输出)
+的耗时与峰值常驻内存(RSS)。每种模式在独立子进程中运行，互不影响峰值统计。
+
+- tree:   与旧接口一致，先把全部文章读入列表(相当于 query.all())，再整体序列化
+- stream: 逐条产生文章(相当于 query.yield_per())，边渲染边输出
+
+用法:
+    python script/bench_rss.py --items 100 --content-kb 200
+    python script/bench_rss.py --items 100 500 1000 --content-kb 50 200
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_item(i, content_kb):
+    paragraph = f'<p style="line-height: 1.75em;">第{i}篇正文内容 &amp; <img src="https://mmbiz.qpic.cn/{i}/640"></p>'
+    return {
+        "id": str(i),
+        "title": f"第{i}篇文章",
+        "link": f"https://mp.weixin.qq.com/s/{i}",
+        "description": f"第{i}篇摘要",
+        "content": paragraph * max(1, content_kb * 1024 // len(paragraph.encode("utf-8"))),
+        "updated": "2024-01-01T08:00:00",
+    }
+
+
+def peak_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def child(mode, items, content_kb):
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    from core.rss import RSS
+    rss = RSS(name="bench", cache_dir=tempfile.mkdtemp(prefix="bench_rss_"))
+    base = peak_kb()
+    start = time.perf_counter()
+    size = 0
+    with open(os.devnull, "w", encoding="utf-8") as sink:
+        if mode == "tree":
+            rss_list = [make_item(i, content_kb) for i in range(items)]
+            xml = rss.generate_rss(rss_list, title="bench")
+            sink.write(xml)
+            size = len(xml)
+        else:
+            for chunk in rss.stream_rss((make_item(i, content_kb) for i in range(items)), title="bench"):
+                sink.write(chunk)
+                size += len(chunk)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"time": elapsed, "peak_kb": peak_kb(), "delta_kb": peak_kb() - base, "chars": size}))
+
+
+def run(mode, items, content_kb):
+    env = dict(os.environ, RSS_FULL_CONTEXT="True")
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", mode, "--items", str(items), "--content-kb", str(content_kb)],
+        capture_output=True, text=True, env=env, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RSS生成基准测试")
+    parser.add_argument("--items", type=int, nargs="+", default=[100], help="每个源的文章数")
+    parser.add_argument("--content-kb", type=int, nargs="+", default=[200], help="每篇正文大小(KB)")
+    parser.add_argument("--child", choices=["tree", "stream"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child, args.items[0], args.content_kb[0])
+        return
+    print("以 RSS_FULL_CONTEXT=True 运行(config.yaml 中 rss.full_context 需保持环境变量写法)")
+    print(f"{'文章数':>6} {'正文KB':>6} {'模式':<7} {'耗时(s)':>8} {'峰值RSS(MB)':>12} {'增量(MB)':>10}")
+    for content_kb in args.content_kb:
+        for items in args.items:
+            for mode in ("tree", "stream"):
+                r = run(mode, items, content_kb)
+                print(f"{items:>6} {content_kb:>6} {mode:<7} {r['time']:>8.3f} "
+                      f"{r['peak_kb'] / 1024:>12.1f} {r['delta_kb'] / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
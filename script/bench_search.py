@@ -0,0 +1,135 @@
+"""文章搜索基准测试
+
+对比文章列表接口原来的搜索方式(Article.title.ilike，只能搜标题；对正文使用LIKE会扫描全部正文)
+与 core.search 全文检索(SQLite FTS5 trigram，按相关度排序并返回片段)的查询耗时。
+
+在临时SQLite库中生成模拟文章，正文由随机词组成，并按固定比例混入检索词:
+- 量子计算: 约0.1%的文章(少见词)
+- 人工智能: 约5%的文章，其中一部分出现在标题中(常见词)
+
+用法:
+    python script/bench_search.py --rows 100000
+    python script/bench_search.py --rows 200000 --content-kb 4 --keywords 量子计算 "人工智能 量子计算"
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from sqlalchemy import create_engine, or_  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from core.models.base import DATA_STATUS  # noqa: E402
+from core.models.article import Article  # noqa: E402
+from core.models.article_content import ArticleContent  # noqa: E402
+from core.models.article_search import ArticleSearch  # noqa: E402
+from core import search  # noqa: E402
+
+
+def make_vocab(rnd, size=3000):
+    return ["".join(chr(rnd.randint(0x4E00, 0x9FA5)) for _ in range(2)) for _ in range(size)]
+
+
+def load(engine, rows, content_kb, batch=2000):
+    Article.__table__.create(engine)
+    ArticleContent.__table__.create(engine)
+    search.ensure_schema(engine)
+    rnd = random.Random(7)
+    vocab = make_vocab(rnd)
+    words = max(10, content_kb * 1024 // 3 // 2)
+    now = int(time.time())
+    insert_time = index_time = 0.0
+    values = []
+    for i in range(rows):
+        body = rnd.choices(vocab, k=words)
+        title = "".join(rnd.choices(vocab, k=6))
+        if rnd.random() < 0.001:
+            body.insert(rnd.randrange(len(body)), "量子计算")
+        if rnd.random() < 0.05:
+            body.insert(rnd.randrange(len(body)), "人工智能")
+            if rnd.random() < 0.3:
+                title = "人工智能" + title
+        values.append({
+            "id": f"{i:08d}",
+            "mp_id": f"MP_{rnd.randrange(200):04d}",
+            "title": title,
+            "url": f"https://mp.weixin.qq.com/s/{i}",
+            "description": "",
+            "content": "<p>" + "</p><p>".join("".join(body[j:j + 40]) for j in range(0, len(body), 40)) + "</p>",
+            "status": DATA_STATUS.ACTIVE,
+            "publish_time": now - rnd.randint(0, 3 * 365 * 86400),
+        })
+        if len(values) >= batch or i == rows - 1:
+            start = time.perf_counter()
+            with engine.begin() as conn:
+                conn.execute(Article.__table__.insert(), [{k: v for k, v in row.items() if k != "content"} for row in values])
+                conn.execute(ArticleContent.__table__.insert(),
+                             [{"article_id": row["id"], "content": row["content"]} for row in values])
+            insert_time += time.perf_counter() - start
+            start = time.perf_counter()
+            search.index_articles(values, engine)
+            index_time += time.perf_counter() - start
+            values = []
+    print(f"写入 {rows} 篇文章 用时 {insert_time:.1f}s，建立检索内容 用时 {index_time:.1f}s "
+          f"(每篇 {index_time / rows * 1000:.2f}ms)")
+
+
+def timed(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="文章搜索基准测试")
+    parser.add_argument("--rows", type=int, default=100000, help="模拟文章数")
+    parser.add_argument("--content-kb", type=int, default=2, help="每篇正文大小(KB)")
+    parser.add_argument("--repeat", type=int, default=3, help="每个查询重复次数")
+    parser.add_argument("--keywords", nargs="+", default=["量子计算", "人工智能", "人工智能 量子计算"])
+    args = parser.parse_args()
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_search_"), "bench.db")
+    engine = create_engine("sqlite:///" + path)
+    load(engine, args.rows, args.content_kb)
+    print(f"数据库大小 {os.path.getsize(path) / 1024 / 1024:.0f}MB")
+    session = sessionmaker(bind=engine)()
+
+    def ilike(columns, kw):
+        def run():
+            query = session.query(Article).filter(Article.status != DATA_STATUS.DELETED)
+            if ArticleContent.content in columns:
+                query = query.outerjoin(ArticleContent, ArticleContent.article_id == Article.id)
+            for term in kw.split():
+                query = query.filter(or_(*[column.ilike(f"%{term}%") for column in columns]))
+            total = query.count()
+            rows = query.order_by(Article.publish_time.desc()).limit(20).all()
+            return total, len(rows)
+        return run
+
+    def fts(kw):
+        def run():
+            hits, total = search.search(session, kw, limit=20)
+            return total, len(hits)
+        return run
+
+    print(f"\n{'关键词':<14} {'方式':<22} {'耗时(ms)':>10} {'命中数':>8}")
+    for kw in args.keywords:
+        for name, fn in (("ilike 标题(原接口)", ilike([Article.title], kw)),
+                         ("ilike 标题+正文", ilike([Article.title, ArticleContent.content], kw)),
+                         ("全文检索(相关度+片段)", fts(kw))):
+            ms, (total, _) = timed(fn, args.repeat)
+            print(f"{kw:<14} {name:<22} {ms:>10.1f} {total:>8}")
+    hits, _ = search.search(session, args.keywords[0], limit=1)
+    if hits:
+        print("\n片段示例:", hits[0]["snippet"])
+    session.close()
+
+
+if __name__ == "__main__":
+    main()
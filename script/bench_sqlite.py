@@ -0,0 +1,189 @@
+"""SQLite并发基准测试：大批量入库时的读延迟
+
+在同一个SQLite库上，多个入库线程(对应采集线程、队列任务、正文补抓任务和接口)持续写入文章，
+同时多个读线程不断请求文章列表第一页，对比:
+- 原配置:     pool_size=10/max_overflow=300，默认回滚日志，各线程各自提交
+- SQLite模式: Db.init() 的WAL及pragma配置，写操作经单写线程合并提交(Db.write)
+
+输出入库吞吐、写入失败数("database is locked"等)以及读请求的p50/p99/最大延迟。
+
+用法:
+    python script/bench_sqlite.py
+    python script/bench_sqlite.py --seed-rows 100000 --ingest 20000 --writers 4 --readers 8
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from sqlalchemy import create_engine, func  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from core.models.base import DATA_STATUS  # noqa: E402
+from core.models.article import Article  # noqa: E402
+from core.models.article_content import ArticleContent  # noqa: E402
+from core.pagination import keyset  # noqa: E402
+from core.db import Db  # noqa: E402
+
+FEEDS = 200
+
+
+def article(i, rnd, body):
+    now = int(time.time())
+    return {
+        "id": f"{i:09d}",
+        "mp_id": f"MP_{rnd.randrange(FEEDS):04d}",
+        "title": f"文章{i}",
+        "url": f"https://mp.weixin.qq.com/s/{i}",
+        "description": "",
+        "status": DATA_STATUS.ACTIVE,
+        "publish_time": now - rnd.randint(0, 365 * 86400),
+        "created_at": datetime.now().replace(microsecond=0),
+        "updated_at": datetime.now().replace(microsecond=0),
+        "content_hash": "0" * 40,
+    }, {"article_id": f"{i:09d}", "content": body}
+
+
+def seed(path, rows, body):
+    engine = create_engine("sqlite:///" + path)
+    for table in (Article.__table__, ArticleContent.__table__):
+        table.create(engine)
+    rnd = random.Random(1)
+    with engine.begin() as conn:
+        for start in range(0, rows, 5000):
+            pairs = [article(i, rnd, body) for i in range(start, min(rows, start + 5000))]
+            conn.execute(Article.__table__.insert(), [a for a, _ in pairs])
+            conn.execute(ArticleContent.__table__.insert(), [c for _, c in pairs])
+    engine.dispose()
+
+
+def old_engine(path):
+    """优化前 Db.init 的连接配置"""
+    engine = create_engine("sqlite:///" + path, pool_size=10, max_overflow=300, pool_recycle=3600, pool_pre_ping=True)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+
+    def write(fn):
+        session = Session()
+        try:
+            result = fn(session)
+            session.commit()
+            return result
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    return engine, Session, write
+
+
+def new_engine(path):
+    db = Db()
+    db.init("sqlite:///" + path)
+    return db.get_engine(), db.get_session, db.write
+
+
+def run(mode, path, args, body):
+    engine, Session, write = (old_engine if mode == "old" else new_engine)(path)
+    stop = threading.Event()
+    latencies = []
+    read_errors = []
+    write_errors = []
+    written = [0]
+    lock = threading.Lock()
+
+    def reader(seed_value):
+        rnd = random.Random(seed_value)
+        while not stop.is_set():
+            start = time.perf_counter()
+            session = Session()
+            try:
+                query = session.query(Article).filter(Article.status != DATA_STATUS.DELETED)
+                if rnd.random() < 0.5:
+                    query = query.filter(Article.mp_id == f"MP_{rnd.randrange(FEEDS):04d}")
+                keyset(query, Article.publish_time, Article.id).limit(20).all()
+                query.order_by(None).with_entities(func.count()).scalar()
+                with lock:
+                    latencies.append((time.perf_counter() - start) * 1000)
+            except Exception as e:
+                with lock:
+                    read_errors.append(str(e))
+            finally:
+                session.close()
+
+    def writer(index):
+        rnd = random.Random(100 + index)
+        base = args.seed_rows + index * args.ingest
+        for start in range(0, args.ingest // args.writers, args.batch):
+            pairs = [article(base + start + k, rnd, body) for k in range(args.batch)]
+
+            def insert(session, pairs=pairs):
+                session.execute(Article.__table__.insert(), [a for a, _ in pairs])
+                session.execute(ArticleContent.__table__.insert(), [c for _, c in pairs])
+            try:
+                write(insert)
+                with lock:
+                    written[0] += len(pairs)
+            except Exception as e:
+                with lock:
+                    write_errors.append(str(e).splitlines()[0])
+
+    readers = [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+    writers = [threading.Thread(target=writer, args=(i,)) for i in range(args.writers)]
+    for t in readers:
+        t.start()
+    start = time.perf_counter()
+    for t in writers:
+        t.start()
+    for t in writers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for t in readers:
+        t.join()
+    engine.dispose()
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] if latencies else float("nan")
+    return {
+        "throughput": written[0] / elapsed,
+        "written": written[0],
+        "write_errors": write_errors,
+        "reads": len(latencies),
+        "read_errors": read_errors,
+        "p50": pct(0.5), "p99": pct(0.99), "max": latencies[-1] if latencies else float("nan"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite并发基准测试")
+    parser.add_argument("--seed-rows", type=int, default=50000, help="预先写入的文章数")
+    parser.add_argument("--ingest", type=int, default=10000, help="测试期间写入的文章数")
+    parser.add_argument("--batch", type=int, default=10, help="每次写入的文章数")
+    parser.add_argument("--writers", type=int, default=4, help="入库线程数")
+    parser.add_argument("--readers", type=int, default=8, help="读线程数")
+    parser.add_argument("--content-kb", type=int, default=20, help="每篇正文大小(KB)")
+    args = parser.parse_args()
+    body = "<p>" + "正文" * (args.content_kb * 1024 // 6) + "</p>"
+    directory = tempfile.mkdtemp(prefix="bench_sqlite_")
+    print(f"{args.seed_rows}篇已有文章，{args.writers}个线程写入{args.ingest}篇(每次{args.batch}篇)，{args.readers}个线程读取列表")
+    print(f"\n{'模式':<12} {'入库(篇/s)':>10} {'写失败':>8} {'读请求':>8} {'读失败':>8} {'p50(ms)':>9} {'p99(ms)':>9} {'max(ms)':>9}")
+    for mode, name in (("old", "原配置"), ("new", "SQLite模式")):
+        path = os.path.join(directory, f"{mode}.db")
+        seed(path, args.seed_rows, body)
+        r = run(mode, path, args, body)
+        print(f"{name:<12} {r['throughput']:>10.0f} {len(r['write_errors']):>8} {r['reads']:>8} {len(r['read_errors']):>8} "
+              f"{r['p50']:>9.1f} {r['p99']:>9.1f} {r['max']:>9.1f}")
+        for error in sorted(set(r["write_errors"] + r["read_errors"]))[:3]:
+            print(f"    {error[:120]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -47,6 +47,14 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# 接口JSON响应压缩，RSS与文章页使用预压缩文件
+from core.compress import ApiGZipMiddleware
+app.add_middleware(
+    ApiGZipMiddleware,
+    prefix=API_BASE,
+    minimum_size=int(cfg.get("http.gzip_min_size",1024)),
+    compresslevel=int(cfg.get("http.gzip_level",6)),
+)
 @app.middleware("http")
 async def add_custom_header(request: Request, call_next):
     response = await call_next(request)
@@ -55,6 +63,23 @@ async def add_custom_header(request: Request, call_next):
     response.headers["GITHUB"] = "https://github.com/rachelos/we-mp-rss"
     response.headers["Server"] = cfg.get("app_name", "WeRSS")
     return response
+@app.on_event("startup")
+async def warm_up_feeds():
+    """启动时在后台预生成全部公众号RSS"""
+    from core.materializer import materializer
+    import threading
+    threading.Thread(target=materializer.warm_up,daemon=True).start()
+@app.on_event("startup")
+async def start_search_backfill():
+    """启动时在后台为尚未建立检索内容的文章补齐全文索引"""
+    from core.search import start_backfill
+    start_backfill()
+@app.on_event("shutdown")
+async def close_http_clients():
+    """关闭共享的HTTP连接池"""
+    from core.http import aclose_all,close_all
+    await aclose_all()
+    close_all()
 # 创建API路由分组
 api_router = APIRouter(prefix=f"{API_BASE}")
 api_router.include_router(auth_router)